@@ -0,0 +1,95 @@
+"""asyncio에서 쓰는 일괄 변환
+
+convert_batch를 작업 스레드에서 실행하고 결과를 이벤트 루프로 넘겨 async for로
+받을 수 있게 합니다. 동시 변환 수(workers)와 soffice 감시는 convert_batch와 같으며,
+pause()/resume()/cancel()로 실행 중인 변환을 멈추거나 취소합니다.
+
+    async with AsyncBatch(soffice, files, output_dir, workers=4) as batch:
+        async for index, result in batch:
+            print(result.name, result.message())
+    print(batch.summary.text())
+
+async with 블록을 도중에 나오거나 그 태스크가 취소되면 실행 중인 soffice를 모두
+종료하고 정리가 끝난 뒤 돌아옵니다.
+"""
+
+import asyncio
+
+from hwp2pdf_engine import convert_batch, default_watchdog
+
+
+class AsyncBatch:
+    """일괄 변환 하나 (한 번만 실행되며, 다시 순회하면 같은 이벤트를 이어서 받음)
+
+    options는 convert_batch의 키워드 인자와 같습니다. on_result를 주면 결과 이벤트를
+    넘기기 전에 작업 스레드에서 먼저 호출합니다.
+    """
+
+    def __init__(self, soffice, files, output_dir="", watchdog=None, **options):
+        self.soffice = soffice
+        self.files = files
+        self.output_dir = output_dir
+        self.watchdog = watchdog or default_watchdog()
+        self.options = options
+        self.summary = None  # 끝나면 BatchSummary
+        self._events = None
+
+    @property
+    def paused(self):
+        return self.watchdog.paused
+
+    def pause(self):
+        self.watchdog.pause()
+
+    def resume(self):
+        self.watchdog.resume()
+
+    def cancel(self):
+        self.watchdog.cancel()
+
+    def __aiter__(self):
+        if self._events is None:
+            self._events = self._run()
+        return self._events
+
+    async def aclose(self):
+        """순회를 끝내지 않았으면 변환을 취소하고 정리가 끝날 때까지 기다립니다."""
+        if self._events is not None:
+            await self._events.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        events = asyncio.Queue()
+        on_result = self.options.pop("on_result", None)
+
+        def _on_result(index, result, summary):
+            if on_result:
+                on_result(index, result, summary)
+            loop.call_soon_threadsafe(events.put_nowait, (index, result))
+
+        def _convert():
+            return convert_batch(
+                self.soffice, self.files, self.output_dir, watchdog=self.watchdog,
+                on_result=_on_result, **self.options,
+            )
+
+        future = loop.run_in_executor(None, _convert)
+        future.add_done_callback(lambda _: events.put_nowait(None))
+        try:
+            while True:
+                event = await events.get()
+                if event is None:
+                    break
+                yield event
+            self.summary = await future
+        finally:
+            if not future.done():
+                # 순회를 멈췄거나 태스크가 취소됨: 실행 중인 soffice를 종료하고 정리를 기다림
+                self.watchdog.cancel()
+                self.summary = await asyncio.shield(future)
@@ -0,0 +1,538 @@
+#!/usr/bin/env python3
+"""변환 처리량 벤치마크
+
+사용법:
+  python3 hwp2pdf_bench.py [옵션] [-o report.json]
+
+쪽 수를 정한 합성 HWPX 문서 묶음을 만들고 변환 엔진(convert_batch)으로 변환해
+처리량(files/sec), 파일별 지연 시간 p50/p95/p99, soffice 시작 비용, 최대 메모리(RSS)를
+JSON으로 저장합니다. 같은 --seed면 같은 문서 묶음이 만들어지므로 실행 결과를 서로
+비교할 수 있습니다(--compare).
+
+LibreOffice가 설치되어 있으면 실제 soffice로, 없거나 --stub을 주면 시작 비용,
+쪽당 처리 시간, 멈춤, 비정상 종료를 흉내 내는 결정적인 가짜 soffice로 실행합니다.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import resource
+import shutil
+import stat
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import zipfile
+
+from hwp2pdf_engine import (
+    MODE_PROCESS,
+    MODE_SERVER,
+    STATUS_OK,
+    convert_batch,
+    default_workers,
+    find_soffice,
+    make_profile,
+    remove_profile,
+    soffice_version,
+)
+from hwp2pdf_profile import ensure_template
+from hwp2pdf_watchdog import Watchdog
+
+REPORT_FORMAT = 1
+HANG_MARK = "_hang"
+CRASH_MARK = "_crash"
+
+_HWPX_NS = (
+    'xmlns:ha="http://www.hancom.co.kr/hwpml/2011/app" '
+    'xmlns:hp="http://www.hancom.co.kr/hwpml/2011/paragraph" '
+    'xmlns:hs="http://www.hancom.co.kr/hwpml/2011/section" '
+    'xmlns:hh="http://www.hancom.co.kr/hwpml/2011/head" '
+    'xmlns:hc="http://www.hancom.co.kr/hwpml/2011/core"'
+)
+_WORDS = "가나다라마바사아자차카타파하 문서 변환 보고서 결과 검토 예산 사업 계획 추진 현황".split()
+
+# 가짜 soffice: 인자 해석은 실제 soffice --convert-to와 같고, 시간은 환경변수로 조절
+#   HWP2PDF_STUB_STARTUP  실행마다 드는 시작 비용 (초)
+#   HWP2PDF_STUB_PAGE     쪽당 처리 시간 (초)
+#   HWP2PDF_STUB_RSS_MB   시작할 때 잡아 두는 메모리 (MB)
+#   HWP2PDF_STUB_PROFILE  빈 프로필을 처음 초기화하는 시간 (초)
+# 파일 이름에 _hang이 있으면 멈추고, _crash가 있으면 비정상 종료(SIGABRT)합니다.
+STUB_SOFFICE = r'''
+import os
+import re
+import sys
+import time
+import zipfile
+
+args = sys.argv[1:]
+if "--version" in args:
+    print("LibreOffice 0.0.0.0 hwp2pdf-bench-stub")
+    sys.exit(0)
+
+outdir = "."
+fmt = "pdf"
+files = []
+profile = None
+i = 0
+while i < len(args):
+    a = args[i]
+    if a.startswith("-env:UserInstallation=file://"):
+        profile = a.split("=", 1)[1][len("file://"):]
+    if a in ("--outdir", "--convert-to"):
+        if a == "--outdir":
+            outdir = args[i + 1]
+        else:
+            fmt = args[i + 1].split(":")[0]
+        i += 2
+        continue
+    if not a.startswith("-"):
+        files.append(a)
+    i += 1
+
+ballast = bytearray(int(float(os.environ.get("HWP2PDF_STUB_RSS_MB", "0")) * 1024 * 1024))
+time.sleep(float(os.environ.get("HWP2PDF_STUB_STARTUP", "0")))
+if profile:
+    ready = os.path.join(profile, "user", "registrymodifications.xcu")
+    if not os.path.isfile(ready):
+        time.sleep(float(os.environ.get("HWP2PDF_STUB_PROFILE", "0")))
+        os.makedirs(os.path.dirname(ready), exist_ok=True)
+        with open(ready, "w") as f:
+            f.write("<items/>\n")
+if "--terminate_after_init" in args:
+    sys.exit(0)
+page_cost = float(os.environ.get("HWP2PDF_STUB_PAGE", "0"))
+
+
+def page_count(path):
+    try:
+        with zipfile.ZipFile(path) as z:
+            pages = 0
+            for name in z.namelist():
+                if name.startswith("Contents/section") and name.endswith(".xml"):
+                    pages += 1 + len(re.findall(rb'pageBreak="1"', z.read(name)))
+            return max(1, pages)
+    except (OSError, zipfile.BadZipFile):
+        return 1
+
+
+def write_pdf(path, pages):
+    objs = [b"<< /Type /Catalog /Pages 2 0 R >>"]
+    kids = " ".join(f"{3 + n} 0 R" for n in range(pages))
+    objs.append(f"<< /Type /Pages /Kids [{kids}] /Count {pages} >>".encode())
+    for _ in range(pages):
+        objs.append(b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] >>")
+    out = bytearray(b"%PDF-1.7\n")
+    offsets = []
+    for n, body in enumerate(objs, 1):
+        offsets.append(len(out))
+        out += f"{n} 0 obj\n".encode() + body + b"\nendobj\n"
+    xref = len(out)
+    out += f"xref\n0 {len(objs) + 1}\n0000000000 65535 f \n".encode()
+    for off in offsets:
+        out += f"{off:010d} 00000 n \n".encode()
+    out += f"trailer\n<< /Size {len(objs) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    with open(path, "wb") as f:
+        f.write(out)
+
+
+for f in files:
+    name = os.path.basename(f)
+    if "_hang" in name:
+        time.sleep(10 ** 6)
+    if "_crash" in name:
+        os.abort()
+    pages = page_count(f)
+    time.sleep(page_cost * pages)
+    base = os.path.splitext(name)[0]
+    write_pdf(os.path.join(outdir, base + "." + fmt), pages)
+    print(f"convert {f} -> {os.path.join(outdir, base + '.' + fmt)} using filter : writer_pdf_Export")
+'''
+
+
+def make_hwpx(path, pages, rng, paragraphs_per_page=12):
+    """pages쪽(쪽 나눔 pages-1개)짜리 합성 HWPX 문서를 만듭니다."""
+    paras = []
+    for page in range(pages):
+        for n in range(paragraphs_per_page):
+            text = " ".join(rng.choice(_WORDS) for _ in range(rng.randint(8, 30)))
+            page_break = ' pageBreak="1"' if page > 0 and n == 0 else ""
+            paras.append(
+                f'<hp:p id="{page * paragraphs_per_page + n}" paraPrIDRef="0" styleIDRef="0"'
+                f'{page_break}><hp:run charPrIDRef="0"><hp:t>{text}</hp:t></hp:run></hp:p>'
+            )
+    section = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        f"<hs:sec {_HWPX_NS}>" + "".join(paras) + "</hs:sec>"
+    )
+    header = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        f'<hh:head {_HWPX_NS} version="1.4" secCnt="1"><hh:beginNum page="1"/></hh:head>'
+    )
+    content = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<opf:package xmlns:opf="http://www.idpf.org/2007/opf/" version="">'
+        "<opf:manifest>"
+        '<opf:item id="header" href="Contents/header.xml" media-type="application/xml"/>'
+        '<opf:item id="section0" href="Contents/section0.xml" media-type="application/xml"/>'
+        "</opf:manifest>"
+        '<opf:spine><opf:itemref idref="header" linear="yes"/><opf:itemref idref="section0" linear="yes"/></opf:spine>'
+        "</opf:package>"
+    )
+    version = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<hv:HCFVersion xmlns:hv="http://www.hancom.co.kr/hwpml/2011/version" '
+        'targetApplication="WORDPROCESSOR" major="5" minor="1" micro="0" buildNumber="1" '
+        'os="1" xmlVersion="1.4" application="hwp2pdf-bench" appVersion="1"/>'
+    )
+    container = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<ocf:container xmlns:ocf="urn:oasis:names:tc:opendocument:xmlns:container">'
+        '<ocf:rootfiles><ocf:rootfile full-path="Contents/content.hpf" '
+        'media-type="application/hwpml-package+xml"/></ocf:rootfiles></ocf:container>'
+    )
+    entries = [
+        ("mimetype", "application/hwp+zip"),  # 압축하지 않고 맨 앞에 둠
+        ("version.xml", version),
+        ("META-INF/container.xml", container),
+        ("Contents/content.hpf", content),
+        ("Contents/header.xml", header),
+        ("Contents/section0.xml", section),
+    ]
+    with zipfile.ZipFile(path, "w") as z:
+        for name, data in entries:
+            # 같은 seed면 바이트까지 같도록 수정 시각을 고정
+            info = zipfile.ZipInfo(name, date_time=(2020, 1, 1, 0, 0, 0))
+            info.compress_type = zipfile.ZIP_STORED if name == "mimetype" else zipfile.ZIP_DEFLATED
+            z.writestr(info, data)
+
+
+def generate_corpus(directory, count, min_pages=1, max_pages=20, seed=0,
+                    hang_rate=0.0, crash_rate=0.0):
+    """합성 문서 묶음을 만들고 corpus 정보(dict)를 반환합니다. 같은 seed면 같은 묶음입니다."""
+    rng = random.Random(seed)
+    os.makedirs(directory, exist_ok=True)
+    files = []
+    pages_total = 0
+    hangs = crashes = 0
+    for i in range(count):
+        pages = rng.randint(min_pages, max_pages)
+        roll = rng.random()
+        mark = ""
+        if roll < hang_rate:
+            mark, hangs = HANG_MARK, hangs + 1
+        elif roll < hang_rate + crash_rate:
+            mark, crashes = CRASH_MARK, crashes + 1
+        path = os.path.join(directory, f"doc{i:05d}_p{pages}{mark}.hwpx")
+        make_hwpx(path, pages, rng)
+        files.append(path)
+        pages_total += pages
+    return {
+        "files": count,
+        "pages_total": pages_total,
+        "bytes": sum(os.path.getsize(f) for f in files),
+        "seed": seed,
+        "pages": [min_pages, max_pages],
+        "hangs": hangs,
+        "crashes": crashes,
+        "paths": files,
+    }
+
+
+def write_stub(directory):
+    """가짜 soffice 실행 파일을 만들고 경로를 반환합니다."""
+    path = os.path.join(directory, "soffice")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(f"#!{sys.executable}\n" + STUB_SOFFICE)
+    os.chmod(path, os.stat(path).st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+    return path
+
+
+def percentile(values, q):
+    """선형 보간 백분위수 (values는 정렬된 목록)"""
+    if not values:
+        return None
+    pos = (len(values) - 1) * q / 100
+    lo = int(pos)
+    hi = min(lo + 1, len(values) - 1)
+    return values[lo] + (values[hi] - values[lo]) * (pos - lo)
+
+
+def _time_start(soffice, profile_url):
+    started = time.monotonic()
+    subprocess.run(
+        [soffice, "--headless", "--norestore", f"-env:UserInstallation={profile_url}",
+         "--terminate_after_init"],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=120,
+    )
+    return time.monotonic() - started
+
+
+def measure_spawn(soffice, samples=3, template=None):
+    """soffice를 초기화까지만 실행하고 끝내는 데 걸리는 시간
+
+    빈 프로필의 첫 실행(cold), 이후 실행의 중앙값(warm), template이 있으면 템플릿을
+    복제한 프로필의 첫 실행(template, 복제 시간 포함)을 잽니다.
+    """
+    profile_dir, profile_url = make_profile()
+    times = []
+    try:
+        for _ in range(samples + 1):
+            times.append(_time_start(soffice, profile_url))
+    except (OSError, subprocess.SubprocessError):
+        pass
+    finally:
+        remove_profile(profile_dir)
+    first = None
+    if template:
+        started = time.monotonic()
+        profile_dir, profile_url = make_profile(template)
+        try:
+            _time_start(soffice, profile_url)
+            first = round(time.monotonic() - started, 4)
+        except (OSError, subprocess.SubprocessError):
+            pass
+        finally:
+            remove_profile(profile_dir)
+    if not times:
+        return {"cold_seconds": None, "warm_seconds": None, "template_seconds": first, "samples": 0}
+    return {
+        "cold_seconds": round(times[0], 4),
+        "warm_seconds": round(statistics.median(times[1:]), 4) if len(times) > 1 else None,
+        "template_seconds": first,
+        "samples": len(times) - 1,
+    }
+
+
+class _CountingWatchdog(Watchdog):
+    """soffice 실행 횟수를 세는 Watchdog"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.spawns = 0
+
+    def run(self, cmd, timeout):
+        with self._lock:
+            self.spawns += 1
+        return super().run(cmd, timeout)
+
+
+def _max_rss_bytes(who):
+    # ru_maxrss 단위: Linux는 KB, macOS는 바이트
+    value = resource.getrusage(who).ru_maxrss
+    return value if sys.platform == "darwin" else value * 1024
+
+
+def run_benchmark(soffice, files, workers, chunk_size=1, mode=MODE_PROCESS, timeout=30,
+                  attempts=1, template=None):
+    """files를 변환하고 측정값(dict)을 반환합니다."""
+    outdir = tempfile.mkdtemp(prefix="hwp2pdf_bench_out_")
+    watchdog = _CountingWatchdog(attempts=attempts)
+    latencies = []
+    statuses = {}
+
+    def _on_result(idx, result, summary):
+        statuses[result.status] = statuses.get(result.status, 0) + 1
+        if result.status == STATUS_OK:
+            latencies.append(result.elapsed)
+
+    try:
+        started = time.monotonic()
+        summary = convert_batch(
+            soffice, list(files), outdir, workers=workers, timeout=timeout, mode=mode,
+            chunk_size=chunk_size, watchdog=watchdog, profile_template=template,
+            on_result=_on_result,
+        )
+        wall = time.monotonic() - started
+    finally:
+        shutil.rmtree(outdir, ignore_errors=True)
+
+    latencies.sort()
+    return {
+        "wall_seconds": round(wall, 4),
+        "files_per_sec": round(summary.success / wall, 4) if wall > 0 else None,
+        "ok": summary.success,
+        "failed": summary.fail,
+        "statuses": statuses,
+        "latency_seconds": {
+            "p50": _round(percentile(latencies, 50)),
+            "p95": _round(percentile(latencies, 95)),
+            "p99": _round(percentile(latencies, 99)),
+            "mean": _round(statistics.fmean(latencies) if latencies else None),
+            "max": _round(latencies[-1] if latencies else None),
+        },
+        "spawns": watchdog.spawns,
+        "watchdog_kills": dict(watchdog.kills),
+        "peak_rss_bytes": {
+            "soffice": _max_rss_bytes(resource.RUSAGE_CHILDREN),
+            "harness": _max_rss_bytes(resource.RUSAGE_SELF),
+        },
+    }
+
+
+def _round(value, digits=4):
+    return None if value is None else round(value, digits)
+
+
+def compare(old, new):
+    """두 보고서의 주요 값 변화를 문자열 목록으로 반환합니다."""
+    lines = []
+    pairs = [
+        ("files/sec", ("results", "files_per_sec"), True),
+        ("p50", ("results", "latency_seconds", "p50"), False),
+        ("p95", ("results", "latency_seconds", "p95"), False),
+        ("p99", ("results", "latency_seconds", "p99"), False),
+        ("spawn (warm)", ("spawn", "warm_seconds"), False),
+        ("spawn (template)", ("spawn", "template_seconds"), False),
+    ]
+    for label, keys, higher_is_better in pairs:
+        a, b = old, new
+        for k in keys:
+            a = a.get(k) if isinstance(a, dict) else None
+            b = b.get(k) if isinstance(b, dict) else None
+        if not a or b is None:
+            continue
+        change = (b - a) / a * 100
+        better = change > 0 if higher_is_better else change < 0
+        mark = "개선" if better else ("악화" if change else "같음")
+        lines.append(f"{label}: {a} -> {b} ({change:+.1f}%, {mark})")
+    return lines
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="HWP → PDF 변환 처리량 벤치마크")
+    parser.add_argument("--files", type=int, default=200, help="합성 문서 수 (기본: 200)")
+    parser.add_argument(
+        "--pages", default="1-20", metavar="MIN-MAX",
+        help="문서당 쪽 수 범위 (기본: 1-20)",
+    )
+    parser.add_argument("--seed", type=int, default=0, help="문서 묶음 생성 seed (기본: 0)")
+    parser.add_argument("--hang-rate", type=float, default=0.0, help="멈추는 문서 비율 (가짜 soffice)")
+    parser.add_argument("--crash-rate", type=float, default=0.0, help="비정상 종료 문서 비율 (가짜 soffice)")
+    parser.add_argument("-j", "--workers", type=int, default=default_workers(), help="동시 변환 수")
+    parser.add_argument("--chunk", type=int, default=1, metavar="K", help="soffice 한 번에 변환할 파일 수")
+    parser.add_argument("--server", action="store_true", help="상주 LibreOffice(UNO) 모드로 측정")
+    parser.add_argument("--timeout", type=float, default=30, help="파일당 시간 제한 (초, 기본: 30)")
+    parser.add_argument("--attempts", type=int, default=1, help="강제 종료된 파일의 최대 시도 횟수 (기본: 1)")
+    parser.add_argument("--stub", action="store_true", help="LibreOffice가 있어도 가짜 soffice 사용")
+    parser.add_argument("--startup", type=float, default=0.5, help="가짜 soffice 시작 비용 (초, 기본: 0.5)")
+    parser.add_argument("--page-latency", type=float, default=0.02, help="가짜 soffice 쪽당 시간 (초, 기본: 0.02)")
+    parser.add_argument("--stub-rss", type=float, default=64, help="가짜 soffice 메모리 (MB, 기본: 64)")
+    parser.add_argument(
+        "--profile-init", type=float, default=2.0,
+        help="가짜 soffice가 빈 프로필을 초기화하는 시간 (초, 기본: 2)",
+    )
+    parser.add_argument(
+        "--no-profile-template", action="store_true",
+        help="프로필 템플릿 없이 작업자마다 빈 프로필로 시작",
+    )
+    parser.add_argument("--corpus", metavar="DIR", help="문서 묶음을 만들 폴더 (기본: 임시 폴더, 끝나면 삭제)")
+    parser.add_argument("-o", "--output", metavar="JSON", help="보고서 저장 경로 (기본: 표준 출력)")
+    parser.add_argument("--compare", metavar="JSON", help="이전 보고서와 비교해 변화 출력")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    try:
+        min_pages, max_pages = (int(p) for p in args.pages.split("-", 1))
+    except ValueError:
+        min_pages = max_pages = int(args.pages)
+
+    work_dir = tempfile.mkdtemp(prefix="hwp2pdf_bench_")
+    try:
+        soffice = None if args.stub else find_soffice()
+        stub = soffice is None
+        if stub:
+            soffice = write_stub(work_dir)
+            os.environ["HWP2PDF_STUB_STARTUP"] = str(args.startup)
+            os.environ["HWP2PDF_STUB_PAGE"] = str(args.page_latency)
+            os.environ["HWP2PDF_STUB_RSS_MB"] = str(args.stub_rss)
+            os.environ["HWP2PDF_STUB_PROFILE"] = str(args.profile_init)
+        elif args.hang_rate or args.crash_rate:
+            print("알림: 멈춤/비정상 종료 흉내는 가짜 soffice(--stub)에서만 동작합니다.", file=sys.stderr)
+
+        corpus_dir = args.corpus or os.path.join(work_dir, "corpus")
+        print(f"문서 {args.files}개 생성 중... ({corpus_dir})", file=sys.stderr)
+        corpus = generate_corpus(
+            corpus_dir, args.files, min_pages, max_pages, args.seed,
+            args.hang_rate, args.crash_rate,
+        )
+        files = corpus.pop("paths")
+
+        template = None
+        if not args.no_profile_template:
+            # 매번 같은 조건이 되도록 사용자 캐시가 아닌 작업 폴더에 템플릿을 만듦
+            print("프로필 템플릿 만드는 중...", file=sys.stderr)
+            started = time.monotonic()
+            template = ensure_template(soffice, directory=os.path.join(work_dir, "profiles"))
+            template_build = round(time.monotonic() - started, 4)
+
+        print("soffice 시작 비용 측정 중...", file=sys.stderr)
+        spawn = measure_spawn(soffice, template=template)
+        if template:
+            spawn["template_build_seconds"] = template_build
+
+        mode = MODE_SERVER if args.server else MODE_PROCESS
+        print(f"변환 중... (작업자 {args.workers}, 묶음 {args.chunk}, {mode})", file=sys.stderr)
+        results = run_benchmark(
+            soffice, files, args.workers, args.chunk, mode, args.timeout, args.attempts,
+            template,
+        )
+        if spawn["warm_seconds"] is not None and results["wall_seconds"]:
+            # 전체 작업자 시간 중 soffice 시작에 쓴 비율(추정)
+            busy = results["wall_seconds"] * min(args.workers, len(files))
+            spawn["share"] = round(min(1.0, spawn["warm_seconds"] * results["spawns"] / busy), 4)
+
+        report = {
+            "format": REPORT_FORMAT,
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "host": {
+                "platform": platform.platform(),
+                "python": platform.python_version(),
+                "cpus": os.cpu_count(),
+            },
+            "soffice": {
+                "path": soffice if not stub else "(stub)",
+                "version": soffice_version(soffice),
+                "stub": stub,
+            },
+            "config": {
+                "workers": args.workers,
+                "chunk_size": args.chunk,
+                "mode": mode,
+                "timeout": args.timeout,
+                "attempts": args.attempts,
+                "stub_startup": args.startup if stub else None,
+                "stub_page_latency": args.page_latency if stub else None,
+                "stub_profile_init": args.profile_init if stub else None,
+                "profile_template": template is not None,
+            },
+            "corpus": corpus,
+            "spawn": spawn,
+            "results": results,
+        }
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+        print(f"보고서: {args.output}", file=sys.stderr)
+    else:
+        print(text)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            old = json.load(f)
+        for line in compare(old, report):
+            print(line, file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,296 @@
+"""내용 해시 기반 변환 캐시
+
+입력 문서(HWP/HWPX)의 SHA-256과 LibreOffice 버전을 키로 변환된 PDF를 저장해 두고,
+같은 문서를 다시 변환할 때 soffice를 실행하지 않고 결과를 복원합니다.
+색인은 사용자 캐시 폴더의 SQLite 파일에 보관합니다.
+"""
+
+import hashlib
+import mmap
+import os
+import shutil
+import threading
+import time
+
+from hwp2pdf_engine import STATUS_OK, ConvertResult, user_cache_dir
+
+CACHE_FORMAT = 1
+DEFAULT_MAX_BYTES = 2 * 1024 * 1024 * 1024  # 2GB
+# 이만큼 새로 저장할 때마다 크기 상한을 확인 (--watch/--spool처럼 오래 실행해도 상한 유지)
+EVICT_CHECK_BYTES = 64 * 1024 * 1024
+EVICT_CHECK_ENTRIES = 500
+HASH_BLOCK = 1024 * 1024
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sources (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    digest TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    created REAL NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS outputs (
+    path TEXT PRIMARY KEY,
+    key TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_last_used ON entries (last_used);
+"""
+
+
+def file_digest(path):
+    """파일 전체의 SHA-256 (hex)
+
+    mmap으로 매핑해 해시하므로 큰 파일도 메모리에 한꺼번에 읽어 들이지 않습니다.
+    매핑할 수 없으면(빈 파일, 일부 네트워크 드라이브) 블록 단위로 읽습니다.
+    """
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        try:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+                h.update(m)
+            return h.hexdigest()
+        except (OSError, ValueError):
+            f.seek(0)
+        for block in iter(lambda: f.read(HASH_BLOCK), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+class ConversionCache:
+    """변환 결과 캐시 (여러 작업자 스레드에서 함께 사용)
+
+    - 입력 파일은 (경로, 크기, mtime)이 그대로면 이전에 계산한 해시를 재사용합니다.
+    - 출력 PDF가 이전에 캐시에서 쓴 그대로 남아 있으면 복사 없이 건너뜁니다.
+    - 전체 크기가 max_bytes를 넘으면 가장 오래 사용하지 않은 항목부터 지웁니다.
+      새로 저장한 양이 EVICT_CHECK_BYTES(또는 EVICT_CHECK_ENTRIES개)에 이를 때마다와 닫을 때 확인합니다.
+    - 여러 프로세스가 같은 캐시를 쓰다 색인이 잠겨 있으면(sqlite3 오류) 캐시 미적중으로 처리합니다.
+    """
+
+    def __init__(self, version, cache_dir=None, max_bytes=DEFAULT_MAX_BYTES, variant=""):
+        self.version = version
+        self.variant = variant  # PDF 내보내기 설정 (ExportProfile.cache_variant)
+        self.cache_dir = cache_dir or os.path.join(user_cache_dir(), "pdf_cache")
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._evict_lock = threading.Lock()
+        self._stored_bytes = 0  # 마지막으로 크기 상한을 확인한 뒤 저장한 양
+        self._stored_entries = 0
+        # sqlite3는 캐시를 쓸 때만 불러옴 (--no-cache로 실행하는 CLI 시작 시간)
+        import sqlite3
+        self._db = sqlite3.connect(
+            os.path.join(self.cache_dir, "index.sqlite3"),
+            check_same_thread=False,
+            timeout=30,
+        )
+        self._db.executescript(_SCHEMA)
+        self._db.commit()
+        self._db_error = sqlite3.Error
+
+    def _blob_path(self, key):
+        return os.path.join(self.cache_dir, key[:2], key + ".pdf")
+
+    def _rollback(self):
+        """실패한 쓰기를 되돌려 다른 프로세스가 색인을 쓸 수 있게 합니다. (self._lock 안에서)"""
+        try:
+            self._db.rollback()
+        except self._db_error:
+            pass
+
+    def _key(self, digest):
+        raw = f"{CACHE_FORMAT}|{self.version}|{digest}"
+        if self.variant:
+            raw += f"|{self.variant}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def digest(self, filepath):
+        """입력 파일 해시. 크기와 mtime이 같으면 저장된 값을 그대로 씁니다."""
+        path = os.path.abspath(filepath)
+        st = os.stat(path)
+        with self._lock:
+            try:
+                row = self._db.execute(
+                    "SELECT size, mtime_ns, digest FROM sources WHERE path = ?", (path,)
+                ).fetchone()
+            except self._db_error:
+                row = None
+        if row and row[0] == st.st_size and row[1] == st.st_mtime_ns:
+            return row[2]
+        digest = file_digest(path)
+        with self._lock:
+            try:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO sources (path, size, mtime_ns, digest) VALUES (?, ?, ?, ?)",
+                    (path, st.st_size, st.st_mtime_ns, digest),
+                )
+                self._db.commit()
+            except self._db_error:
+                # 색인에 남기지 못해도 해시는 맞으므로 다음에 다시 계산할 뿐
+                self._rollback()
+        return digest
+
+    def lookup(self, filepath, pdf_path):
+        """캐시에 있으면 pdf_path를 최신 상태로 만들고 ConvertResult를 반환합니다. 없으면 None."""
+        try:
+            key = self._key(self.digest(filepath))
+        except OSError:
+            with self._lock:
+                self.misses += 1
+            return None
+        blob = self._blob_path(key)
+        out = os.path.abspath(pdf_path)
+        with self._lock:
+            try:
+                entry = self._db.execute(
+                    "SELECT size FROM entries WHERE key = ?", (key,)
+                ).fetchone()
+                written = self._db.execute(
+                    "SELECT key, size, mtime_ns FROM outputs WHERE path = ?", (out,)
+                ).fetchone()
+            except self._db_error:
+                entry = None
+        if entry is None or not os.path.isfile(blob):
+            with self._lock:
+                self.misses += 1
+            return None
+
+        try:
+            st = os.stat(out)
+            current = written == (key, st.st_size, st.st_mtime_ns)
+        except OSError:
+            current = False
+        try:
+            if not current:
+                # 캐시에서 복원 (임시 파일에 쓴 뒤 교체)
+                os.makedirs(os.path.dirname(out), exist_ok=True)
+                tmp = out + f".{threading.get_ident()}.tmp"
+                shutil.copyfile(blob, tmp)
+                os.replace(tmp, out)
+                self._remember_output(out, key)
+        except (OSError, self._db_error):
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+            try:
+                self._db.execute(
+                    "UPDATE entries SET last_used = ? WHERE key = ?", (time.time(), key)
+                )
+                self._db.commit()
+            except self._db_error:
+                self._rollback()
+        result = ConvertResult(filepath, STATUS_OK, pdf_path=pdf_path)
+        result.cached = True
+        return result
+
+    def _remember_output(self, out, key):
+        st = os.stat(out)
+        with self._lock:
+            try:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO outputs (path, key, size, mtime_ns) VALUES (?, ?, ?, ?)",
+                    (out, key, st.st_size, st.st_mtime_ns),
+                )
+                self._db.commit()
+            except self._db_error:
+                self._rollback()
+                raise
+
+    def store(self, filepath, pdf_path, source=None):
+        """변환에 성공한 PDF를 캐시에 넣습니다.
+
+        source가 있으면 pdf_path(예: 네트워크 폴더) 대신 그 사본(로컬 스크래치)에서 읽습니다.
+        """
+        try:
+            key = self._key(self.digest(filepath))
+            blob = self._blob_path(key)
+            os.makedirs(os.path.dirname(blob), exist_ok=True)
+            tmp = blob + f".{threading.get_ident()}.tmp"
+            shutil.copyfile(source or pdf_path, tmp)
+            os.replace(tmp, blob)
+            size = os.path.getsize(blob)
+            out = os.path.abspath(pdf_path)
+            now = time.time()
+            with self._lock:
+                try:
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO entries (key, size, created, last_used) VALUES (?, ?, ?, ?)",
+                        (key, size, now, now),
+                    )
+                    self._db.commit()
+                except self._db_error:
+                    self._rollback()
+                    raise
+                self._stored_bytes += size
+                self._stored_entries += 1
+                check = (self._stored_bytes >= min(EVICT_CHECK_BYTES, self.max_bytes // 10)
+                         or self._stored_entries >= EVICT_CHECK_ENTRIES)
+            self._remember_output(out, key)
+        except (OSError, self._db_error):
+            return
+        if check:
+            self.evict()
+
+    def total_bytes(self):
+        with self._lock:
+            return self._db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    def evict(self):
+        """크기 상한을 넘는 만큼 오래 쓰지 않은 항목부터 지웁니다. 지운 항목 수를 반환합니다.
+
+        다른 작업자가 이미 지우는 중이면 기다리지 않고 0을 반환합니다.
+        """
+        if not self._evict_lock.acquire(blocking=False):
+            return 0
+        try:
+            with self._lock:
+                self._stored_bytes = 0
+                self._stored_entries = 0
+            return self._evict()
+        except self._db_error:
+            with self._lock:
+                self._rollback()
+            return 0
+        finally:
+            self._evict_lock.release()
+
+    def _evict(self):
+        removed = 0
+        total = self.total_bytes()
+        if total <= self.max_bytes:
+            return 0
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT key, size FROM entries ORDER BY last_used"
+            ).fetchall()
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(self._blob_path(key))
+            except OSError:
+                pass
+            with self._lock:
+                self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self._db.execute("DELETE FROM outputs WHERE key = ?", (key,))
+            total -= size
+            removed += 1
+        with self._lock:
+            self._db.commit()
+        return removed
+
+    def close(self):
+        self.evict()
+        with self._lock:
+            self._db.close()
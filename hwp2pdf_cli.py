@@ -0,0 +1,543 @@
+#!/usr/bin/env python3
+"""HWP/HWPX → PDF 대량 변환 CLI
+
+사용법:
+  python3 hwp2pdf_cli.py [입력폴더] [출력폴더] [옵션]
+
+입력폴더를 지정하지 않으면 현재 디렉토리의 HWP/HWPX 파일을 변환합니다.
+출력폴더를 지정하지 않으면 입력폴더와 같은 위치에 PDF를 생성합니다.
+--watch를 주면 입력폴더를 계속 감시하며 새로 생기거나 바뀐 파일을 변환합니다.
+--spool을 주면 공유 스풀 폴더에 작업을 넣거나(--submit) 여러 컴퓨터에서 나누어 변환합니다.
+"""
+
+import argparse
+import csv
+import itertools
+import os
+import signal
+import sys
+import time
+
+from hwp2pdf_cache import DEFAULT_MAX_BYTES, ConversionCache
+from hwp2pdf_dedup import InputDeduper
+from hwp2pdf_engine import (
+    MODE_PROCESS,
+    MODE_SERVER,
+    convert_batch,
+    default_workers,
+    find_soffice,
+    iter_hwp_files,
+    parse_formats,
+    server_available,
+    soffice_version,
+)
+from hwp2pdf_export import DEFAULT_PROFILE, PROFILES, parse_profile
+from hwp2pdf_journal import JobJournal, latest_unfinished
+from hwp2pdf_journal import load as load_journal
+from hwp2pdf_metrics import BatchMetrics
+from hwp2pdf_profile import ensure_template
+from hwp2pdf_schedule import CostModel
+from hwp2pdf_spool import DEFAULT_JOB_SIZE, DEFAULT_LEASE, Spool, SpoolError, SpoolFeed
+from hwp2pdf_watch import DEFAULT_SETTLE, METHOD_INOTIFY, FolderWatcher
+from hwp2pdf_watchdog import DEFAULT_RSS_LIMIT, MAX_ATTEMPTS, STALL_SECONDS, Quarantine, Watchdog
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="HWP/HWPX → PDF 대량 변환")
+    parser.add_argument("input_dir", nargs="?", default=".", help="입력 폴더 (기본: 현재 폴더)")
+    parser.add_argument("output_dir", nargs="?", default="", help="출력 폴더 (기본: 입력 폴더)")
+    parser.add_argument(
+        "-r", "--recursive", action="store_true",
+        help="하위 폴더까지 검색",
+    )
+    parser.add_argument(
+        "--include", action="append", default=[], metavar="GLOB",
+        help="이 패턴과 맞는 파일만 변환 (여러 번 지정 가능)",
+    )
+    parser.add_argument(
+        "--exclude", action="append", default=[], metavar="GLOB",
+        help="이 패턴과 맞는 파일/폴더 제외 (여러 번 지정 가능)",
+    )
+    parser.add_argument(
+        "-j", "--workers", type=int, default=default_workers(),
+        help="동시 변환 수 (기본: CPU 코어 수)",
+    )
+    parser.add_argument(
+        "--server", action="store_true",
+        help="상주 LibreOffice 인스턴스를 UNO로 재사용 (pyuno 필요)",
+    )
+    parser.add_argument(
+        "--chunk", type=int, default=1, metavar="K",
+        help="soffice 한 번에 변환할 파일 수 (일반 모드, 기본: 1)",
+    )
+    parser.add_argument(
+        "--formats", default="pdf", metavar="LIST",
+        help="함께 만들 출력 형식, 쉼표로 구분 (pdf, txt, png; 예: pdf,txt,png, PDF는 항상 만듦)",
+    )
+    parser.add_argument(
+        "--pdf-profile", default=DEFAULT_PROFILE, metavar="NAME[:OPT=VAL,...]",
+        help=f"PDF 내보내기 프로필 ({', '.join(PROFILES)}), 옵션으로 덮어쓰기 가능 "
+             "(quality, dpi, lossless, pdfa, tagged, fonts; 예: compact:quality=60,pdfa=2)",
+    )
+    parser.add_argument(
+        "--dedup-images", action="store_true",
+        help="만든 PDF에서 내용이 같은 이미지 객체를 하나로 합쳐 크기를 줄임",
+    )
+    parser.add_argument(
+        "--no-cache", action="store_true",
+        help="변환 캐시를 사용하지 않음",
+    )
+    parser.add_argument(
+        "--cache-size", type=int, default=DEFAULT_MAX_BYTES // (1024 * 1024), metavar="MB",
+        help="변환 캐시 최대 크기 (MB, 기본: 2048)",
+    )
+    parser.add_argument(
+        "--no-dedup", action="store_true",
+        help="내용이 같은 파일도 각각 변환 (기본: 한 번만 변환하고 PDF를 reflink/복사)",
+    )
+    parser.add_argument(
+        "--dedup-hardlink", action="store_true",
+        help="같은 내용의 PDF를 하드 링크로 만듦 (공간 절약, 하나를 고치면 모든 사본이 바뀜)",
+    )
+    parser.add_argument(
+        "--no-stage", action="store_true",
+        help="로컬 스크래치 폴더를 거치지 않고 출력 폴더에 바로 변환",
+    )
+    parser.add_argument(
+        "--no-profile-template", action="store_true",
+        help="초기화된 LibreOffice 프로필 템플릿을 쓰지 않고 빈 프로필로 시작",
+    )
+    parser.add_argument(
+        "--no-preflight", action="store_true",
+        help="변환 전 사전 검사(빈 파일, 손상/암호 문서 거르기)를 하지 않음",
+    )
+    parser.add_argument(
+        "--no-schedule", action="store_true",
+        help="예상 변환 시간 순서/파일별 시간 제한을 쓰지 않음 (입력 순서, 120초 고정)",
+    )
+    parser.add_argument(
+        "--cost-report", metavar="CSV",
+        help="파일별 예상 시간과 실제 시간을 CSV로 저장",
+    )
+    parser.add_argument(
+        "--metrics", metavar="JSONL",
+        help="파일별 단계 시간(대기, 사전 검사, 실행, 변환, 확인)과 크기를 JSON Lines로 저장",
+    )
+    parser.add_argument(
+        "--prom", metavar="FILE",
+        help="Prometheus textfile collector용 지표 파일 (변환이 끝날 때 기록)",
+    )
+    parser.add_argument(
+        "--prom-interval", type=float, metavar="SEC",
+        help="변환 중에도 이 간격(초)으로 --prom 파일 갱신",
+    )
+    parser.add_argument(
+        "--max-memory", type=int, default=DEFAULT_RSS_LIMIT // (1024 * 1024), metavar="MB",
+        help="soffice 하나(하위 프로세스 포함)의 메모리 상한 (MB, 기본: 2048, 0이면 없음, Linux/macOS만)",
+    )
+    parser.add_argument(
+        "--stall", type=int, default=STALL_SECONDS, metavar="SEC",
+        help="이 시간 동안 CPU를 쓰지 않으면 멈춘 것으로 보고 종료 (초, 기본: 60, 0이면 없음, Linux/macOS만)",
+    )
+    parser.add_argument(
+        "--attempts", type=int, default=MAX_ATTEMPTS, metavar="N",
+        help="강제 종료된 파일의 최대 시도 횟수 (기본: 3)",
+    )
+    parser.add_argument(
+        "--retry-quarantined", action="store_true",
+        help="격리 목록을 비우고 격리된 파일도 다시 변환",
+    )
+    parser.add_argument(
+        "--watch", action="store_true",
+        help="입력 폴더를 계속 감시하며 새로 생기거나 바뀐 파일을 변환 (Ctrl+C로 종료)",
+    )
+    parser.add_argument(
+        "--watch-dir", action="append", default=[], metavar="DIR",
+        help="--watch에서 함께 감시할 입력 폴더 (여러 번 지정 가능)",
+    )
+    parser.add_argument(
+        "--settle", type=float, default=DEFAULT_SETTLE, metavar="SEC",
+        help="크기와 수정 시각이 이 시간 동안 바뀌지 않은 파일만 변환 (--watch, 기본: 2초)",
+    )
+    parser.add_argument(
+        "--poll", type=float, metavar="SEC",
+        help="inotify 대신 이 간격(초)으로 폴더를 다시 검색 (--watch, 네트워크 드라이브 등)",
+    )
+    parser.add_argument(
+        "--spool", metavar="DIR",
+        help="공유 스풀 폴더의 작업을 가져와 변환 (여러 컴퓨터에서 함께 실행)",
+    )
+    parser.add_argument(
+        "--submit", action="store_true",
+        help="입력 폴더의 파일을 --spool에 작업으로 넣기만 함",
+    )
+    parser.add_argument(
+        "--spool-status", action="store_true",
+        help="--spool의 진행 상황과 결과 집계를 출력",
+    )
+    parser.add_argument(
+        "--job-size", type=int, default=DEFAULT_JOB_SIZE, metavar="N",
+        help="--submit에서 작업 하나에 넣을 파일 수 (기본: 50)",
+    )
+    parser.add_argument(
+        "--lease", type=float, default=DEFAULT_LEASE, metavar="SEC",
+        help="--submit: 작업자가 이 시간 동안 응답이 없으면 작업을 다른 작업자에게 넘김 (기본: 300초)",
+    )
+    parser.add_argument(
+        "--resume", nargs="?", const="last", metavar="JOURNAL",
+        help="중단된 작업을 이어서 변환 (기록 파일 경로, 생략 시 마지막 작업)",
+    )
+    return parser.parse_args(argv)
+
+
+def write_cost_report(path, results):
+    """파일별 크기, 구역/쪽 수, 예상 시간, 시간 제한, 실제 시간을 CSV로 저장합니다."""
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow([
+            "path", "format", "size", "sections", "pages",
+            "estimate", "timeout", "elapsed", "status", "cached",
+        ])
+        for r in results:
+            try:
+                size = os.path.getsize(r.filepath)
+            except OSError:
+                size = ""
+            info = r.info
+            kind = info.kind if info is not None and info.kind else ""
+            writer.writerow([
+                r.filepath,
+                kind or os.path.splitext(r.filepath)[1].lower().lstrip("."),
+                size,
+                "" if info is None or info.sections is None else info.sections,
+                "" if info is None or info.pages is None else info.pages,
+                "" if r.estimate is None else f"{r.estimate:.3f}",
+                "" if r.timeout is None else f"{r.timeout:.0f}",
+                f"{r.elapsed:.3f}",
+                r.status,
+                int(r.cached),
+            ])
+
+
+def submit_spool(args):
+    """입력 폴더의 파일을 스풀에 작업으로 넣습니다."""
+    if not os.path.isdir(args.input_dir):
+        print(f"오류: 입력 폴더를 찾을 수 없습니다: {args.input_dir}")
+        return 1
+    input_dir = os.path.abspath(args.input_dir)
+    output_dir = os.path.abspath(args.output_dir) if args.output_dir else ""
+    try:
+        spool = Spool.create(args.spool, output_dir, lease=args.lease)
+    except (OSError, SpoolError) as e:
+        print(f"오류: {e}")
+        return 1
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    found = iter_hwp_files(
+        [input_dir], recursive=args.recursive, include=args.include, exclude=args.exclude,
+    )
+    jobs, count = spool.submit(found, max(1, args.job_size))
+    print(f"작업 {jobs}개 (파일 {count}개)를 넣었습니다: {spool.path}")
+    print(f"작업자 실행: python3 hwp2pdf_cli.py --spool {spool.path}")
+    return 0
+
+
+def print_spool_status(spool):
+    """스풀 전체의 진행 상황, 작업자별 처리 수, 실패한 파일을 출력합니다."""
+    st = spool.status()
+    print("=========================================")
+    print(f" 스풀: {spool.path}")
+    print("=========================================")
+    print(f" 작업: 대기 {st.pending}, 변환 중 {st.leased}, 완료 {st.done}, 포기 {st.failed}")
+    print(f" 파일: 성공 {st.success}, 실패 {st.fail} / {st.total}")
+    if st.submitting:
+        print(" (작업을 넣는 중)")
+    elif st.finished:
+        print(" 모든 작업이 끝났습니다.")
+    if st.workers:
+        print("")
+        print(" 작업자:")
+        for name, counts, age in st.workers:
+            if counts.get("stopped"):
+                state = "종료"
+            elif age < spool.lease:
+                state = "실행 중"
+            else:
+                state = "응답 없음"
+            print(f"   - {name}: 작업 {counts.get('jobs', 0)}, 성공 {counts.get('success', 0)},"
+                  f" 실패 {counts.get('fail', 0)} ({state}, {age:.0f}초 전)")
+    if st.failures:
+        print("")
+        print(" 실패한 파일:")
+        for path, message in st.failures:
+            print(f"   - {path} ({message})")
+        if st.fail > len(st.failures):
+            print(f"   ... 외 {st.fail - len(st.failures)}개 ({spool.dir('done')} 참고)")
+    print("=========================================")
+    return 0
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    try:
+        formats = parse_formats(args.formats)
+        export = parse_profile(args.pdf_profile, args.dedup_images)
+    except ValueError as e:
+        print(f"오류: {e}")
+        return 1
+
+    state = None
+    spool = None
+    if args.watch and args.resume:
+        print("오류: --watch와 --resume은 함께 쓸 수 없습니다.")
+        return 1
+    if (args.submit or args.spool_status) and not args.spool:
+        print("오류: --submit과 --spool-status는 --spool과 함께 써야 합니다.")
+        return 1
+    if args.spool:
+        if args.watch or args.resume:
+            print("오류: --spool은 --watch/--resume과 함께 쓸 수 없습니다.")
+            return 1
+        if args.submit:
+            return submit_spool(args)
+        try:
+            spool = Spool(args.spool)
+        except SpoolError as e:
+            print(f"오류: {e} (--submit으로 먼저 작업을 넣으세요)")
+            return 1
+        if args.spool_status:
+            return print_spool_status(spool)
+        input_dir = f"(스풀: {spool.path})"
+        output_dir = spool.output_dir
+    elif args.resume:
+        state = latest_unfinished() if args.resume == "last" else load_journal(args.resume)
+        if state is None or not state.pending:
+            print("이어서 변환할 작업이 없습니다.")
+            return 0
+        input_dir = f"(이어하기: {state.job_id})"
+        output_dir = state.output_dir
+    else:
+        # 입력 폴더 확인
+        if not os.path.isdir(args.input_dir):
+            print(f"오류: 입력 폴더를 찾을 수 없습니다: {args.input_dir}")
+            return 1
+
+        for folder in args.watch_dir:
+            if not os.path.isdir(folder):
+                print(f"오류: 감시할 폴더를 찾을 수 없습니다: {folder}")
+                return 1
+
+        # 출력 폴더 설정 (절대 경로)
+        input_dir = os.path.abspath(args.input_dir)
+        output_dir = os.path.abspath(args.output_dir or input_dir)
+        if args.watch and args.watch_dir and not args.output_dir:
+            # 여러 폴더를 감시하면 PDF는 각 원본 옆에 만듦
+            output_dir = ""
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+
+    # LibreOffice 확인
+    soffice = find_soffice()
+    if not soffice:
+        print("오류: LibreOffice가 설치되어 있지 않습니다.")
+        print("  brew install --cask libreoffice")
+        return 1
+
+    mode = MODE_SERVER if args.server else MODE_PROCESS
+    if mode == MODE_SERVER and not server_available(soffice):
+        print("알림: UNO 파이썬 모듈을 찾을 수 없어 일반 모드로 변환합니다.")
+        mode = MODE_PROCESS
+
+    watcher = None
+    feed = None  # 끝나지 않는 입력 (폴더 감시, 스풀)
+    if spool is not None:
+        feed = SpoolFeed(spool, prefetch=args.workers * 2)
+        files = feed
+    elif state:
+        files = state.pending
+        formats = tuple(state.options.get("formats", formats))
+        export = parse_profile(
+            state.options.get("pdf_profile", args.pdf_profile),
+            state.options.get("dedup_images", args.dedup_images),
+        )
+    elif args.watch:
+        watcher = FolderWatcher(
+            [input_dir] + [os.path.abspath(d) for d in args.watch_dir], output_dir,
+            recursive=args.recursive, include=args.include, exclude=args.exclude,
+            settle=args.settle, poll_interval=args.poll,
+        )
+        files = feed = watcher
+    else:
+        # 폴더를 검색하면서 찾는 대로 변환
+        found = iter_hwp_files(
+            [input_dir], recursive=args.recursive,
+            include=args.include, exclude=args.exclude,
+        )
+        first = next(found, None)
+        if first is None:
+            print(f"변환할 HWP/HWPX 파일이 없습니다: {input_dir}")
+            return 0
+        files = itertools.chain([first], found)
+
+    print("=========================================")
+    print(" HWP → PDF 대량 변환")
+    print("=========================================")
+    print(f" 입력: {input_dir}")
+    for folder in args.watch_dir if watcher is not None else ():
+        print(f"       {os.path.abspath(folder)}")
+    print(f" 출력: {output_dir or '(원본 파일과 같은 폴더)'}")
+    if not export.is_default:
+        print(f" PDF 프로필: {export.label()}")
+    if state:
+        print(f" 파일 수: {len(files)}")
+        print(f" 이전 실행: 성공 {state.success}, 실패 {state.fail}")
+    if watcher is not None:
+        if watcher.method == METHOD_INOTIFY:
+            print(" 감시: inotify (Ctrl+C로 종료)")
+        else:
+            print(f" 감시: {watcher.poll_interval:g}초마다 폴더 검색 (Ctrl+C로 종료)")
+    if spool is not None:
+        print(f" 작업자: {feed.worker} (임대 시간 {spool.lease:g}초, Ctrl+C로 종료)")
+    print("=========================================")
+    print("")
+
+    report_rows = []
+    quarantined = []
+
+    def _on_result(idx, result, summary):
+        status = "완료" if result.ok and not result.output_errors else result.message()
+        if spool is not None:
+            feed.record(result)
+        if feed is not None:
+            # 끝나지 않는 작업이므로 진행 수 대신 시각 표시
+            print(f"[{time.strftime('%H:%M:%S')}] {result.name} ... {status}", flush=True)
+        else:
+            print(f"[{summary.done}/{summary.total}] {result.name} ... {status}", flush=True)
+        if result.quarantined:
+            quarantined.append(result.filepath)
+        if args.cost_report:
+            report_rows.append(result)
+
+    version = soffice_version(soffice)
+    cache = None
+    if not args.no_cache:
+        cache = ConversionCache(
+            version, max_bytes=args.cache_size * 1024 * 1024, variant=export.cache_variant(),
+        )
+    template = None
+    if not args.no_profile_template:
+        template = ensure_template(soffice, version)
+        if template is None:
+            print("알림: LibreOffice 프로필 템플릿을 만들 수 없어 빈 프로필로 시작합니다.")
+    scheduler = None if args.no_schedule else CostModel(mode)
+    dedupe = None
+    if not args.no_dedup and feed is None:
+        dedupe = InputDeduper(cache.digest if cache is not None else None, args.dedup_hardlink)
+    watchdog = Watchdog(
+        rss_limit=args.max_memory * 1024 * 1024, stall_seconds=args.stall,
+        attempts=args.attempts,
+    )
+    quarantine = Quarantine()
+    if args.retry_quarantined:
+        quarantine.clear()
+    metrics = None
+    if args.metrics or args.prom:
+        metrics = BatchMetrics(
+            args.metrics, args.prom, args.prom_interval,
+            job=os.path.basename(spool.path if spool is not None else os.path.normpath(input_dir)),
+        )
+    if feed is not None:
+        # 감시 모드는 다시 시작하면 PDF가 없거나 오래된 파일을 찾아 이어서 변환하고,
+        # 스풀은 끝나지 않은 작업을 대기로 되돌리므로 작업 기록 없음
+        journal = None
+
+        def _stop(signum, frame):
+            watchdog.cancel()
+            feed.close()
+
+        signal.signal(signal.SIGINT, _stop)
+        signal.signal(signal.SIGTERM, _stop)
+    elif state:
+        journal = JobJournal.reopen(state)
+    else:
+        journal = JobJournal.create(output_dir=output_dir, options={
+            "workers": args.workers, "mode": mode, "chunk_size": args.chunk,
+            "schedule": scheduler is not None, "formats": list(formats),
+            "pdf_profile": args.pdf_profile, "dedup_images": args.dedup_images,
+        })
+    try:
+        summary = convert_batch(
+            soffice, files, output_dir,
+            workers=args.workers, mode=mode, chunk_size=args.chunk, cache=cache,
+            journal=journal, scheduler=scheduler, watchdog=watchdog,
+            quarantine=quarantine, preflight=not args.no_preflight, metrics=metrics,
+            dedupe=dedupe, stage=not args.no_stage, profile_template=template,
+            continuous=feed is not None, formats=formats, export=export, on_result=_on_result,
+        )
+    except KeyboardInterrupt:
+        print("\n중단됨.")
+        # --watch/--spool은 작업 기록 없이 실행됨
+        if journal is not None:
+            journal.close()
+            print("다음 명령으로 이어서 변환할 수 있습니다:")
+            print(f"  python3 hwp2pdf_cli.py --resume {journal.path}")
+        return 130
+    except Exception as e:
+        print(f"\n오류로 변환을 중단했습니다: {e}", file=sys.stderr)
+        if journal is not None:
+            journal.close()
+            print("원인을 해결한 뒤 다음 명령으로 이어서 변환할 수 있습니다:", file=sys.stderr)
+            print(f"  python3 hwp2pdf_cli.py --resume {journal.path}", file=sys.stderr)
+        return 1
+    finally:
+        if cache is not None:
+            cache.close()
+        if scheduler is not None:
+            scheduler.save()
+        quarantine.save()
+        if metrics is not None:
+            metrics.close()
+        if args.cost_report:
+            write_cost_report(args.cost_report, report_rows)
+    if journal is not None:
+        journal.close(finished=True)
+
+    print("")
+    print("=========================================")
+    print(" 변환 결과")
+    print("=========================================")
+    print(f" 성공: {summary.success} / {summary.total}")
+    print(f" 실패: {summary.fail} / {summary.total}")
+    for fmt in formats:
+        ok, failed = summary.format_counts.get(fmt, (0, 0))
+        print(f" {fmt}: 성공 {ok}, 실패 {failed}")
+    if summary.success:
+        print(f" {summary.size_text()}")
+    if cache is not None:
+        print(f" 캐시 적중: {cache.hits}, 미적중: {cache.misses}")
+    if dedupe is not None and dedupe.summary():
+        print(f" {dedupe.summary()}")
+    if scheduler is not None and scheduler.error_summary():
+        print(f" {scheduler.error_summary()}")
+    if watchdog.summary():
+        print(f" {watchdog.summary()}")
+    if spool is not None:
+        print(f" 처리한 작업: {feed.jobs_done}개 (전체 집계: --spool {spool.path} --spool-status)")
+
+    if summary.fail > 0:
+        print("")
+        print(" 실패한 파일:")
+        for name, message in summary.failures:
+            print(f"   - {name} ({message})")
+        if quarantined:
+            print("")
+            print(f" 격리된 파일 {len(quarantined)}개는 다음 실행부터 건너뜁니다.")
+            print(" 다시 변환하려면 --retry-quarantined 옵션을 사용하세요.")
+
+    print("=========================================")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,213 @@
+"""같은 내용의 입력 문서를 한 번만 변환하기
+
+보관 폴더마다 복사된 같은 양식처럼 내용이 똑같은 문서는 첫 파일(대표)만 변환하고,
+나머지는 대표의 PDF(와 함께 만든 txt, png)를 각자의 출력 위치(원래 이름 + 확장자)에
+reflink(파일 시스템 복제), 복사 중 되는 방법으로 만듭니다. 하드 링크는 파일 하나를 고치면
+(다시 변환, 편집 프로그램에서 저장 등) 모든 사본이 함께 바뀌므로 요청할 때만 씁니다.
+
+파일 크기가 앞선 파일과 겹칠 때만 내용 해시(SHA-256, mmap)를 계산하므로, 중복이 없는
+입력은 해시 비용이 들지 않습니다.
+"""
+
+import os
+import shutil
+import sys
+import threading
+import time
+
+from hwp2pdf_cache import file_digest
+from hwp2pdf_engine import STATUS_ERROR, STATUS_OK, ConvertResult, output_path
+
+PLACE_HARDLINK = "hardlink"
+PLACE_REFLINK = "reflink"
+PLACE_COPY = "copy"
+
+_FICLONE = 0x40049409  # linux/fs.h
+
+
+def reflink(src, dst):
+    """파일 시스템이 지원하면 내용을 공유하는 복제본을 만듭니다 (Btrfs, XFS, APFS 등)."""
+    if sys.platform.startswith("linux"):
+        import fcntl
+        with open(src, "rb") as s, open(dst, "wb") as d:
+            fcntl.ioctl(d.fileno(), _FICLONE, s.fileno())
+        return
+    if sys.platform == "darwin":
+        import ctypes
+        libc = ctypes.CDLL(None, use_errno=True)
+        if libc.clonefile(os.fsencode(src), os.fsencode(dst), 0) != 0:
+            raise OSError(ctypes.get_errno(), "clonefile 실패")
+        return
+    raise OSError("reflink를 지원하지 않는 플랫폼")
+
+
+def place_file(src, dst, hardlink=False):
+    """src와 같은 내용의 파일을 dst에 만들고 사용한 방법(PLACE_*)을 반환합니다.
+
+    reflink, 복사 순으로 시도하며(hardlink가 참이면 하드 링크를 먼저), 임시 파일에 만든 뒤
+    교체하므로 dst에 이전 파일이 있어도 중간 상태가 보이지 않습니다.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(dst)), exist_ok=True)
+    tmp = dst + f".{threading.get_ident()}.tmp"
+    methods = (PLACE_REFLINK, PLACE_COPY)
+    if hardlink:
+        methods = (PLACE_HARDLINK,) + methods
+    for method in methods:
+        try:
+            if os.path.lexists(tmp):
+                os.remove(tmp)
+            if method == PLACE_HARDLINK:
+                os.link(src, tmp)
+            elif method == PLACE_REFLINK:
+                reflink(src, tmp)
+            else:
+                shutil.copyfile(src, tmp)
+            os.replace(tmp, dst)
+            return method
+        except (OSError, AttributeError):
+            if method == PLACE_COPY:
+                try:
+                    os.remove(tmp)
+                except OSError:
+                    pass
+                raise
+    return PLACE_COPY
+
+
+class InputDeduper:
+    """일괄 변환 하나의 중복 입력 판별과 절약량 집계 (여러 작업자 스레드에서 함께 사용)
+
+    add()는 파일을 찾은 순서대로 한 스레드(생산자)에서 호출하고, 대표 파일의 변환이
+    끝나면 finished()가 그 결과를 기다리던 중복 파일들의 결과를 만들어 돌려줍니다.
+    digest(filepath)를 주면(예: ConversionCache.digest) 저장된 해시를 재사용합니다.
+    hardlink가 참이면 사본을 하드 링크로 먼저 만들어 봅니다 (모든 사본이 같은 파일이 됨).
+    """
+
+    def __init__(self, digest=None, hardlink=False):
+        self.digest = digest or file_digest
+        self.hardlink = hardlink
+        self.duplicates = 0
+        self.bytes_saved = 0
+        self.seconds_saved = 0.0
+        self.hash_seconds = 0.0
+        self.methods = {}  # PLACE_* -> 횟수
+        self._lock = threading.Lock()
+        self._by_size = {}  # 크기 -> 해시를 아직 계산하지 않은 대표 [(index, 경로)]
+        self._leaders = {}  # (크기, 해시) -> 대표 index
+        self._paths = {}  # 대표 index -> 경로
+        self._waiting = {}  # 대표 index -> [(index, 경로, 출력 PDF 경로)]
+        self._results = {}  # 끝난 대표 index -> ConvertResult
+
+    def _hash(self, filepath):
+        started = time.monotonic()
+        try:
+            return self.digest(filepath)
+        except OSError:
+            return None
+        finally:
+            self.hash_seconds += time.monotonic() - started
+
+    def _leader_for(self, index, filepath):
+        """같은 내용의 앞선 파일(대표) index. 처음 보는 내용이면 대표로 등록하고 None."""
+        try:
+            size = os.path.getsize(filepath)
+        except OSError:
+            return None
+        pending = self._by_size.get(size)
+        if pending is None:
+            # 크기가 처음이면 해시 없이 대표로 둠
+            self._by_size[size] = [(index, filepath)]
+            self._paths[index] = filepath
+            return None
+        # 크기가 겹치면 그 크기의 대표들도 이때 처음 해시함
+        for other, path in pending:
+            digest = self._hash(path)
+            if digest is not None:
+                self._leaders.setdefault((size, digest), other)
+        pending.clear()
+        digest = self._hash(filepath)
+        if digest is None:
+            return None
+        leader = self._leaders.setdefault((size, digest), index)
+        if leader == index:
+            self._paths[index] = filepath
+            return None
+        return leader
+
+    def add(self, index, filepath, pdf_path):
+        """중복이 아니면 None, 중복이면 ("wait", None) 또는 ("done", 결과)를 반환합니다.
+
+        대표의 변환이 이미 끝났으면 그 자리에서 PDF를 만들어 결과를 돌려주고,
+        아직이면 대표가 끝날 때 finished()가 결과를 만듭니다.
+        """
+        leader = self._leader_for(index, filepath)
+        if leader is None:
+            return None
+        with self._lock:
+            done = self._results.get(leader)
+            if done is None:
+                self._waiting.setdefault(leader, []).append((index, filepath, pdf_path))
+                return "wait", None
+        return "done", self._follow(done, filepath, pdf_path)
+
+    def finished(self, index, result):
+        """대표 결과를 기록하고, 기다리던 중복 파일의 [(index, 결과)]를 반환합니다."""
+        with self._lock:
+            if index not in self._paths:
+                return []
+            self._results[index] = result
+            waiting = self._waiting.pop(index, [])
+        return [(i, self._follow(result, path, pdf)) for i, path, pdf in waiting]
+
+    def _follow(self, leader, filepath, pdf_path):
+        started = time.monotonic()
+        method = None
+        if not leader.ok:
+            result = ConvertResult(filepath, leader.status, detail=leader.detail)
+        else:
+            try:
+                if os.path.abspath(pdf_path) != os.path.abspath(leader.pdf_path):
+                    method = place_file(leader.pdf_path, pdf_path, self.hardlink)
+                result = ConvertResult(filepath, STATUS_OK, pdf_path=pdf_path)
+            except OSError as e:
+                result = ConvertResult(filepath, STATUS_ERROR, detail=f"PDF를 만들 수 없음: {e}")
+            else:
+                # PDF와 함께 만든 형식(txt, png)도 같은 방법으로 만듦
+                outdir = os.path.dirname(pdf_path)
+                for fmt, src in leader.outputs.items():
+                    dst = output_path(filepath, outdir, fmt)
+                    try:
+                        if os.path.abspath(dst) != os.path.abspath(src):
+                            place_file(src, dst, self.hardlink)
+                        result.outputs[fmt] = dst
+                    except OSError as e:
+                        result.output_errors[fmt] = f"만들 수 없음: {e}"
+            result.output_errors.update(leader.output_errors)
+        result.duplicate_of = leader.filepath
+        result.elapsed = time.monotonic() - started
+        result.phases["dedup"] = result.elapsed
+        with self._lock:
+            self.duplicates += 1
+            self.bytes_saved += os.path.getsize(filepath) if os.path.exists(filepath) else 0
+            self.seconds_saved += max(0.0, leader.elapsed - result.elapsed)
+            if result.ok and method:
+                self.methods[method] = self.methods.get(method, 0) + 1
+        return result
+
+    def summary(self):
+        """중복 처리 요약 문구 (중복이 없으면 빈 문자열)"""
+        if not self.duplicates:
+            return ""
+        if self.bytes_saved >= 1024 * 1024:
+            size = f"{self.bytes_saved / (1024 * 1024):.1f}MB"
+        else:
+            size = f"{self.bytes_saved / 1024:.0f}KB"
+        text = (
+            f"중복 문서: {self.duplicates}개는 변환하지 않음 "
+            f"(입력 {size}, 약 {self.seconds_saved:.1f}초 절약, 해시 {self.hash_seconds:.1f}초)"
+        )
+        names = {PLACE_HARDLINK: "하드 링크", PLACE_REFLINK: "reflink", PLACE_COPY: "복사"}
+        used = [f"{names[m]} {n}" for m, n in self.methods.items()]
+        if used:
+            text += " - " + ", ".join(used)
+        return text
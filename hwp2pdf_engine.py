@@ -0,0 +1,1245 @@
+"""HWP/HWPX → PDF 변환 엔진 (GUI/CLI 공용)"""
+
+import collections
+import fnmatch
+import heapq
+import json
+import os
+import platform
+import queue
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+
+IS_WINDOWS = platform.system() == "Windows"
+
+SOFFICE_PATHS_MAC = [
+    "/Applications/LibreOffice.app/Contents/MacOS/soffice",
+    "/usr/bin/soffice",
+    "/usr/local/bin/soffice",
+]
+
+SOFFICE_PATHS_WIN = [
+    os.path.join(os.environ.get("PROGRAMFILES", r"C:\Program Files"), "LibreOffice", "program", "soffice.exe"),
+    os.path.join(os.environ.get("PROGRAMFILES(X86)", r"C:\Program Files (x86)"), "LibreOffice", "program", "soffice.exe"),
+]
+
+HWP_EXTENSIONS = (".hwp", ".hwpx")
+
+DEFAULT_TIMEOUT = 120
+SOFFICE_CACHE_NAME = "soffice.json"  # 찾은 soffice 경로와 버전 (사용자 캐시 폴더)
+MAX_KEPT_FAILURES = 1000  # 끝나지 않는 일괄 변환(continuous)에서 보관하는 최근 실패 수
+PDF_TRAILER_BYTES = 1024  # PDF 끝 표시(%%EOF)를 찾는 범위
+
+# 출력 형식 -> (soffice --convert-to 인자, UNO 필터 이름, 필터 옵션)
+# PDF는 항상 만들고, 나머지는 같은 문서에서 함께 저장합니다.
+OUTPUT_FORMATS = {
+    "pdf": ("pdf", "writer_pdf_Export", ""),
+    "txt": ("txt:Text (encoded):UTF8", "Text (encoded)", "UTF8"),  # 검색 색인용 본문 텍스트
+    "png": ("png", "writer_png_Export", ""),  # 첫 쪽 미리보기
+}
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+# 변환 방식
+MODE_PROCESS = "process"  # 파일마다 soffice 실행
+MODE_SERVER = "server"  # 상주 soffice 인스턴스에 UNO로 전달
+
+# 결과 상태
+STATUS_OK = "ok"
+STATUS_NO_PDF = "no_pdf"
+STATUS_FAILED = "failed"
+STATUS_TIMEOUT = "timeout"
+STATUS_ERROR = "error"
+STATUS_MEMORY = "memory"  # 메모리 상한 초과로 강제 종료
+STATUS_STALLED = "stalled"  # CPU를 쓰지 않고 멈춰 있어 강제 종료
+STATUS_QUARANTINED = "quarantined"  # 이전 실행에서 계속 강제 종료되어 건너뜀
+STATUS_REJECTED = "rejected"  # 사전 검사에서 변환할 수 없는 파일로 판단
+STATUS_CANCELLED = "cancelled"  # 변환 도중 취소됨 (집계/기록하지 않고 다음에 이어서 변환)
+
+# 감시(watchdog)가 강제 종료한 상태: 새 프로필로 다시 시도할 만함
+RETRY_STATUSES = (STATUS_TIMEOUT, STATUS_MEMORY, STATUS_STALLED)
+
+
+def _soffice_cache_path():
+    return os.path.join(user_cache_dir(), SOFFICE_CACHE_NAME)
+
+
+def _load_soffice_cache():
+    try:
+        with open(_soffice_cache_path(), encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def _save_soffice_cache(data):
+    path = _soffice_cache_path()
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        # 동시에 실행된 다른 프로세스가 쓰다 만 파일을 읽지 않도록 이름 바꾸기로 교체
+        os.replace(tmp, path)
+    except OSError:
+        pass
+
+
+def _exe_signature(path):
+    """실행 파일이 바뀌었는지(업데이트, 재설치) 확인할 [실제 경로, 크기, 수정 시각]"""
+    try:
+        real = os.path.realpath(path)
+        st = os.stat(real)
+    except OSError:
+        return None
+    return [real, st.st_size, st.st_mtime_ns]
+
+
+def _preferred_install(path, candidates):
+    """candidates(찾는 순서) 중 path보다 먼저 찾는, 지금 있는 설치. 없으면 None."""
+    for p in candidates:
+        if p == path:
+            return None
+        if os.path.isfile(p):
+            return p
+    return None
+
+
+def _path_dirs_signature(search_path, path):
+    """PATH에서 path가 있는 폴더까지 각 폴더의 수정 시각
+
+    앞선 PATH 폴더에 soffice가 새로 설치되면 그 폴더의 수정 시각이 바뀝니다.
+    """
+    folder = os.path.normcase(os.path.dirname(os.path.abspath(path)))
+    signature = []
+    for d in search_path.split(os.pathsep):
+        if not d:
+            continue
+        try:
+            signature.append(os.stat(d).st_mtime_ns)
+        except OSError:
+            signature.append(None)
+        if os.path.normcase(os.path.abspath(d)) == folder:
+            break
+    return signature
+
+
+def find_soffice():
+    """LibreOffice 실행 파일 경로. 없으면 None.
+
+    찾은 경로는 사용자 캐시 폴더의 soffice.json에 남겨, 실행 파일의 크기와 수정 시각,
+    PATH가 그대로면 다음 실행에서 다시 찾지 않습니다. 다만 먼저 찾는 설치 위치에
+    LibreOffice가 새로 설치되었거나 앞선 PATH 폴더가 바뀌었으면 다시 찾습니다.
+    """
+    # SOFFICE 환경 변수로 지정한 실행 파일을 먼저 사용
+    env = os.environ.get("SOFFICE")
+    if env and os.path.isfile(env):
+        return env
+    search_path = os.environ.get("PATH", "")
+    candidates = SOFFICE_PATHS_WIN if IS_WINDOWS else SOFFICE_PATHS_MAC
+    cache = _load_soffice_cache()
+    found = cache.get("found")
+    if (isinstance(found, dict) and found.get("search_path") == search_path
+            and found.get("signature") == _exe_signature(found.get("path", ""))
+            and _preferred_install(found["path"], candidates) is None
+            and (found["path"] in candidates
+                 or found.get("path_dirs") == _path_dirs_signature(search_path, found["path"]))):
+        return found["path"]
+
+    path = None
+    for p in candidates:
+        if os.path.isfile(p):
+            path = p
+            break
+    if path is None:
+        # PATH에서 찾기
+        path = shutil.which("soffice")
+    if path is not None:
+        # 찾지 못한 결과는 남기지 않음 (설치하면 바로 찾도록)
+        cache["found"] = {
+            "path": path, "search_path": search_path, "signature": _exe_signature(path),
+        }
+        if path not in candidates:
+            cache["found"]["path_dirs"] = _path_dirs_signature(search_path, path)
+        _save_soffice_cache(cache)
+    return path
+
+
+def soffice_version(soffice):
+    """LibreOffice 버전 문자열. 알 수 없으면 실행 파일 경로와 수정 시각으로 대신합니다.
+
+    soffice --version은 LibreOffice를 한 번 시작하는 만큼 걸리므로, 알아낸 버전은
+    find_soffice와 같은 soffice.json에 실행 파일의 크기/수정 시각과 함께 남겨 둡니다.
+    """
+    signature = _exe_signature(soffice)
+    cache = _load_soffice_cache()
+    versions = cache.get("versions")
+    if not isinstance(versions, dict):
+        versions = cache["versions"] = {}
+    entry = versions.get(soffice)
+    if signature is not None and isinstance(entry, dict) and entry.get("signature") == signature:
+        return entry["version"]
+    try:
+        result = subprocess.run(
+            [soffice, "--version"], capture_output=True, text=True, timeout=30,
+        )
+        lines = result.stdout.strip().splitlines()
+        if result.returncode == 0 and lines:
+            version = lines[0].strip()
+            if signature is not None:
+                versions[soffice] = {"signature": signature, "version": version}
+                _save_soffice_cache(cache)
+            return version
+    except Exception:
+        pass
+    try:
+        return f"{soffice}@{os.stat(soffice).st_mtime_ns}"
+    except OSError:
+        return soffice
+
+
+def user_cache_dir():
+    """hwp2pdf 사용자 캐시 폴더"""
+    if IS_WINDOWS:
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser(r"~\AppData\Local")
+    elif platform.system() == "Darwin":
+        base = os.path.expanduser("~/Library/Caches")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.path.join(base, "hwp2pdf")
+
+
+def default_workers():
+    """기본 동시 변환 수 (CPU 코어 수)"""
+    return os.cpu_count() or 1
+
+
+def make_profile(template=None):
+    """임시 사용자 프로필 디렉토리를 만들고 (경로, URL)을 반환합니다.
+
+    template(hwp2pdf_profile.ensure_template)이 있으면 초기화된 템플릿을 복제하므로
+    soffice가 처음 시작할 때 프로필을 초기화하지 않습니다.
+    """
+    tmp_profile = tempfile.mkdtemp(prefix="hwp2pdf_profile_")
+    if template:
+        from hwp2pdf_profile import clone_profile
+        try:
+            clone_profile(template, tmp_profile)
+        except (OSError, shutil.Error):
+            # 복제에 실패하면 빈 프로필로 시작
+            shutil.rmtree(tmp_profile, ignore_errors=True)
+            os.makedirs(tmp_profile, exist_ok=True)
+    profile_url = "file:///" + tmp_profile.replace("\\", "/")
+    return tmp_profile, profile_url
+
+
+def remove_profile(profile_dir):
+    shutil.rmtree(profile_dir, ignore_errors=True)
+
+
+def output_dir_for(filepath, output_dir=""):
+    return output_dir if output_dir else os.path.dirname(filepath)
+
+
+def expected_pdf_path(filepath, outdir):
+    return output_path(filepath, outdir, "pdf")
+
+
+def output_path(filepath, outdir, fmt):
+    base_name = os.path.splitext(os.path.basename(filepath))[0]
+    return os.path.join(outdir, f"{base_name}.{fmt}")
+
+
+def parse_formats(text):
+    """"pdf,txt,png" 같은 목록에서 PDF 외에 함께 만들 형식의 튜플을 만듭니다.
+
+    알 수 없는 형식이면 ValueError를 냅니다.
+    """
+    extras = []
+    for fmt in (f.strip().lower() for f in text.split(",")):
+        if not fmt or fmt == "pdf":
+            continue
+        if fmt not in OUTPUT_FORMATS:
+            raise ValueError(f"지원하지 않는 출력 형식: {fmt} (가능: {', '.join(OUTPUT_FORMATS)})")
+        if fmt not in extras:
+            extras.append(fmt)
+    return tuple(extras)
+
+
+class ConvertResult:
+    """파일 하나의 변환 결과"""
+
+    def __init__(self, filepath, status, pdf_path="", detail=""):
+        self.filepath = filepath
+        self.status = status
+        self.pdf_path = pdf_path
+        self.detail = detail
+        self.cached = False
+        self.elapsed = 0.0  # 초
+        self.estimate = None  # 예상 변환 시간 (CostModel 사용 시)
+        self.timeout = None  # 적용한 시간 제한
+        self.attempts = 1
+        self.quarantined = False
+        self.info = None  # 사전 검사 결과 (SniffResult)
+        self.phases = {}  # 단계 -> 초 (queue_wait, preflight, cache, spawn, convert, verify, ...)
+        self.input_bytes = None
+        self.output_bytes = None
+        self.duplicate_of = ""  # 같은 내용이라 변환을 대신한 파일 (InputDeduper 사용 시)
+        self.outputs = {}  # PDF 외에 만든 형식 -> 경로
+        self.output_errors = {}  # PDF 외에 만들지 못한 형식 -> 이유
+        self.images_saved = 0  # 이미지 중복 제거로 줄인 바이트
+
+    @property
+    def name(self):
+        return os.path.basename(self.filepath)
+
+    @property
+    def ok(self):
+        return self.status == STATUS_OK
+
+    def message(self):
+        """로그에 표시할 결과 문구"""
+        if self.duplicate_of and self.status == STATUS_OK:
+            text = f"완료 (중복: {os.path.basename(self.duplicate_of)}): {self.pdf_path}"
+        else:
+            text = self._status_text()
+            if self.duplicate_of:
+                text += f" (같은 내용: {os.path.basename(self.duplicate_of)})"
+        if self.outputs:
+            text += f" (+{', '.join(self.outputs)})"
+        for fmt, detail in self.output_errors.items():
+            text += f" - {fmt} 실패: {detail}"
+        if self.info is not None and self.info.misnamed:
+            # 예: .hwp 이름의 HWPX 파일 (사전 검사에서 실제 형식을 확인)
+            text += f" (확장자와 다른 실제 형식: {self.info.ext[1:].upper()})"
+        return text
+
+    def _status_text(self):
+        if self.status == STATUS_OK and self.cached:
+            return f"완료 (캐시): {self.pdf_path}"
+        if self.status == STATUS_OK:
+            return f"완료: {self.pdf_path}"
+        if self.status == STATUS_NO_PDF:
+            return f"실패 (PDF 미생성): {self.detail}"
+        if self.status == STATUS_FAILED:
+            return f"실패: {self.detail}"
+        if self.status == STATUS_REJECTED:
+            return f"건너뜀 (사전 검사): {self.detail}"
+        if self.status == STATUS_QUARANTINED:
+            return f"건너뜀 (격리됨): {self.detail}"
+        if self.status == STATUS_CANCELLED:
+            return "취소됨"
+        if self.status == STATUS_TIMEOUT:
+            text = "시간 초과"
+        elif self.status == STATUS_MEMORY:
+            text = f"메모리 초과: {self.detail}"
+        elif self.status == STATUS_STALLED:
+            text = f"응답 없음: {self.detail}"
+        else:
+            return f"오류: {self.detail}"
+        if self.attempts > 1:
+            text += f" ({self.attempts}회 시도)"
+        if self.quarantined:
+            text += " - 격리됨"
+        return text
+
+
+def _process_detail(result, fallback):
+    stderr_msg = result.stderr.strip() if result.stderr else ""
+    stdout_msg = result.stdout.strip() if result.stdout else ""
+    return stderr_msg or stdout_msg or fallback
+
+
+def _soffice_cmd(soffice, profile_url, outdir, filepaths, fmt="pdf", export=None):
+    convert_to = OUTPUT_FORMATS[fmt][0]
+    if export is not None and fmt == "pdf":
+        # PDF 내보내기 프로필의 필터 옵션 (hwp2pdf_export)
+        convert_to = export.convert_to()
+    return [
+        soffice,
+        "--headless",
+        "--norestore",
+        f"-env:UserInstallation={profile_url}",
+        "--convert-to", convert_to,
+        "--outdir", outdir,
+    ] + list(filepaths)
+
+
+def _file_size(path):
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return None
+
+
+def pdf_complete(path):
+    """PDF가 끝까지 쓰였는지 확인합니다 (머리의 %PDF-, 마지막 1KB 안의 startxref와 %%EOF).
+
+    변환 도중 강제 종료된 soffice가 남긴 잘린 PDF를 성공으로 세지 않기 위한 검사입니다.
+    """
+    try:
+        with open(path, "rb") as f:
+            if f.read(5) != b"%PDF-":
+                return False
+            f.seek(0, os.SEEK_END)
+            f.seek(max(0, f.tell() - PDF_TRAILER_BYTES))
+            tail = f.read()
+    except OSError:
+        return False
+    return b"startxref" in tail and b"%%EOF" in tail
+
+
+def check_output(path, fmt):
+    """PDF 외 형식의 출력이 제대로 쓰였는지 확인합니다. 문제가 있으면 지우고 이유를 반환합니다."""
+    if not os.path.isfile(path):
+        return "파일이 생성되지 않음"
+    if fmt == "png":
+        try:
+            with open(path, "rb") as f:
+                ok = f.read(len(PNG_SIGNATURE)) == PNG_SIGNATURE
+        except OSError:
+            ok = False
+        if not ok:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return "PNG가 올바르지 않음"
+    return None
+
+
+def discard_partial_pdf(pdf):
+    """잘린 PDF가 남아 있으면 지웁니다. 지웠으면 True."""
+    if os.path.isfile(pdf) and not pdf_complete(pdf):
+        try:
+            os.remove(pdf)
+        except OSError:
+            pass
+        return True
+    return False
+
+
+def _mtime_ns(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def default_watchdog():
+    """기본 설정의 프로세스 감시(Watchdog)"""
+    from hwp2pdf_watchdog import Watchdog
+    return Watchdog()
+
+
+def _killed_result(filepath, outcome):
+    if outcome.reason == "memory":
+        detail = f"{outcome.peak_rss // (1024 * 1024)}MB 사용"
+        return ConvertResult(filepath, STATUS_MEMORY, detail=detail)
+    if outcome.reason == "stall":
+        return ConvertResult(filepath, STATUS_STALLED, detail="CPU 사용 없이 멈춤")
+    if outcome.reason == "cancelled":
+        return ConvertResult(filepath, STATUS_CANCELLED, detail="취소됨")
+    return ConvertResult(filepath, STATUS_TIMEOUT)
+
+
+def convert_file(soffice, filepath, outdir, profile_url, timeout=DEFAULT_TIMEOUT,
+                 watchdog=None, export=None):
+    """soffice 프로세스 하나로 파일 하나를 변환합니다.
+
+    프로세스는 watchdog(Watchdog) 감시 아래 실행되며, 메모리 상한 초과, 멈춤,
+    시간 초과 시 soffice가 띄운 하위 프로세스까지 함께 종료됩니다.
+    export(ExportProfile)가 있으면 그 필터 옵션으로 PDF를 내보냅니다.
+    """
+    expected_pdf = expected_pdf_path(filepath, outdir)
+    watchdog = watchdog or default_watchdog()
+    try:
+        # 변환 전 출력 폴더 확인/생성
+        os.makedirs(outdir, exist_ok=True)
+        cmd = _soffice_cmd(soffice, profile_url, outdir, [filepath], export=export)
+        outcome = watchdog.run(cmd, timeout)
+        verify_started = time.monotonic()
+        result = _file_result(filepath, expected_pdf, outcome)
+        result.phases.update(
+            spawn=outcome.spawn,
+            convert=outcome.elapsed,
+            verify=time.monotonic() - verify_started,
+        )
+        return result
+    except Exception as e:
+        return ConvertResult(filepath, STATUS_ERROR, detail=str(e))
+
+
+def _file_result(filepath, expected_pdf, outcome):
+    truncated = discard_partial_pdf(expected_pdf)
+    if outcome.reason is not None:
+        return _killed_result(filepath, outcome)
+    if truncated:
+        detail = _process_detail(outcome, "PDF가 끝까지 쓰이지 않음 (잘린 파일)")
+        return ConvertResult(filepath, STATUS_FAILED, detail=detail)
+    if outcome.returncode == 0 and os.path.isfile(expected_pdf):
+        return ConvertResult(filepath, STATUS_OK, pdf_path=expected_pdf)
+    if outcome.returncode == 0:
+        # returncode 0이지만 PDF 미생성
+        detail = _process_detail(outcome, "PDF 파일이 생성되지 않음")
+        return ConvertResult(filepath, STATUS_NO_PDF, detail=detail)
+    detail = _process_detail(outcome, f"종료코드: {outcome.returncode}")
+    return ConvertResult(filepath, STATUS_FAILED, detail=detail)
+
+
+def convert_chunk(soffice, filepaths, outdir, profile_url, timeout=DEFAULT_TIMEOUT,
+                  watchdog=None, export=None):
+    """soffice 한 번 실행으로 같은 출력 폴더의 여러 파일을 변환합니다.
+
+    실행 후 파일마다 예상 PDF가 새로 끝까지 쓰였는지 확인하고, 아닌 파일은 반씩 나눠
+    다시 변환합니다(이분 탐색). 문제 파일 하나가 묶음 전체를 실패시키지 않으며,
+    결국 혼자 남은 파일은 convert_file과 같은 결과를 받습니다.
+    timeout은 파일당 값이며 묶음 전체에는 파일 수만큼 곱해 적용합니다.
+    """
+    watchdog = watchdog or default_watchdog()
+    if len(filepaths) == 1:
+        return [convert_file(soffice, filepaths[0], outdir, profile_url, timeout, watchdog, export)]
+
+    expected = [expected_pdf_path(f, outdir) for f in filepaths]
+    before = [_mtime_ns(p) for p in expected]
+    try:
+        os.makedirs(outdir, exist_ok=True)
+        cmd = _soffice_cmd(soffice, profile_url, outdir, filepaths, export=export)
+        # 강제 종료되어도 그때까지 만든 PDF는 인정하고 나머지만 나눠서 다시 변환
+        outcome = watchdog.run(cmd, timeout * len(filepaths))
+    except Exception as e:
+        return [ConvertResult(f, STATUS_ERROR, detail=str(e)) for f in filepaths]
+
+    verify_started = time.monotonic()
+    results = [None] * len(filepaths)
+    missing = []
+    for i, (pdf, old) in enumerate(zip(expected, before)):
+        new = _mtime_ns(pdf)
+        if new is not None and new != old and pdf_complete(pdf):
+            results[i] = ConvertResult(filepaths[i], STATUS_OK, pdf_path=pdf)
+        else:
+            missing.append(i)
+    # 묶음 한 번의 실행 시간은 파일 수로 나눠 각 파일에 기록
+    n = len(filepaths)
+    shares = {
+        "spawn": outcome.spawn / n,
+        "convert": outcome.elapsed / n,
+        "verify": (time.monotonic() - verify_started) / n,
+    }
+    for r in results:
+        if r is not None:
+            r.phases.update(shares)
+
+    if missing and outcome.reason == "cancelled":
+        for i in missing:
+            results[i] = _killed_result(filepaths[i], outcome)
+    elif missing:
+        mid = (len(missing) + 1) // 2
+        for part in (missing[:mid], missing[mid:]):
+            if not part:
+                continue
+            retried = convert_chunk(
+                soffice, [filepaths[i] for i in part], outdir, profile_url, timeout, watchdog,
+                export,
+            )
+            for i, r in zip(part, retried):
+                results[i] = r
+    return results
+
+
+def convert_extras(soffice, results, outdir, profile_url, formats, timeout=DEFAULT_TIMEOUT,
+                   watchdog=None):
+    """PDF 변환에 성공한 결과마다 formats(PDF 외 형식)도 만들어 outputs/output_errors를 채웁니다.
+
+    soffice --convert-to는 한 번에 한 형식만 저장하므로 형식마다 성공한 파일을 묶어
+    soffice를 한 번씩 더 실행합니다(문서를 한 번만 읽으려면 MODE_SERVER).
+    취소되면 해당 결과를 STATUS_CANCELLED로 바꿔 다음에 처음부터 다시 변환하게 합니다.
+    """
+    watchdog = watchdog or default_watchdog()
+    for fmt in formats:
+        done = [r for r in results if r.ok]
+        if not done:
+            return results
+        expected = [output_path(r.filepath, outdir, fmt) for r in done]
+        before = [_mtime_ns(p) for p in expected]
+        started = time.monotonic()
+        try:
+            cmd = _soffice_cmd(soffice, profile_url, outdir, [r.filepath for r in done], fmt)
+            outcome = watchdog.run(cmd, timeout * len(done))
+        except Exception as e:
+            for r in done:
+                r.output_errors[fmt] = str(e)
+            continue
+        if outcome.reason == "cancelled":
+            for r in done:
+                r.status = STATUS_CANCELLED
+            return results
+        share = (time.monotonic() - started) / len(done)
+        for r, path, old in zip(done, expected, before):
+            r.phases["extras"] = r.phases.get("extras", 0.0) + share
+            new = _mtime_ns(path)
+            written = new is not None and new != old
+            error = check_output(path, fmt) if written else "파일이 생성되지 않음"
+            if error is None:
+                r.outputs[fmt] = path
+            elif outcome.reason is not None:
+                r.output_errors[fmt] = _killed_result(r.filepath, outcome).message()
+            elif written:
+                # 파일은 쓰였으나 내용이 잘못됨: soffice 출력보다 확인 결과가 원인을 잘 보여 줌
+                r.output_errors[fmt] = error
+            else:
+                r.output_errors[fmt] = _process_detail(outcome, error)
+    return results
+
+
+def iter_chunks(items, output_dir="", chunk_size=1):
+    """(index, filepath)를 출력 폴더별로 최대 chunk_size개씩 묶어 차는 대로 내보냅니다.
+
+    items가 스캔 중인 생성기여도 묶음이 찰 때마다 바로 내보내고, 남은 묶음은 끝에
+    내보냅니다. 같은 이름의 PDF를 만드는 파일(a.hwp, a.hwpx)은 한 묶음에 넣지 않습니다.
+    """
+    if chunk_size <= 1:
+        for item in items:
+            yield [item]
+        return
+    open_chunks = {}  # 출력 폴더 -> (묶음, 묶음 안의 PDF 이름)
+    for index, filepath in items:
+        outdir = output_dir_for(filepath, output_dir)
+        pdf_name = os.path.basename(expected_pdf_path(filepath, outdir)).lower()
+        chunk, names = open_chunks.get(outdir, (None, None))
+        if chunk is not None and pdf_name in names:
+            yield chunk
+            chunk = None
+        if chunk is None:
+            chunk, names = [], set()
+            open_chunks[outdir] = (chunk, names)
+        chunk.append((index, filepath))
+        names.add(pdf_name)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            del open_chunks[outdir]
+    for chunk, _ in open_chunks.values():
+        yield chunk
+
+
+def make_chunks(items, output_dir="", chunk_size=1):
+    """iter_chunks의 목록 버전"""
+    return list(iter_chunks(items, output_dir, chunk_size))
+
+
+def largest_first(items, cost, window=None):
+    """cost가 큰 항목부터 내보냅니다.
+
+    window가 None이면 전부 읽어 정렬하고, 정수이면 그만큼만 모아 두고 그 안에서
+    가장 큰 것부터 내보냅니다(스캔 중인 생성기도 오래 기다리지 않고 흘려보냄).
+    0이면 순서는 그대로 두고 cost만 계산합니다.
+    """
+    heap = []
+    for seq, item in enumerate(items):
+        heapq.heappush(heap, (-cost(item), seq, item))
+        if window is not None and len(heap) > window:
+            yield heapq.heappop(heap)[2]
+    while heap:
+        yield heapq.heappop(heap)[2]
+
+
+def _glob_match(patterns, *names):
+    return any(fnmatch.fnmatchcase(n.lower(), p.lower()) for p in patterns for n in names)
+
+
+def wanted_file(name, rel_path, include=None, exclude=None):
+    """HWP/HWPX 파일이고 include/exclude 패턴(iter_hwp_files와 같은 규칙)을 통과하는지"""
+    if not name.lower().endswith(HWP_EXTENSIONS):
+        return False
+    if exclude and _glob_match(exclude, name, rel_path):
+        return False
+    return not include or _glob_match(include, name, rel_path)
+
+
+def iter_hwp_files(roots, recursive=True, include=None, exclude=None, on_dir=None):
+    """폴더에서 HWP/HWPX 파일을 찾는 대로 하나씩 내보냅니다 (os.scandir 기반).
+
+    include 패턴이 있으면 파일 이름이 그중 하나와 맞아야 하고, exclude 패턴은 파일과
+    폴더 모두에 적용되어 맞는 폴더는 아예 들어가지 않습니다. 패턴은 이름 또는
+    시작 폴더 기준 상대 경로('/' 구분)와 비교하며 대소문자를 구분하지 않습니다.
+    접근할 수 없는 폴더는 건너뜁니다. on_dir(folder)가 있으면 들어가는 폴더마다
+    호출합니다(폴더 감시 등록).
+    """
+    include = list(include or [])
+    exclude = list(exclude or [])
+    for root in roots:
+        stack = [(root, "")]
+        while stack:
+            folder, rel = stack.pop()
+            subdirs = []
+            if on_dir is not None:
+                on_dir(folder)
+            try:
+                with os.scandir(folder) as it:
+                    for entry in it:
+                        rel_path = f"{rel}/{entry.name}" if rel else entry.name
+                        if exclude and _glob_match(exclude, entry.name, rel_path):
+                            continue
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                if recursive and not entry.name.startswith("."):
+                                    subdirs.append((entry.path, rel_path))
+                                continue
+                            if not entry.is_file():
+                                continue
+                        except OSError:
+                            continue
+                        if not wanted_file(entry.name, rel_path, include):
+                            continue
+                        yield entry.path
+            except OSError:
+                continue
+            # 이름순으로 내려가도록 역순으로 쌓음
+            subdirs.sort(key=lambda d: d[1].lower(), reverse=True)
+            stack.extend(subdirs)
+
+
+class FileFeed:
+    """변환 도중에도 파일을 더 넣을 수 있는 입력 목록
+
+    폴더 스캔과 변환을 겹칠 때 convert_batch에 넘깁니다. 순회하는 쪽은 새 파일이
+    들어오거나 close()될 때까지 기다립니다. 순회는 한 곳에서만 합니다.
+    """
+
+    def __init__(self, files=()):
+        self._cond = threading.Condition()
+        self._items = collections.deque(files)
+        self._closed = False
+
+    def put(self, paths):
+        with self._cond:
+            self._items.extend(paths)
+            self._cond.notify_all()
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def __iter__(self):
+        # 꺼낸 항목은 지우므로 끝나지 않는 입력(폴더 감시)도 메모리가 늘지 않음
+        while True:
+            with self._cond:
+                while not self._items and not self._closed:
+                    self._cond.wait()
+                if not self._items:
+                    return
+                item = self._items.popleft()
+            yield item
+
+
+class ProcessConverter:
+    """파일마다 soffice --convert-to 프로세스를 새로 실행하는 변환기
+
+    formats(PDF 외 형식)가 있으면 PDF를 만든 뒤 형식마다 soffice를 한 번 더 실행합니다.
+    """
+
+    def __init__(self, soffice, watchdog=None, template=None, formats=(), export=None):
+        self.soffice = soffice
+        self.watchdog = watchdog or default_watchdog()
+        self.template = template
+        self.formats = tuple(formats)
+        self.export = export
+        self.profile_dir, self.profile_url = make_profile(template)
+
+    def convert(self, filepath, outdir, timeout=DEFAULT_TIMEOUT):
+        result = convert_file(
+            self.soffice, filepath, outdir, self.profile_url, timeout, self.watchdog, self.export
+        )
+        return self._extras([result], outdir, timeout)[0]
+
+    def convert_group(self, filepaths, outdir, timeout=DEFAULT_TIMEOUT):
+        results = convert_chunk(
+            self.soffice, filepaths, outdir, self.profile_url, timeout, self.watchdog, self.export
+        )
+        return self._extras(results, outdir, timeout)
+
+    def _extras(self, results, outdir, timeout):
+        if not self.formats:
+            return results
+        return convert_extras(
+            self.soffice, results, outdir, self.profile_url, self.formats, timeout, self.watchdog
+        )
+
+    def reset(self):
+        """강제 종료 뒤 다시 시도하기 전에 새 프로필로 바꿉니다."""
+        remove_profile(self.profile_dir)
+        self.profile_dir, self.profile_url = make_profile(self.template)
+
+    def close(self):
+        remove_profile(self.profile_dir)
+
+
+def server_available(soffice=None):
+    """상주 서버 모드(UNO)를 쓸 수 있는지 확인합니다."""
+    import hwp2pdf_server
+    return hwp2pdf_server.available(soffice)
+
+
+def make_converter(soffice, mode=MODE_PROCESS, watchdog=None, template=None, formats=(),
+                   export=None):
+    """작업자 하나가 쓸 변환기를 만듭니다.
+
+    formats는 PDF와 함께 만들 형식, export(ExportProfile)는 PDF 내보내기 설정입니다.
+    """
+    if mode == MODE_SERVER:
+        from hwp2pdf_server import UnoServerConverter
+        return UnoServerConverter(soffice, watchdog, template, formats, export)
+    return ProcessConverter(soffice, watchdog, template, formats, export)
+
+
+class BatchSummary:
+    """일괄 변환 집계"""
+
+    def __init__(self, total, max_failures=None):
+        self.total = total
+        self.success = 0
+        self.fail = 0
+        # (index, 이름, 결과 문구), max_failures가 있으면 최근 것만 보관
+        self._failed = collections.deque(maxlen=max_failures)
+        self.cache = None
+        self.cancelled = False
+        self.formats = ()  # PDF 외에 함께 만든 형식
+        self.format_counts = {}  # 형식 -> [성공, 실패]
+        self.export = None  # PDF 내보내기 설정 (ExportProfile)
+        self.input_bytes = 0  # 성공한 파일의 입력/PDF 크기 합
+        self.output_bytes = 0
+        self.images_saved = 0
+
+    @property
+    def done(self):
+        return self.success + self.fail
+
+    @property
+    def failed_names(self):
+        """실패한 파일 이름 (입력 순서)"""
+        return [name for _, name, _ in sorted(self._failed)]
+
+    @property
+    def failures(self):
+        """실패한 파일의 (이름, 결과 문구) (입력 순서)"""
+        return [(name, message) for _, name, message in sorted(self._failed)]
+
+    def add(self, result, index=0):
+        if result.ok:
+            self.success += 1
+            self.input_bytes += result.input_bytes or 0
+            self.output_bytes += result.output_bytes or 0
+            self.images_saved += result.images_saved
+        else:
+            self.fail += 1
+            self._failed.append((index, result.name, result.message()))
+        for fmt in self.formats:
+            counts = self.format_counts.setdefault(fmt, [0, 0])
+            counts[0 if fmt in result.outputs else 1] += 1
+
+    def text(self):
+        head = "취소됨." if self.cancelled else "완료!"
+        text = f"{head} 성공: {self.success}, 실패: {self.fail} / 총 {self.total}개"
+        if self.cache is not None:
+            text += f" (캐시 적중: {self.cache.hits}, 미적중: {self.cache.misses})"
+        for fmt in self.formats:
+            ok, failed = self.format_counts.get(fmt, (0, 0))
+            text += f" [{fmt} 성공: {ok}, 실패: {failed}]"
+        if self.export is not None and self.success:
+            text += f" [{self.size_text()}]"
+        return text
+
+    def size_text(self):
+        """성공한 파일의 입력 대비 PDF 크기 (PDF 프로필별로 비교할 때 씀)"""
+        name = self.export.label() if self.export is not None else "default"
+        text = f"PDF 프로필 {name}: 입력 {_mb(self.input_bytes)} → PDF {_mb(self.output_bytes)}"
+        if self.input_bytes:
+            text += f" ({self.output_bytes / self.input_bytes:.0%})"
+        if self.images_saved:
+            text += f", 이미지 중복 제거 {_mb(self.images_saved)} 절약"
+        return text
+
+
+def _mb(size):
+    if size >= 1024 * 1024:
+        return f"{size / (1024 * 1024):.1f}MB"
+    return f"{size / 1024:.0f}KB"
+
+
+def convert_batch(soffice, files, output_dir="", workers=None, timeout=DEFAULT_TIMEOUT,
+                  mode=MODE_PROCESS, chunk_size=1, cache=None, journal=None,
+                  scheduler=None, watchdog=None, quarantine=None, preflight=False,
+                  metrics=None, dedupe=None, stage=False, profile_template=None,
+                  continuous=False, formats=(), export=None, on_start=None, on_result=None):
+    """files를 workers개의 작업자로 병렬 변환하고 BatchSummary를 반환합니다.
+
+    작업자마다 별도의 임시 프로필을 사용하므로 LibreOffice lock 파일이 충돌하지 않습니다.
+    profile_template(hwp2pdf_profile.ensure_template)이 있으면 작업자 프로필을 초기화된
+    템플릿에서 복제해 첫 시작의 프로필 초기화 시간을 없앱니다.
+    mode가 MODE_SERVER이면 작업자마다 상주 soffice 인스턴스를 하나씩 띄워 재사용합니다.
+    MODE_PROCESS에서 chunk_size가 1보다 크면 같은 출력 폴더의 파일을 chunk_size개씩
+    묶어 soffice 한 번으로 변환합니다.
+    cache(ConversionCache)가 주어지면 캐시에 있는 파일은 변환하지 않고 복원하며,
+    새로 변환에 성공한 PDF는 캐시에 넣습니다.
+    formats(parse_formats)가 있으면 PDF와 함께 그 형식(txt, png)도 만들어 result.outputs에
+    담고, 형식별 성공/실패를 summary.format_counts에 셉니다. MODE_SERVER는 문서를 한 번
+    읽어 모든 형식을 저장하고, MODE_PROCESS는 형식마다 soffice를 한 번 더 실행합니다.
+    캐시에는 PDF만 있으므로 이때는 캐시에서 복원하지 않습니다(새 PDF는 넣음).
+    export(hwp2pdf_export.ExportProfile)가 있으면 그 필터 옵션(JPEG 품질, 해상도, PDF/A 등)으로
+    PDF를 내보내고, export.dedup_images가 참이면 만든 PDF에서 같은 이미지 객체를 합칩니다
+    (result.images_saved). 입력/PDF 크기 합은 summary.size_text()로 봅니다. 캐시를 쓸 때는
+    ConversionCache(variant=export.cache_variant())로 설정마다 캐시를 나눠야 합니다.
+    journal(JobJournal)이 주어지면 파일마다 대기/결과와 소요 시간을 기록합니다.
+    scheduler(CostModel)가 주어지면 예상 변환 시간이 긴 파일부터 변환하고(목록은 전체,
+    생성기는 작업자 수의 4배 범위 안에서), 파일마다 예상 시간에 맞춘 시간 제한을 씁니다.
+    이때 timeout 인자는 쓰지 않으며, 성공한 변환의 실제 시간은 모델에 반영됩니다.
+    watchdog(Watchdog)은 변환 프로세스의 메모리/멈춤/시간을 감시하고, 여유 메모리가
+    부족하면 동시 변환 수를 줄입니다. 강제 종료된 파일은 새 프로필로 바꿔 대기 시간을
+    늘려 가며 watchdog.attempts번까지 시도하고, 그래도 실패하면 quarantine(Quarantine)에
+    올립니다. 격리된 파일은 변환하지 않고 STATUS_QUARANTINED 결과를 냅니다.
+    preflight가 참이면 파일 앞부분만 읽어(hwp2pdf_sniff) 빈 파일, 손상되었거나 암호가
+    걸린 문서 등을 soffice 없이 STATUS_REJECTED로 처리하고, 읽어 둔 실제 형식과 본문
+    크기는 result.info에 담아 scheduler의 예측에 씁니다.
+    결과마다 단계별 시간(result.phases)과 입력/PDF 크기를 채우며, metrics(BatchMetrics)가
+    주어지면 결과를 그곳에도 기록합니다.
+    dedupe(InputDeduper)가 주어지면 내용이 같은 파일은 처음 것만 변환하고, 나머지는
+    그 PDF를 각자의 출력 위치에 링크하거나 복사해 result.duplicate_of를 채웁니다.
+    stage가 참이면 작업자마다 로컬 스크래치 폴더(가능하면 tmpfs, hwp2pdf_stage)에 변환하고,
+    끝까지 쓰인 PDF만 별도 I/O 스레드가 출력 위치로 옮깁니다(같은 파일 시스템이면 이름
+    바꾸기, 아니면 복사 후 이름 바꾸기). 이때 on_result는 I/O 스레드에서도 호출됩니다.
+    files는 목록뿐 아니라 생성기(iter_hwp_files)나 FileFeed여도 되며, 이 경우 파일을
+    찾는 대로 변환을 시작하고 summary.total도 찾은 만큼 늘어납니다.
+    continuous가 참이면 files를 끝나지 않는 입력(폴더 감시)으로 보고 지연 시간을 줄입니다.
+    들어온 파일은 모으지 않고 바로 변환하며(scheduler는 시간 제한에만 쓰고 chunk_size는 1),
+    summary의 실패 목록은 최근 MAX_KEPT_FAILURES개만 남깁니다.
+    watchdog.pause()/resume()/cancel()로 실행 중인 일괄 변환을 멈추거나 취소할 수 있습니다.
+    취소하면 실행 중인 soffice를 1초 안에 종료하고 남은 파일은 결과를 내지 않으며
+    (journal에는 대기로 남아 이어서 변환 가능), summary.cancelled가 참이 됩니다.
+    기다리는 중에 KeyboardInterrupt가 나도 같은 방법으로 정리한 뒤 다시 발생시킵니다.
+    이때 files가 FileFeed이면 닫아서 더 기다리지 않습니다. 파일 검색, 사전 검사, 스케줄링이나
+    작업자 스레드에서 예외가 나도 같은 방법으로 취소하고, 정리가 끝나면 그 예외를 다시
+    발생시킵니다 (일부만 변환된 결과를 완료로 보이지 않도록).
+    on_start(index, filepath), on_result(index, result, summary)는 작업자 스레드에서
+    호출되며, on_result는 집계 lock 안에서 호출되므로 summary 값이 일관됩니다.
+    """
+    sized = isinstance(files, (list, tuple))
+    summary = BatchSummary(len(files) if sized else 0, MAX_KEPT_FAILURES if continuous else None)
+    summary.cache = cache
+    summary.formats = tuple(formats)
+    summary.export = export
+    if sized and not files:
+        return summary
+
+    workers = max(1, workers or default_workers())
+    if sized:
+        workers = min(workers, len(files))
+    if mode == MODE_SERVER and not server_available(soffice):
+        mode = MODE_PROCESS
+    if mode == MODE_SERVER or continuous:
+        chunk_size = 1
+    watchdog = watchdog or default_watchdog()
+    if preflight:
+        from hwp2pdf_sniff import sniff
+    if stage:
+        from hwp2pdf_stage import Publisher, make_scratch, scratch_root
+    postpass = export is not None and export.dedup_images
+    if postpass:
+        from hwp2pdf_export import dedup_images
+    jobs = queue.Queue()
+    lock = threading.Lock()
+
+    if metrics is not None:
+        metrics.total = summary.total
+
+    def _report(done):
+        if dedupe is not None:
+            for index, result in list(done):
+                for follower in dedupe.finished(index, result):
+                    done.append(_settle(*follower))
+        for index, result in done:
+            if result.input_bytes is None:
+                result.input_bytes = _file_size(result.filepath)
+            if result.ok and result.output_bytes is None:
+                result.output_bytes = _file_size(result.pdf_path)
+        with lock:
+            for index, result in done:
+                summary.add(result, index)
+                if journal is not None:
+                    journal.record_result(result)
+                if metrics is not None:
+                    metrics.record(result)
+                if on_result:
+                    on_result(index, result, summary)
+
+    queued_at = {}  # index -> 대기열에 들어간 시각
+
+    def _discovered():
+        for index, filepath in enumerate(files):
+            if not sized:
+                with lock:
+                    summary.total += 1
+                    if metrics is not None:
+                        metrics.total = summary.total
+            if journal is not None:
+                journal.record({"t": "queued", "path": filepath})
+            queued_at[index] = time.monotonic()
+            yield index, filepath
+
+    infos = {}  # index -> SniffResult
+    preflight_times = {}  # index -> 사전 검사 시간
+
+    def _checked(items):
+        for index, filepath in items:
+            started = time.monotonic()
+            info = sniff(filepath)
+            preflight_times[index] = time.monotonic() - started
+            if not info.ok:
+                result = ConvertResult(filepath, STATUS_REJECTED, detail=info.reason)
+                result.info = info
+                result.phases["preflight"] = preflight_times.pop(index)
+                queued_at.pop(index, None)
+                _report([(index, result)])
+                continue
+            infos[index] = info
+            yield index, filepath
+
+    plans = {}  # index -> (예상 시간, 시간 제한)
+
+    def _plan(item):
+        index, filepath = item
+        estimate = scheduler.estimate(filepath, info=infos.get(index))
+        plans[index] = (estimate, scheduler.timeout_for(estimate))
+        return estimate
+
+    def _settle(index, result, queue_wait=None):
+        """결과에 사전 검사 정보와 대기/사전 검사 시간을 채우고 파일별 상태를 정리합니다."""
+        result.info = infos.pop(index, None)
+        plans.pop(index, None)
+        if queue_wait is None:
+            queue_wait = time.monotonic() - queued_at.pop(index, time.monotonic())
+        result.phases["queue_wait"] = queue_wait
+        if index in preflight_times:
+            result.phases["preflight"] = preflight_times.pop(index)
+        return index, result
+
+    def _deduped(items):
+        for index, filepath in items:
+            pdf_path = expected_pdf_path(filepath, output_dir_for(filepath, output_dir))
+            state = dedupe.add(index, filepath, pdf_path)
+            if state is None:
+                yield index, filepath
+            elif state[0] == "done":
+                _report([_settle(index, state[1])])
+
+    errors = []  # 생산자/작업자 스레드에서 난 예외 (끝나면 convert_batch가 다시 발생시킴)
+
+    def _fail(error):
+        # 조용히 끝나면 대기열에 넣지 못한 파일이 결과 없이 사라지므로 일괄 변환을 취소하고
+        # (작업 기록에는 대기로 남음) 호출한 쪽에 알림
+        with lock:
+            errors.append(error)
+        watchdog.cancel()
+        if isinstance(files, FileFeed):
+            files.close()
+
+    def _producer():
+        try:
+            items = _discovered()
+            if preflight:
+                items = _checked(items)
+            if dedupe is not None:
+                items = _deduped(items)
+            if scheduler is not None:
+                items = largest_first(items, _plan, 0 if continuous else None if sized else workers * 4)
+            for chunk in iter_chunks(items, output_dir, chunk_size):
+                if watchdog.cancelled.is_set():
+                    break
+                jobs.put(chunk)
+        except Exception as e:
+            _fail(e)
+        finally:
+            for _ in range(workers):
+                jobs.put(None)
+
+    def _retry(converter, result, outdir, file_timeout):
+        """강제 종료된 파일을 다시 시도합니다. 다시 시도했으면 마지막 시도의 시간을
+        result.elapsed에 남깁니다 (강제 종료된 시도의 시간은 phases["failed_attempts"])."""
+        attempt = 1
+        waited = spent = 0.0
+        while result.status in RETRY_STATUSES and attempt < watchdog.attempts:
+            spent += sum(result.phases.values())
+            backoff = watchdog.backoff(attempt)
+            if watchdog.cancelled.wait(backoff):
+                # 다음 실행에서 처음부터 다시 시도하도록 취소로 처리
+                result.status = STATUS_CANCELLED
+                break
+            waited += backoff
+            converter.reset()
+            attempt += 1
+            watchdog.count_retry()
+            started = time.monotonic()
+            with watchdog.slot():
+                result = converter.convert(result.filepath, outdir, file_timeout)
+            result.elapsed = time.monotonic() - started
+        result.attempts = attempt
+        if attempt > 1:
+            result.phases["backoff"] = waited
+            result.phases["failed_attempts"] = spent
+        if quarantine is not None and result.status in RETRY_STATUSES:
+            quarantine.add(result.filepath, result.status, attempt)
+            result.quarantined = True
+        return result
+
+    def _published(items):
+        if cache is not None:
+            for index, result, local in items:
+                if result.ok:
+                    cache.store(result.filepath, result.pdf_path, source=local)
+        _report([(index, result) for index, result, _ in items])
+
+    publisher = None
+    scratch_dirs = []
+    if stage:
+        publisher = Publisher(_published, backlog=workers * 2)
+        root = scratch_root()
+        scratch_dirs = [make_scratch(root) for _ in range(workers)]
+
+    def _worker(scratch):
+        converter = make_converter(soffice, mode, watchdog, profile_template, formats, export)
+        try:
+            while True:
+                chunk = jobs.get()
+                if chunk is None:
+                    return
+                if watchdog.cancelled.is_set():
+                    continue
+                taken = time.monotonic()
+                waits = {i: taken - queued_at.pop(i, taken) for i, _ in chunk}
+                if on_start:
+                    for index, filepath in chunk:
+                        on_start(index, filepath)
+                outdir = output_dir_for(chunk[0][1], output_dir)
+
+                done = []
+                if quarantine is not None:
+                    pending = []
+                    for index, filepath in chunk:
+                        entry = quarantine.get(filepath)
+                        if entry is None:
+                            pending.append((index, filepath))
+                            continue
+                        detail = f"이전에 {entry.get('attempts', 1)}회 강제 종료됨"
+                        done.append((index, ConvertResult(filepath, STATUS_QUARANTINED, detail=detail)))
+                    chunk = pending
+                if cache is not None and not formats:
+                    pending = []
+                    for index, filepath in chunk:
+                        started = time.monotonic()
+                        hit = cache.lookup(filepath, expected_pdf_path(filepath, outdir))
+                        if hit is not None:
+                            hit.elapsed = time.monotonic() - started
+                            hit.phases["cache"] = hit.elapsed
+                            done.append((index, hit))
+                        else:
+                            pending.append((index, filepath))
+                    chunk = pending
+
+                file_timeout = timeout
+                if scheduler is not None and chunk:
+                    # 묶음은 파일별 시간 제한의 평균 × 파일 수를 적용
+                    file_timeout = sum(plans[i][1] for i, _ in chunk) / len(chunk)
+
+                # 스크래치 폴더를 쓰면 묶음마다 새 폴더에 변환 (옮기기 전 같은 이름과 겹치지 않도록)
+                convert_dir = outdir
+                if scratch is not None and chunk:
+                    convert_dir = tempfile.mkdtemp(dir=scratch)
+
+                started = time.monotonic()
+                with watchdog.slot():
+                    if watchdog.cancelled.is_set():
+                        results = [ConvertResult(f, STATUS_CANCELLED) for _, f in chunk]
+                    elif len(chunk) == 1:
+                        results = [converter.convert(chunk[0][1], convert_dir, file_timeout)]
+                    elif chunk:
+                        results = converter.convert_group(
+                            [f for _, f in chunk], convert_dir, file_timeout
+                        )
+                    else:
+                        results = []
+                # 묶음 변환은 파일별 시간을 알 수 없으므로 균등하게 나눔
+                per_file = (time.monotonic() - started) / max(1, len(chunk))
+                results = [_retry(converter, r, convert_dir, file_timeout) for r in results]
+                converted = []
+                for (index, filepath), result in zip(chunk, results):
+                    if result.status == STATUS_CANCELLED:
+                        continue
+                    if result.attempts == 1:
+                        result.elapsed = per_file
+                    result.info = infos.get(index)
+                    if postpass and result.ok:
+                        # 스크래치 폴더에서 옮기기 전에 (또는 출력 위치에서) 다시 씀
+                        started = time.monotonic()
+                        result.images_saved = dedup_images(result.pdf_path) or 0
+                        result.phases["postpass"] = time.monotonic() - started
+                    if scheduler is not None:
+                        result.estimate, result.timeout = plans[index]
+                        if result.ok:
+                            # 다시 시도한 파일은 성공한 마지막 시도의 시간만 반영
+                            scheduler.observe(
+                                filepath, result.elapsed, estimate=result.estimate, info=result.info
+                            )
+                    converted.append((index, result))
+                if convert_dir != outdir:
+                    publisher.submit(convert_dir, [
+                        _settle(index, result, waits.get(index, 0.0))
+                        + (expected_pdf_path(result.filepath, outdir),)
+                        for index, result in converted
+                    ])
+                else:
+                    if cache is not None:
+                        for _, result in converted:
+                            if result.ok:
+                                cache.store(result.filepath, result.pdf_path)
+                    done += converted
+                _report([_settle(index, result, waits.get(index, 0.0)) for index, result in done])
+        except Exception as e:
+            _fail(e)
+        finally:
+            # 인스턴스 종료 및 임시 프로필 정리
+            converter.close()
+
+    threads = [threading.Thread(target=_producer, daemon=True)]
+    threads += [
+        threading.Thread(target=_worker, args=(scratch_dirs[i] if stage else None,), daemon=True)
+        for i in range(workers)
+    ]
+    for t in threads:
+        t.start()
+    interrupted = False
+    try:
+        for t in threads:
+            t.join()
+    except KeyboardInterrupt:
+        # 실행 중인 soffice를 하위 프로세스까지 종료하고 작업자가 끝날 때까지 기다림
+        interrupted = True
+        watchdog.cancel()
+        if isinstance(files, FileFeed):
+            files.close()
+        for t in threads:
+            t.join()
+    try:
+        if publisher is not None:
+            publisher.close()
+    finally:
+        for scratch in scratch_dirs:
+            shutil.rmtree(scratch, ignore_errors=True)
+    summary.cancelled = watchdog.cancelled.is_set()
+    if interrupted:
+        raise KeyboardInterrupt
+    if errors:
+        raise errors[0]
+    return summary
@@ -0,0 +1,354 @@
+"""PDF 내보내기 설정(프로필)과 이미지 중복 제거 후처리
+
+LibreOffice의 writer_pdf_Export 필터 옵션(JPEG 품질, 이미지 해상도 줄이기, PDF/A,
+태그 PDF 등)을 프로필 이름으로 고릅니다. 일반 모드는 soffice --convert-to의 JSON 필터
+옵션(LibreOffice 7.4 이상, 그보다 오래된 버전은 옵션을 무시하고 기본값으로 내보냄)으로,
+상주 서버 모드는 storeToURL의 FilterData로 넘깁니다. 글꼴은 LibreOffice가 항상 쓰인
+글자만 넣으므로(subset) 따로 고를 수 있는 것은 표준 14종 글꼴을 넣을지 여부입니다.
+
+dedup_images()는 만든 PDF에서 내용이 같은 이미지 객체를 하나만 남기고 참조를 모읍니다.
+같은 로고나 도장이 쪽마다 따로 들어간 문서에서 크기가 줄어듭니다. 파일을 처음부터
+끝까지 한 번 훑어 이미지를 해시하고 한 번 더 훑어 새 파일을 쓰므로 문서 전체를 메모리에
+올리지 않습니다. 객체 스트림, 교차 참조 스트림, 암호화, 점진적 갱신이 있는 PDF는
+건드리지 않습니다(LibreOffice가 만드는 PDF에는 없음).
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import re
+
+DEFAULT_PROFILE = "default"
+
+# 프로필 -> writer_pdf_Export FilterData
+PROFILES = {
+    # LibreOffice 기본값 (이미지 원본 해상도 그대로)
+    "default": {},
+    # 사무용 보관/전송: JPEG 품질 75, 150DPI로 줄임
+    "compact": {
+        "UseLosslessCompression": False, "Quality": 75,
+        "ReduceImageResolution": True, "MaxImageResolution": 150,
+    },
+    # 화면 보기 전용: JPEG 품질 50, 75DPI로 줄임
+    "screen": {
+        "UseLosslessCompression": False, "Quality": 50,
+        "ReduceImageResolution": True, "MaxImageResolution": 75,
+    },
+    # 인쇄용: JPEG 품질 90, 300DPI로 줄임
+    "print": {
+        "UseLosslessCompression": False, "Quality": 90,
+        "ReduceImageResolution": True, "MaxImageResolution": 300,
+    },
+    # 장기 보존: PDF/A-2b, 태그 PDF, 표준 글꼴까지 포함
+    "archive": {
+        "SelectPdfVersion": 2, "UseTaggedPDF": True, "EmbedStandardFonts": True,
+        "UseLosslessCompression": False, "Quality": 90,
+        "ReduceImageResolution": True, "MaxImageResolution": 300,
+    },
+}
+
+_PDFA_VERSIONS = {"off": 0, "1": 1, "2": 2, "3": 3}
+_BOOLEANS = {"on": True, "true": True, "1": True, "off": False, "false": False, "0": False}
+
+
+def _bool(value):
+    try:
+        return _BOOLEANS[value.lower()]
+    except KeyError:
+        raise ValueError(f"on/off 값이 아님: {value}") from None
+
+
+def _int(value):
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f"숫자가 아님: {value}") from None
+
+
+def _apply_option(options, key, value):
+    """"quality=70" 같은 옵션 하나를 FilterData에 반영합니다."""
+    if key == "quality":
+        quality = _int(value)
+        if not 1 <= quality <= 100:
+            raise ValueError(f"JPEG 품질은 1~100: {value}")
+        options["Quality"] = quality
+    elif key == "dpi":
+        dpi = _int(value)
+        options["ReduceImageResolution"] = dpi > 0
+        if dpi > 0:
+            options["MaxImageResolution"] = dpi
+        else:
+            options.pop("MaxImageResolution", None)
+    elif key == "lossless":
+        options["UseLosslessCompression"] = _bool(value)
+    elif key == "pdfa":
+        if value.lower() not in _PDFA_VERSIONS:
+            raise ValueError(f"PDF/A는 off, 1, 2, 3 중 하나: {value}")
+        options["SelectPdfVersion"] = _PDFA_VERSIONS[value.lower()]
+    elif key == "tagged":
+        options["UseTaggedPDF"] = _bool(value)
+    elif key == "fonts":
+        options["EmbedStandardFonts"] = _bool(value)
+    else:
+        raise ValueError(f"알 수 없는 내보내기 옵션: {key} (quality, dpi, lossless, pdfa, tagged, fonts)")
+
+
+class ExportProfile:
+    """PDF 내보내기 설정 하나"""
+
+    def __init__(self, name=DEFAULT_PROFILE, options=None, dedup_images=False):
+        self.name = name
+        self.options = dict(PROFILES.get(name, {}) if options is None else options)
+        self.dedup_images = dedup_images
+
+    @property
+    def is_default(self):
+        return not self.options and not self.dedup_images
+
+    def label(self):
+        return self.name + (" + 이미지 중복 제거" if self.dedup_images else "")
+
+    def convert_to(self):
+        """soffice --convert-to 인자 (옵션이 없으면 "pdf")"""
+        if not self.options:
+            return "pdf"
+        data = {}
+        for key, value in self.options.items():
+            kind = "boolean" if isinstance(value, bool) else "long"
+            data[key] = {"type": kind, "value": str(value).lower() if kind == "boolean" else str(value)}
+        return "pdf:writer_pdf_Export:" + json.dumps(data, separators=(",", ":"))
+
+    def cache_variant(self):
+        """변환 캐시 키에 더할 값 (기본 설정이면 빈 문자열이라 기존 캐시를 그대로 씀)"""
+        if self.is_default:
+            return ""
+        return json.dumps([self.options, self.dedup_images], sort_keys=True)
+
+
+def parse_profile(text, dedup_images=False):
+    """"compact" 또는 "compact:quality=70,dpi=200,pdfa=2" 같은 문자열로 ExportProfile을 만듭니다.
+
+    알 수 없는 프로필이나 옵션이면 ValueError를 발생시킵니다.
+    """
+    name, _, rest = (text or DEFAULT_PROFILE).strip().partition(":")
+    name = name.strip().lower() or DEFAULT_PROFILE
+    if name not in PROFILES:
+        raise ValueError(f"알 수 없는 PDF 프로필: {name} (가능: {', '.join(PROFILES)})")
+    options = dict(PROFILES[name])
+    for item in filter(None, (part.strip() for part in rest.split(","))):
+        key, sep, value = item.partition("=")
+        if not sep:
+            raise ValueError(f"옵션은 이름=값 형식: {item}")
+        _apply_option(options, key.strip().lower(), value.strip())
+    return ExportProfile(name, options, dedup_images)
+
+
+# --- 이미지 중복 제거 ---
+
+_OBJ_HEADER = re.compile(rb"(\d+)\s+(\d+)\s+obj\b")
+_REF = re.compile(rb"(?<![\d.])(\d+)\s+(\d+)\s+R\b")
+_LENGTH = re.compile(rb"/Length\s+(\d+)(\s+\d+\s+R)?")
+_IMAGE = re.compile(rb"/Subtype\s*/Image\b")
+_STREAM = re.compile(rb"stream\r?\n")
+_UNSUPPORTED = (b"/ObjStm", b"/XRef", b"/Encrypt", b"/Linearized")
+
+
+class _Obj:
+    __slots__ = ("num", "gen", "start", "end", "head_end", "data_start", "data_end")
+
+    def __init__(self, num, gen, start, end, head_end, data_start=None, data_end=None):
+        self.num = num
+        self.gen = gen
+        self.start = start  # "N G obj" 위치
+        self.end = end  # "endobj" 뒤
+        self.head_end = head_end  # 사전(또는 값) 끝, 스트림이면 "stream" 위치
+        self.data_start = data_start
+        self.data_end = data_end
+
+
+def _parse_objects(data, start, xref_at):
+    """본문의 간접 객체를 차례로 읽습니다. 스트림 내용은 건너뜁니다."""
+    objects = []
+    pos = start
+    while True:
+        m = _OBJ_HEADER.search(data, pos, xref_at)
+        if m is None:
+            return objects
+        num, gen = int(m.group(1)), int(m.group(2))
+        body = m.end()
+        endobj = data.find(b"endobj", body, xref_at)
+        if endobj < 0:
+            raise ValueError("endobj 없음")
+        stream = _STREAM.search(data, body, endobj)
+        if stream is None or data[stream.start() - 3:stream.start()] == b"end":
+            objects.append(_Obj(num, gen, m.start(), endobj + 6, endobj))
+            pos = endobj + 6
+            continue
+        data_start = stream.end()
+        data_end = None
+        length = _LENGTH.search(data, body, stream.start())
+        if length is not None and not length.group(2):
+            candidate = data_start + int(length.group(1))
+            if data[candidate:candidate + 12].lstrip().startswith(b"endstream"):
+                data_end = candidate
+        if data_end is None:
+            # 길이가 간접 참조: endstream 다음에 endobj가 오는 곳을 찾음
+            probe = data_start
+            while True:
+                found = data.find(b"endstream", probe, xref_at)
+                if found < 0:
+                    raise ValueError("endstream 없음")
+                if data[found + 9:found + 20].lstrip().startswith(b"endobj"):
+                    break
+                probe = found + 9
+            data_end = found
+            while data_end > data_start and data[data_end - 1:data_end] in (b"\n", b"\r"):
+                data_end -= 1
+        endstream = data.find(b"endstream", data_end, xref_at)
+        endobj = data.find(b"endobj", endstream, xref_at)
+        if endstream < 0 or endobj < 0:
+            raise ValueError("객체 끝 없음")
+        objects.append(_Obj(num, gen, m.start(), endobj + 6, stream.start(), data_start, data_end))
+        pos = endobj + 6
+
+
+def _remap(raw, remap):
+    if not remap:
+        return raw
+    return _REF.sub(
+        lambda m: b"%d %s R" % (remap.get(int(m.group(1)), int(m.group(1))), m.group(2)), raw
+    )
+
+
+def _trailer_dict(data, start, end):
+    """trailer 뒤 << ... >>의 (시작, 끝)"""
+    open_at = data.find(b"<<", start, end)
+    if open_at < 0:
+        raise ValueError("trailer 사전 없음")
+    depth = 0
+    pos = open_at
+    while pos < end:
+        if data[pos:pos + 2] == b"<<":
+            depth += 1
+            pos += 2
+        elif data[pos:pos + 2] == b">>":
+            depth -= 1
+            pos += 2
+            if depth == 0:
+                return open_at, pos
+        else:
+            pos += 1
+    raise ValueError("trailer 사전이 닫히지 않음")
+
+
+def dedup_images(path):
+    """path PDF에서 내용이 같은 이미지 객체를 합치고 줄어든 바이트 수를 반환합니다.
+
+    같은 이미지가 없으면 0, 처리할 수 없는 구조의 PDF이면 None을 반환하며 파일은 그대로
+    둡니다. 새 파일을 다 쓴 뒤 이름 바꾸기로 교체하므로 도중에 멈춰도 원본이 남습니다.
+    """
+    tmp = f"{path}.{os.getpid()}.dedup.tmp"
+    try:
+        size = os.path.getsize(path)
+        if size == 0:
+            return None
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            new_size = _dedup_images(data, size, tmp)
+        # Windows에서는 열려 있거나 매핑된 파일을 바꿀 수 없으므로 닫은 뒤에 교체
+        if not new_size:
+            return new_size
+        if new_size >= size:
+            os.remove(tmp)
+            return 0
+        os.replace(tmp, path)
+        return size - new_size
+    except BaseException as e:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        if isinstance(e, (OSError, ValueError)):
+            return None
+        raise
+
+
+def _dedup_images(data, size, tmp):
+    """합친 PDF를 tmp에 쓰고 그 크기를 반환합니다. 합칠 이미지가 없으면 0, 처리할 수 없으면 None."""
+    # startxref가 둘 이상이면 점진적 갱신
+    if data.find(b"startxref") != data.rfind(b"startxref") or any(data.find(w) >= 0 for w in _UNSUPPORTED):
+        return None
+    m = re.compile(rb"startxref\s+(\d+)").search(data, max(0, size - 1024))
+    if m is None:
+        return None
+    xref_at = int(m.group(1))
+    if data[xref_at:xref_at + 4] != b"xref":
+        return None
+    trailer_at = data.find(b"trailer", xref_at, size)
+    if trailer_at < 0:
+        return None
+    first = _OBJ_HEADER.search(data, 0, xref_at)
+    if first is None:
+        return None
+    objects = _parse_objects(data, first.start(), xref_at)
+    if len({o.num for o in objects}) != len(objects):
+        return None
+    images = [o for o in objects if o.data_start is not None and _IMAGE.search(data, o.start, o.head_end)]
+    if len(images) < 2:
+        return 0
+
+    view = memoryview(data)
+    stream_hashes = {}
+    for o in images:
+        stream_hashes[o.num] = hashlib.sha256(view[o.data_start:o.data_end]).digest()
+    # SMask처럼 이미지가 다른 이미지를 참조하면 참조한 쪽이 합쳐진 뒤에야 같아지므로 반복
+    remap = {}
+    while True:
+        keep = {}
+        added = False
+        for o in images:
+            if o.num in remap:
+                continue
+            head = data[o.start:o.head_end]
+            head = _LENGTH.sub(b"", head[_OBJ_HEADER.match(head).end():])
+            key = (_remap(head, remap).strip(), stream_hashes[o.num])
+            leader = keep.setdefault(key, o.num)
+            if leader != o.num:
+                remap[o.num] = leader
+                added = True
+        if not added:
+            break
+    if not remap:
+        return 0
+    del view
+
+    trailer_start, trailer_end = _trailer_dict(data, trailer_at, size)
+    trailer = re.sub(rb"/Prev\s+\d+", b"", data[trailer_start:trailer_end])
+    size_match = re.search(rb"/Size\s+(\d+)", trailer)
+    count = max([o.num for o in objects] + [int(size_match.group(1)) - 1 if size_match else 0]) + 1
+
+    offsets = {}
+    gens = {o.num: o.gen for o in objects}
+    with open(tmp, "wb") as out:
+        out.write(data[:first.start()])
+        for o in objects:
+            if o.num in remap:
+                continue
+            offsets[o.num] = out.tell()
+            out.write(_remap(data[o.start:o.head_end], remap))
+            # 스트림 내용은 그대로 복사 (쪽 내용은 이름으로 이미지를 가리키므로 고칠 것 없음)
+            out.write(data[o.head_end:o.end])
+            out.write(b"\n")
+        xref = out.tell()
+        # 지운 객체는 빈 항목 목록으로 이어 붙임
+        free = [n for n in range(1, count) if n not in offsets]
+        next_free = dict(zip(free, free[1:] + [0]))
+        lines = [b"xref\n0 %d\n" % count, b"%010d 65535 f \n" % (free[0] if free else 0)]
+        for n in range(1, count):
+            if n in offsets:
+                lines.append(b"%010d %05d n \n" % (offsets[n], gens[n]))
+            else:
+                lines.append(b"%010d %05d f \n" % (next_free[n], min(65535, gens.get(n, 0) + 1)))
+        out.write(b"".join(lines))
+        out.write(b"trailer\n" + _remap(trailer, remap) + b"\nstartxref\n%d\n%%%%EOF\n" % xref)
+        return out.tell()
@@ -1,110 +1,116 @@
 #!/usr/bin/env python3
 """HWP/HWPX → PDF 대량 변환 GUI 앱"""
 
+import glob
 import os
-import platform
-import shutil
-import subprocess
-import sys
-import tempfile
+import queue
 import threading
+import time
 import tkinter as tk
-import urllib.request
 from tkinter import filedialog, messagebox, ttk
+from tkinter import font as tkfont
+
+from hwp2pdf_cache import ConversionCache
+from hwp2pdf_dedup import InputDeduper
+from hwp2pdf_engine import (
+    IS_WINDOWS,
+    MODE_PROCESS,
+    MODE_SERVER,
+    FileFeed,
+    convert_batch,
+    default_workers,
+    find_soffice,
+    iter_hwp_files,
+    server_available,
+    soffice_version,
+    user_cache_dir,
+)
+from hwp2pdf_export import DEFAULT_PROFILE, PROFILES, parse_profile
+from hwp2pdf_journal import JobJournal, latest_unfinished
+from hwp2pdf_metrics import BatchMetrics
+from hwp2pdf_profile import ensure_template
+from hwp2pdf_schedule import CostModel
+from hwp2pdf_watchdog import Quarantine, Watchdog
 
-IS_WINDOWS = platform.system() == "Windows"
+SCAN_BATCH = 500  # 폴더 검색 결과를 목록에 넣는 단위
+SCAN_INTERVAL = 0.2  # 초
 
-SOFFICE_PATHS_MAC = [
-    "/Applications/LibreOffice.app/Contents/MacOS/soffice",
-    "/usr/bin/soffice",
-    "/usr/local/bin/soffice",
-]
 
-SOFFICE_PATHS_WIN = [
-    os.path.join(os.environ.get("PROGRAMFILES", r"C:\Program Files"), "LibreOffice", "program", "soffice.exe"),
-    os.path.join(os.environ.get("PROGRAMFILES(X86)", r"C:\Program Files (x86)"), "LibreOffice", "program", "soffice.exe"),
-]
+def _split_patterns(text):
+    """'*견본*;backup' 같은 입력을 glob 패턴 목록으로 나눕니다."""
+    return [p.strip() for p in text.replace(",", ";").split(";") if p.strip()]
 
 
-LIBREOFFICE_VERSION = "25.2.7"
-LIBREOFFICE_MSI_URL = (
-    f"https://download.documentfoundation.org/libreoffice/stable/"
-    f"{LIBREOFFICE_VERSION}/win/x86_64/"
-    f"LibreOffice_{LIBREOFFICE_VERSION}_Win_x86-64.msi"
-)
+UI_TICK_MS = 100  # 작업 스레드 → 화면 이벤트를 반영하는 주기
+UI_MAX_EVENTS = 5000  # 한 번에 반영할 최대 이벤트 수
+CLOSE_WAIT = 10  # 창을 닫을 때 변환 스레드가 정리를 마치길 기다리는 최대 시간 (초)
+LOG_MAX_LINES = 2000  # 화면 로그에 남길 줄 수 (전체 로그는 파일에 저장)
+KEEP_LOGS = 20
 
 
-def find_soffice():
-    candidates = SOFFICE_PATHS_WIN if IS_WINDOWS else SOFFICE_PATHS_MAC
-    for p in candidates:
-        if os.path.isfile(p):
-            return p
-    # PATH에서 찾기
-    try:
-        cmd = "where" if IS_WINDOWS else "which"
-        result = subprocess.run(
-            [cmd, "soffice"], capture_output=True, text=True, timeout=5
-        )
-        if result.returncode == 0:
-            return result.stdout.strip().splitlines()[0]
-    except Exception:
-        pass
-    return None
-
-
-def download_and_install_libreoffice(status_callback=None):
-    """Windows에서 LibreOffice MSI를 다운로드하고 자동 설치합니다."""
-    if not IS_WINDOWS:
-        return False
-
-    msi_path = os.path.join(tempfile.gettempdir(), f"LibreOffice_{LIBREOFFICE_VERSION}_Win_x86-64.msi")
-
-    # 다운로드
-    if status_callback:
-        status_callback("LibreOffice 다운로드 중... (약 350MB, 잠시 기다려주세요)")
-
-    try:
-        def _reporthook(block_num, block_size, total_size):
-            downloaded = block_num * block_size
-            if total_size > 0:
-                pct = min(downloaded * 100 // total_size, 100)
-                mb_down = downloaded // (1024 * 1024)
-                mb_total = total_size // (1024 * 1024)
-                if status_callback:
-                    status_callback(f"LibreOffice 다운로드 중... {mb_down}MB / {mb_total}MB ({pct}%)")
-
-        urllib.request.urlretrieve(LIBREOFFICE_MSI_URL, msi_path, reporthook=_reporthook)
-    except Exception as e:
-        if status_callback:
-            status_callback(f"다운로드 실패: {e}")
-        return False
-
-    # 자동 설치 (msiexec /passive = 진행률만 표시, 사용자 입력 불필요)
-    if status_callback:
-        status_callback("LibreOffice 설치 중... (자동 설치, 잠시 기다려주세요)")
-
-    try:
-        result = subprocess.run(
-            ["msiexec", "/i", msi_path, "/passive", "/norestart"],
-            timeout=600,
-        )
-        if result.returncode != 0:
-            if status_callback:
-                status_callback(f"설치 실패 (코드: {result.returncode})")
-            return False
-    except Exception as e:
-        if status_callback:
-            status_callback(f"설치 오류: {e}")
-        return False
-    finally:
-        try:
-            os.remove(msi_path)
-        except OSError:
-            pass
+class VirtualList(ttk.Frame):
+    """보이는 줄만 그리는 파일 목록
+
+    항목을 Listbox에 모두 넣지 않고 items 목록을 참조해 화면에 보이는 부분만
+    채우므로, 10만 개가 넘는 파일도 추가/스크롤이 느려지지 않습니다.
+    """
+
+    def __init__(self, parent, items, height=8, formatter=os.path.basename):
+        super().__init__(parent)
+        self.items = items
+        self.formatter = formatter
+        self.offset = 0
+        self.rows = height
 
-    if status_callback:
-        status_callback("LibreOffice 설치 완료!")
-    return True
+        self.listbox = tk.Listbox(self, height=height, activestyle="none")
+        self.scrollbar = ttk.Scrollbar(self, orient="vertical", command=self._on_scroll)
+        self.listbox.pack(side="left", fill="both", expand=True)
+        self.scrollbar.pack(side="right", fill="y")
+        self._linespace = tkfont.Font(font=self.listbox.cget("font")).metrics("linespace")
+
+        self.listbox.bind("<Configure>", self._on_resize)
+        self.listbox.bind("<MouseWheel>", self._on_wheel)
+        self.listbox.bind("<Button-4>", lambda e: self._scroll_by(-3))
+        self.listbox.bind("<Button-5>", lambda e: self._scroll_by(3))
+
+    def set_items(self, items):
+        self.items = items
+        self.offset = 0
+        self.refresh()
+
+    def refresh(self):
+        total = len(self.items)
+        self.offset = max(0, min(self.offset, total - self.rows))
+        visible = self.items[self.offset:self.offset + self.rows]
+        self.listbox.delete(0, "end")
+        if visible:
+            self.listbox.insert("end", *[self.formatter(p) for p in visible])
+        if total:
+            self.scrollbar.set(self.offset / total, min(1.0, (self.offset + self.rows) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def _scroll_by(self, n):
+        self.offset += n
+        self.refresh()
+
+    def _on_scroll(self, *args):
+        if args[0] == "moveto":
+            self.offset = int(float(args[1]) * len(self.items))
+            self.refresh()
+        elif args[0] == "scroll":
+            n = int(args[1])
+            self._scroll_by(n * self.rows if args[2] == "pages" else n)
+
+    def _on_wheel(self, event):
+        self._scroll_by(-3 if event.delta > 0 else 3)
+        return "break"
+
+    def _on_resize(self, event):
+        rows = max(1, (event.height - 4) // self._linespace)
+        if rows != self.rows:
+            self.rows = rows
+            self.refresh()
 
 
 class MultiFolderDialog:
@@ -256,8 +262,20 @@ class HwpToPdfApp:
         self.files = []
         self.output_dir = ""
         self.converting = False
+        self.journal = None
+        self._resume_state = None
+        self._file_set = set()
+        self._scans = 0  # 진행 중인 폴더 검색 수
+        self._scan_gen = 0  # 목록을 초기화하면 증가 (진행 중인 검색 결과 무시)
+        self._feed = None  # 변환 중일 때 새로 찾은 파일을 넘겨받는 입력 목록
+        self._watchdog = None  # 변환 중인 일괄 변환의 감시 (일시 정지/취소)
+        self._worker = None  # 변환 스레드
+        self._events = queue.Queue()  # 작업 스레드 → 화면 이벤트
+        self._log_file = None
 
         self._build_ui()
+        self.root.protocol("WM_DELETE_WINDOW", self._on_close)
+        self.root.after(UI_TICK_MS, self._drain_events)
 
     def _build_ui(self):
         pad = {"padx": 10, "pady": 5}
@@ -281,14 +299,25 @@ class HwpToPdfApp:
         self.lbl_count = ttk.Label(btn_frame, text="0개 파일")
         self.lbl_count.pack(side="right")
 
+        scan_frame = ttk.Frame(frame_files)
+        scan_frame.pack(fill="x", padx=8, pady=(0, 5))
+        self.var_recursive = tk.BooleanVar(value=True)
+        ttk.Checkbutton(
+            scan_frame, text="하위 폴더 포함", variable=self.var_recursive
+        ).pack(side="left")
+        ttk.Label(scan_frame, text="포함:").pack(side="left", padx=(12, 0))
+        self.var_include = tk.StringVar(value="")
+        ttk.Entry(scan_frame, textvariable=self.var_include, width=14).pack(side="left", padx=(4, 0))
+        ttk.Label(scan_frame, text="제외:").pack(side="left", padx=(12, 0))
+        self.var_exclude = tk.StringVar(value="")
+        ttk.Entry(scan_frame, textvariable=self.var_exclude, width=14).pack(side="left", padx=(4, 0))
+        ttk.Label(scan_frame, text="(예: *견본*;backup)").pack(side="left", padx=(4, 0))
+
         list_frame = ttk.Frame(frame_files)
         list_frame.pack(fill="both", expand=True, padx=8, pady=(0, 8))
 
-        self.listbox = tk.Listbox(list_frame, height=8, selectmode="extended")
-        scrollbar = ttk.Scrollbar(list_frame, orient="vertical", command=self.listbox.yview)
-        self.listbox.configure(yscrollcommand=scrollbar.set)
-        self.listbox.pack(side="left", fill="both", expand=True)
-        scrollbar.pack(side="right", fill="y")
+        self.file_list = VirtualList(list_frame, self.files, height=8)
+        self.file_list.pack(fill="both", expand=True)
 
         # --- 출력 폴더 ---
         frame_out = ttk.LabelFrame(self.root, text="2. 출력 폴더")
@@ -311,6 +340,47 @@ class HwpToPdfApp:
         prog_inner = ttk.Frame(frame_prog)
         prog_inner.pack(fill="x", padx=8, pady=8)
 
+        opt_frame = ttk.Frame(prog_inner)
+        opt_frame.pack(fill="x", pady=(0, 5))
+        ttk.Label(opt_frame, text="동시 변환 수:").pack(side="left")
+        self.var_workers = tk.IntVar(value=default_workers())
+        ttk.Spinbox(
+            opt_frame, from_=1, to=64, width=5, textvariable=self.var_workers
+        ).pack(side="left", padx=(4, 0))
+        ttk.Label(opt_frame, text="묶음 크기:").pack(side="left", padx=(12, 0))
+        self.var_chunk = tk.IntVar(value=1)
+        ttk.Spinbox(
+            opt_frame, from_=1, to=200, width=5, textvariable=self.var_chunk
+        ).pack(side="left", padx=(4, 0))
+        self.var_server = tk.BooleanVar(value=False)
+        ttk.Checkbutton(
+            opt_frame, text="상주 LibreOffice 사용 (빠름, pyuno 필요)", variable=self.var_server
+        ).pack(side="left", padx=(12, 0))
+        self.var_cache = tk.BooleanVar(value=True)
+        ttk.Checkbutton(
+            opt_frame, text="변환 캐시", variable=self.var_cache
+        ).pack(side="left", padx=(12, 0))
+        self.var_schedule = tk.BooleanVar(value=True)
+        ttk.Checkbutton(
+            opt_frame, text="큰 파일 먼저", variable=self.var_schedule
+        ).pack(side="left", padx=(12, 0))
+
+        pdf_frame = ttk.Frame(prog_inner)
+        pdf_frame.pack(fill="x", pady=(0, 5))
+        ttk.Label(pdf_frame, text="PDF 프로필:").pack(side="left")
+        self.var_profile = tk.StringVar(value=DEFAULT_PROFILE)
+        ttk.Combobox(
+            pdf_frame, values=list(PROFILES), width=10, state="readonly",
+            textvariable=self.var_profile,
+        ).pack(side="left", padx=(4, 0))
+        ttk.Label(
+            pdf_frame, text="(compact: JPEG 75·150DPI, screen: 50·75DPI, archive: PDF/A-2b)"
+        ).pack(side="left", padx=(6, 0))
+        self.var_dedup_images = tk.BooleanVar(value=False)
+        ttk.Checkbutton(
+            pdf_frame, text="같은 이미지 합치기", variable=self.var_dedup_images
+        ).pack(side="left", padx=(12, 0))
+
         self.progress = ttk.Progressbar(prog_inner, mode="determinate")
         self.progress.pack(fill="x", pady=(0, 5))
 
@@ -329,17 +399,146 @@ class HwpToPdfApp:
         log_scroll.pack(side="right", fill="y")
 
         # --- 변환 버튼 ---
+        action_frame = ttk.Frame(self.root)
+        action_frame.pack(pady=10)
         self.btn_convert = ttk.Button(
-            self.root, text="변환 시작", command=self._start_convert
+            action_frame, text="변환 시작", command=self._start_convert
         )
-        self.btn_convert.pack(pady=10)
+        self.btn_convert.pack(side="left", padx=(0, 5))
+        self.btn_resume = ttk.Button(
+            action_frame, text="지난 작업 이어하기", command=self._resume_last
+        )
+        self.btn_resume.pack(side="left", padx=(0, 5))
+        self.btn_pause = ttk.Button(
+            action_frame, text="일시 정지", command=self._toggle_pause, state="disabled"
+        )
+        self.btn_pause.pack(side="left", padx=(0, 5))
+        self.btn_cancel = ttk.Button(
+            action_frame, text="취소", command=self._cancel_convert, state="disabled"
+        )
+        self.btn_cancel.pack(side="left")
+
+    def _on_close(self):
+        # LibreOffice는 따로 세션(프로세스 그룹)으로 실행되어 창을 닫아도 남으므로
+        # 먼저 모두 종료하고, 변환 스레드가 정리(캐시/작업 기록 닫기)를 마칠 때까지 잠시 기다림
+        watchdog = self._watchdog
+        if watchdog is not None:
+            watchdog.cancel()
+        if self._feed is not None:
+            self._feed.close()
+        worker = self._worker
+        if worker is not None and worker.is_alive():
+            worker.join(CLOSE_WAIT)
+        # 변환 중에 닫아도 지금까지의 작업 기록은 남겨서 이어서 변환할 수 있게 함
+        journal = self.journal
+        if journal is not None:
+            journal.close()
+        self._close_log_file()
+        self.root.destroy()
+
+    # --- 작업 스레드 → 화면 ---
+    # 작업 스레드는 root.after를 직접 부르지 않고 이벤트 큐에 넣기만 하며,
+    # 화면 스레드가 UI_TICK_MS마다 모아서 반영합니다. 진행률은 마지막 값만 씁니다.
+
+    def _post_log(self, msg):
+        self._events.put(("log", msg))
+
+    def _post_progress(self, done, total, status):
+        self._events.put(("progress", done, total, status))
+
+    def _post_call(self, fn, *args):
+        self._events.put(("call", fn, args))
+
+    def _drain_events(self):
+        # 이벤트 하나가 실패해도 다음 주기는 꼭 예약해야 진행률/로그가 멈추지 않음
+        try:
+            self._apply_events()
+        finally:
+            self.root.after(UI_TICK_MS, self._drain_events)
 
-    def _log(self, msg):
+    def _apply_events(self):
+        lines = []
+        progress = None
+        try:
+            for _ in range(UI_MAX_EVENTS):
+                event = self._events.get_nowait()
+                kind = event[0]
+                if kind == "log":
+                    lines.append(event[1])
+                elif kind == "progress":
+                    progress = event[1:]
+                else:
+                    # 순서를 지키기 위해 앞의 로그/진행률을 먼저 반영
+                    self._write_log(lines)
+                    lines = []
+                    if progress is not None:
+                        self._apply_progress(*progress)
+                        progress = None
+                    try:
+                        event[1](*event[2])
+                    except Exception as e:
+                        lines.append(f"화면 갱신 중 오류: {e}")
+        except queue.Empty:
+            pass
+        self._write_log(lines)
+        if progress is not None:
+            self._apply_progress(*progress)
+
+    def _apply_progress(self, done, total, status):
+        self.progress.config(maximum=max(total, 1), value=done)
+        self.lbl_status.config(text=status)
+
+    def _write_log(self, lines):
+        if not lines:
+            return
+        text = "\n".join(lines) + "\n"
+        if self._log_file is not None:
+            try:
+                self._log_file.write(text)
+            except OSError as e:
+                # 디스크가 가득 찬 경우 등: 파일 저장만 멈추고 화면 로그는 계속 보여 줌
+                self._drop_log_file()
+                text += f"로그 파일에 쓸 수 없어 저장을 멈춥니다: {e}\n"
         self.log_text.configure(state="normal")
-        self.log_text.insert("end", msg + "\n")
+        self.log_text.insert("end", text)
+        # 화면에는 최근 LOG_MAX_LINES줄만 유지
+        count = int(self.log_text.index("end-1c").split(".")[0]) - 1
+        if count > LOG_MAX_LINES:
+            self.log_text.delete("1.0", f"{count - LOG_MAX_LINES + 1}.0")
         self.log_text.see("end")
         self.log_text.configure(state="disabled")
 
+    def _open_log_file(self):
+        """이번 변환의 전체 로그를 저장할 파일을 엽니다."""
+        log_dir = os.path.join(user_cache_dir(), "logs")
+        try:
+            os.makedirs(log_dir, exist_ok=True)
+            old_logs = sorted(glob.glob(os.path.join(log_dir, "*.log")), key=os.path.getmtime)
+            for path in old_logs[:-(KEEP_LOGS - 1)]:
+                os.remove(path)
+                metrics_path = path[:-len(".log")] + ".metrics.jsonl"
+                if os.path.exists(metrics_path):
+                    os.remove(metrics_path)
+            path = os.path.join(log_dir, time.strftime("%Y%m%d-%H%M%S") + ".log")
+            self._log_file = open(path, "w", encoding="utf-8")
+        except OSError:
+            self._log_file = None
+
+    def _drop_log_file(self):
+        log_file, self._log_file = self._log_file, None
+        try:
+            log_file.close()
+        except OSError:
+            pass
+
+    def _close_log_file(self):
+        if self._log_file is not None:
+            path = self._log_file.name
+            self._log_file.close()
+            self._log_file = None
+            return path
+        return None
+
     def _add_files(self):
         paths = filedialog.askopenfilenames(
             title="HWP/HWPX 파일 선택",
@@ -351,26 +550,73 @@ class HwpToPdfApp:
         dialog = MultiFolderDialog(self.root, title="HWP 파일이 있는 폴더 선택")
         if not dialog.result:
             return
-        found = []
-        for folder in dialog.result:
-            for f in os.listdir(folder):
-                if f.lower().endswith((".hwp", ".hwpx")):
-                    found.append(os.path.join(folder, f))
-        found.sort()
-        self._append_files(found)
-
-    def _append_files(self, paths):
-        existing = set(self.files)
+        # 큰 폴더도 창이 멈추지 않도록 백그라운드에서 검색하며 조금씩 목록에 추가
+        self._scans += 1
+        self._update_count()
+        args = (
+            dialog.result,
+            self._scan_gen,
+            self.var_recursive.get(),
+            _split_patterns(self.var_include.get()),
+            _split_patterns(self.var_exclude.get()),
+        )
+        threading.Thread(target=self._scan_worker, args=args, daemon=True).start()
+
+    def _scan_worker(self, folders, gen, recursive, include, exclude):
+        batch = []
+        last = time.monotonic()
+        for path in iter_hwp_files(folders, recursive, include, exclude):
+            if gen != self._scan_gen:
+                break
+            batch.append(path)
+            if len(batch) >= SCAN_BATCH or time.monotonic() - last >= SCAN_INTERVAL:
+                self._post_call(self._append_files, batch, gen)
+                batch = []
+                last = time.monotonic()
+        self._post_call(self._append_files, batch, gen)
+        self._post_call(self._scan_done, gen)
+
+    def _scan_done(self, gen):
+        if gen != self._scan_gen:
+            return
+        self._scans -= 1
+        self._update_count()
+        if self._scans == 0 and self._feed is not None:
+            self._feed.close()
+
+    def _update_count(self):
+        text = f"{len(self.files)}개 파일"
+        if self._scans:
+            text += " (검색 중...)"
+        self.lbl_count.config(text=text)
+
+    def _append_files(self, paths, gen=None):
+        if gen is not None and gen != self._scan_gen:
+            return
+        self._resume_state = None
+        added = []
         for p in paths:
-            if p not in existing:
+            if p not in self._file_set:
+                self._file_set.add(p)
                 self.files.append(p)
-                self.listbox.insert("end", os.path.basename(p))
-        self.lbl_count.config(text=f"{len(self.files)}개 파일")
+                added.append(p)
+        if added:
+            self.file_list.refresh()
+        # 변환 중이면 새로 찾은 파일을 바로 변환 대기열에 넣음
+        if added and self._feed is not None:
+            self._feed.put(added)
+        self._update_count()
 
     def _clear_files(self):
+        if self.converting:
+            return
+        self._resume_state = None
+        self._scan_gen += 1
+        self._scans = 0
         self.files.clear()
-        self.listbox.delete(0, "end")
-        self.lbl_count.config(text="0개 파일")
+        self._file_set.clear()
+        self.file_list.refresh()
+        self._update_count()
 
     def _select_output(self):
         folder = filedialog.askdirectory(title="PDF 출력 폴더 선택")
@@ -382,12 +628,43 @@ class HwpToPdfApp:
         self.output_dir = ""
         self.var_outdir.set("(원본 파일과 같은 폴더)")
 
+    def _resume_last(self):
+        """마지막으로 중단된 작업의 남은 파일을 불러와 이어서 변환합니다."""
+        if self.converting:
+            return
+        state = latest_unfinished()
+        if state is None:
+            messagebox.showinfo("알림", "이어서 변환할 작업이 없습니다.")
+            return
+
+        self._clear_files()
+        self.files = state.pending
+        self._file_set = set(self.files)
+        self.file_list.set_items(self.files)
+        self._update_count()
+        if state.output_dir:
+            self.output_dir = state.output_dir
+            self.var_outdir.set(state.output_dir)
+        else:
+            self._reset_output()
+        # 남은 파일도 처음과 같은 PDF 설정으로 내보냄 (CLI --resume과 같음)
+        options = state.options
+        self.var_profile.set(options.get("pdf_profile", self.var_profile.get()))
+        self.var_dedup_images.set(bool(options.get("dedup_images", self.var_dedup_images.get())))
+        self._resume_state = state
+        self._start_convert()
+
     def _start_convert(self):
         if self.converting:
             return
-        if not self.files:
+        if not self.files and not self._scans:
             messagebox.showwarning("알림", "변환할 파일을 추가해 주세요.")
             return
+        try:
+            settings = self._convert_settings()
+        except ValueError as e:
+            messagebox.showerror("PDF 프로필", str(e))
+            return
 
         soffice = find_soffice()
         if not soffice:
@@ -399,13 +676,11 @@ class HwpToPdfApp:
                     "(약 350MB 다운로드, 자동 설치)",
                 )
                 if answer:
-                    self.converting = True
-                    self.btn_convert.config(state="disabled")
-                    self.log_text.configure(state="normal")
-                    self.log_text.delete("1.0", "end")
-                    self.log_text.configure(state="disabled")
-                    thread = threading.Thread(target=self._install_and_convert, daemon=True)
-                    thread.start()
+                    self._begin_convert(settings)
+                    self._worker = threading.Thread(
+                        target=self._install_and_convert, args=(settings,), daemon=True
+                    )
+                    self._worker.start()
                 return
             else:
                 messagebox.showerror(
@@ -416,134 +691,291 @@ class HwpToPdfApp:
                 )
                 return
 
+        self._begin_convert(settings)
+        self._worker = threading.Thread(
+            target=self._convert_worker, args=(soffice, settings), daemon=True
+        )
+        self._worker.start()
+
+    def _convert_settings(self):
+        """화면의 변환 설정을 읽습니다. (화면 스레드)
+
+        Tk 변수는 화면 스레드에서만 읽을 수 있으므로 작업 스레드에는 이 값만 넘깁니다.
+        PDF 프로필이 잘못되었으면 ValueError가 납니다.
+        """
+        return {
+            "server": bool(self.var_server.get()),
+            "export": parse_profile(self.var_profile.get(), self.var_dedup_images.get()),
+            "cache": bool(self.var_cache.get()),
+            "schedule": bool(self.var_schedule.get()),
+            "workers": self._get_workers(),
+            "chunk_size": self._get_chunk_size(),
+            "output_dir": self.output_dir,
+            "resume": self._resume_state,
+        }
+
+    def _begin_convert(self, settings):
+        """변환 입력, 로그 파일과 화면을 준비하고 settings에 채웁니다. (화면 스레드)
+
+        검색이 진행 중이면 변환 입력(FileFeed)에 찾는 대로 이어 붙입니다.
+        검색이 끝났으면 목록을 그대로 넘겨 전체를 예상 시간 순으로 정렬할 수 있게 합니다.
+        """
+        self._feed = FileFeed(self.files) if self._scans else None
+        settings["files"] = self._feed if self._feed is not None else list(self.files)
+        settings["total"] = len(self.files)
+        # 감시는 화면 스레드에서 만들어 두어, 변환이 시작되기 전에 창을 닫아도 취소할 수 있게 함
+        self._watchdog = settings["watchdog"] = Watchdog()
+        self._resume_state = None
         self.converting = True
         self.btn_convert.config(state="disabled")
+        self.btn_resume.config(state="disabled")
         self.log_text.configure(state="normal")
         self.log_text.delete("1.0", "end")
         self.log_text.configure(state="disabled")
+        self._close_log_file()
+        self._open_log_file()
+        settings["log_path"] = self._log_file.name if self._log_file is not None else None
+
+    def _end_convert(self, title=None, text=None, error=False):
+        """변환이 끝났을 때 화면을 정리합니다. (화면 스레드)"""
+        log_path = self._close_log_file()
+        self.btn_convert.config(state="normal")
+        self.btn_resume.config(state="normal")
+        self.btn_pause.config(state="disabled", text="일시 정지")
+        self.btn_cancel.config(state="disabled")
+        self._watchdog = None
+        self._worker = None
+        self._feed = None
+        self.converting = False
+        if title is None:
+            return
+        if log_path and not error:
+            text = f"{text}\n\n전체 로그: {log_path}"
+        if error:
+            messagebox.showerror(title, text)
+        else:
+            messagebox.showinfo(title, text)
+
+    def _converting_started(self):
+        """일괄 변환이 시작되면 일시 정지/취소 버튼을 켭니다. (화면 스레드)"""
+        if not self.converting:
+            return
+        self.btn_pause.config(state="normal")
+        self.btn_cancel.config(state="normal")
 
-        thread = threading.Thread(target=self._convert_worker, args=(soffice,), daemon=True)
-        thread.start()
+    def _toggle_pause(self):
+        watchdog = self._watchdog
+        if watchdog is None:
+            return
+        if watchdog.paused:
+            watchdog.resume()
+            self.btn_pause.config(text="일시 정지")
+            self._write_log(["계속 변환합니다."])
+        else:
+            # Linux/macOS에서는 실행 중인 LibreOffice도 멈추며, 멈춘 시간은 시간 제한에서 뺌
+            watchdog.pause()
+            self.btn_pause.config(text="계속")
+            if IS_WINDOWS:
+                self._write_log(["일시 정지했습니다. (실행 중인 변환은 끝까지 진행)"])
+            else:
+                self._write_log(["일시 정지했습니다. (실행 중인 변환도 멈춤)"])
 
-    def _install_and_convert(self):
+    def _cancel_convert(self):
+        watchdog = self._watchdog
+        if watchdog is None or watchdog.cancelled.is_set():
+            return
+        if not messagebox.askyesno(
+            "변환 취소",
+            "변환을 취소할까요?\n\n남은 파일은 \"지난 작업 이어하기\"로 나중에 변환할 수 있습니다.",
+        ):
+            return
+        watchdog.cancel()
+        # 폴더 검색이 아직 진행 중이어도 변환 입력은 닫아서 작업자가 기다리지 않게 함
+        if self._feed is not None:
+            self._feed.close()
+        self.btn_pause.config(state="disabled", text="일시 정지")
+        self.btn_cancel.config(state="disabled")
+        self._write_log(["취소하는 중... 실행 중인 LibreOffice를 종료합니다."])
+
+    def _install_and_convert(self, settings):
         """LibreOffice를 설치한 뒤 변환을 이어서 실행합니다."""
         def _status(msg):
-            self.root.after(0, lambda: self.lbl_status.config(text=msg))
-            self.root.after(0, lambda: self._log(msg))
+            self._post_progress(0, 1, msg)
+            self._post_log(msg)
+
+        # 설치/다운로드 코드(urllib 등)는 설치할 때만 불러옴
+        from hwp2pdf_install import download_and_install_libreoffice
 
         _status("LibreOffice 자동 설치를 시작합니다...")
         ok = download_and_install_libreoffice(status_callback=_status)
 
         if not ok:
-            self.root.after(0, lambda: messagebox.showerror(
-                "설치 실패",
+            self._post_call(
+                self._end_convert, "설치 실패",
                 "LibreOffice 자동 설치에 실패했습니다.\n\n"
                 "https://www.libreoffice.org 에서 직접 설치해 주세요.",
-            ))
-            self.root.after(0, lambda: self.btn_convert.config(state="normal"))
-            self.converting = False
+                True,
+            )
             return
 
         soffice = find_soffice()
         if not soffice:
-            self.root.after(0, lambda: messagebox.showerror(
-                "오류", "설치 후에도 LibreOffice를 찾을 수 없습니다."
-            ))
-            self.root.after(0, lambda: self.btn_convert.config(state="normal"))
-            self.converting = False
+            self._post_call(
+                self._end_convert, "오류", "설치 후에도 LibreOffice를 찾을 수 없습니다.", True
+            )
             return
 
-        self.root.after(0, lambda: self._log(""))
-        self._convert_worker(soffice)
+        self._post_log("")
+        self._convert_worker(soffice, settings)
 
-    def _convert_worker(self, soffice):
-        total = len(self.files)
-        success = 0
-        fail = 0
-        failed_names = []
+    def _get_workers(self):
+        try:
+            return max(1, int(self.var_workers.get()))
+        except (tk.TclError, ValueError):
+            return default_workers()
 
-        # 임시 사용자 프로필 디렉토리 생성 (LibreOffice 인스턴스 lock 충돌 방지)
-        tmp_profile = tempfile.mkdtemp(prefix="hwp2pdf_profile_")
-        profile_url = "file:///" + tmp_profile.replace("\\", "/")
+    def _get_chunk_size(self):
+        try:
+            return max(1, int(self.var_chunk.get()))
+        except (tk.TclError, ValueError):
+            return 1
 
-        self.root.after(0, lambda: self.progress.config(maximum=total, value=0))
-        self.root.after(0, lambda: self.lbl_status.config(text=f"변환 중... 0/{total}"))
+    def _convert_worker(self, soffice, settings):
+        """작업 스레드: 일괄 변환을 실행하고, 어떤 오류가 나도 화면을 변환 전 상태로 되돌립니다."""
+        try:
+            self._run_batch(soffice, settings)
+        except Exception as e:
+            if self.journal is not None:
+                # 남은 파일은 "지난 작업 이어하기"로 변환할 수 있게 완료로 표시하지 않음
+                self.journal.close()
+                self.journal = None
+            self._post_log(f"오류: {e}")
+            self._post_call(self._end_convert, "오류", f"변환 중 오류가 발생했습니다.\n\n{e}", True)
+
+    def _run_batch(self, soffice, settings):
+        files = settings["files"]
+        total = settings["total"]
+
+        self._post_progress(0, total, f"변환 중... 0/{total}")
+
+        def _on_start(idx, filepath):
+            self._post_log(f"[{idx + 1}] {os.path.basename(filepath)} ...")
+
+        def _on_result(idx, result, summary):
+            self._post_log(f"  -> [{idx + 1}] {result.name}: {result.message()}")
+            self._post_progress(
+                summary.done, summary.total,
+                f"변환 중... {summary.done}/{summary.total}  -  {result.name}",
+            )
+
+        mode = MODE_SERVER if settings["server"] else MODE_PROCESS
+        if mode == MODE_SERVER and not server_available(soffice):
+            self._post_log("UNO 파이썬 모듈을 찾을 수 없어 일반 모드로 변환합니다.")
+            mode = MODE_PROCESS
+
+        # PDF 내보내기 프로필 (이미지 품질/해상도, PDF/A)
+        export = settings["export"]
+
+        # 같은 문서는 다시 변환하지 않도록 내용 해시 캐시 사용 (프로필마다 따로)
+        version = soffice_version(soffice)
+        cache = None
+        if settings["cache"]:
+            try:
+                cache = ConversionCache(version, variant=export.cache_variant())
+            except Exception as e:
+                self._post_log(f"캐시를 열 수 없어 사용하지 않습니다: {e}")
 
-        for i, filepath in enumerate(self.files):
-            name = os.path.basename(filepath)
-            outdir = self.output_dir if self.output_dir else os.path.dirname(filepath)
+        # 초기화된 프로필 템플릿을 복제해 작업자마다 드는 첫 시작 비용 제거
+        # (LibreOffice 버전별로 처음 한 번만 만듦)
+        template = ensure_template(soffice, version)
+        if template is None:
+            self._post_log("LibreOffice 프로필 템플릿을 만들 수 없어 빈 프로필로 시작합니다.")
 
-            self.root.after(0, lambda n=name, idx=i: (
-                self.lbl_status.config(text=f"변환 중... {idx + 1}/{total}  -  {n}"),
-                self._log(f"[{idx + 1}/{total}] {n} ..."),
-            ))
+        # 여러 폴더에 복사된 같은 문서는 한 번만 변환하고 PDF를 reflink/복사 (사본끼리 파일을 공유하지 않음)
+        dedupe = InputDeduper(cache.digest if cache is not None else None)
 
-            # 변환 전 출력 폴더 확인/생성
-            os.makedirs(outdir, exist_ok=True)
+        # 예상 변환 시간이 긴 파일부터, 파일마다 맞춘 시간 제한으로 변환
+        scheduler = CostModel(mode) if settings["schedule"] else None
 
-            # 예상 PDF 파일 경로
-            base_name = os.path.splitext(name)[0]
-            expected_pdf = os.path.join(outdir, base_name + ".pdf")
+        # 메모리 상한/멈춤 감시, 계속 강제 종료되는 파일은 격리
+        watchdog = settings["watchdog"]
+        quarantine = Quarantine()
+        self._post_call(self._converting_started)
 
+        # 파일별 단계 시간은 로그 옆에 JSON Lines로 저장
+        metrics = None
+        if settings["log_path"]:
             try:
-                cmd = [
-                    soffice,
-                    "--headless",
-                    "--norestore",
-                    f"-env:UserInstallation={profile_url}",
-                    "--convert-to", "pdf",
-                    "--outdir", outdir,
-                    filepath,
-                ]
-                result = subprocess.run(
-                    cmd, capture_output=True, text=True, timeout=120,
+                metrics = BatchMetrics(settings["log_path"][:-len(".log")] + ".metrics.jsonl")
+            except OSError:
+                pass
+
+        # 작업 기록 (중단되면 "지난 작업 이어하기"로 남은 파일부터 변환)
+        state = settings["resume"]
+        workers = settings["workers"]
+        chunk_size = settings["chunk_size"]
+        output_dir = settings["output_dir"]
+        try:
+            if state is not None:
+                self.journal = JobJournal.reopen(state)
+                self._post_log(
+                    f"지난 작업 이어하기: 이전 성공 {state.success}, 실패 {state.fail}, 남은 파일 {total}"
                 )
-                if result.returncode == 0 and os.path.isfile(expected_pdf):
-                    success += 1
-                    self.root.after(0, lambda p=expected_pdf: self._log(f"  -> 완료: {p}"))
-                elif result.returncode == 0:
-                    # returncode 0이지만 PDF 미생성
-                    fail += 1
-                    failed_names.append(name)
-                    stderr_msg = result.stderr.strip() if result.stderr else ""
-                    stdout_msg = result.stdout.strip() if result.stdout else ""
-                    detail = stderr_msg or stdout_msg or "PDF 파일이 생성되지 않음"
-                    self.root.after(0, lambda d=detail: self._log(f"  -> 실패 (PDF 미생성): {d}"))
-                else:
-                    fail += 1
-                    failed_names.append(name)
-                    stderr_msg = result.stderr.strip() if result.stderr else ""
-                    stdout_msg = result.stdout.strip() if result.stdout else ""
-                    detail = stderr_msg or stdout_msg or f"종료코드: {result.returncode}"
-                    self.root.after(0, lambda d=detail: self._log(f"  -> 실패: {d}"))
-            except subprocess.TimeoutExpired:
-                fail += 1
-                failed_names.append(name)
-                self.root.after(0, lambda n=name: self._log(f"  -> 시간 초과"))
-            except Exception as e:
-                fail += 1
-                failed_names.append(name)
-                self.root.after(0, lambda n=name, e=e: self._log(f"  -> 오류: {e}"))
-
-            self.root.after(0, lambda v=i + 1: self.progress.config(value=v))
-
-        # 임시 프로필 정리
-        shutil.rmtree(tmp_profile, ignore_errors=True)
+            else:
+                self.journal = JobJournal.create(output_dir=output_dir, options={
+                    "workers": workers, "mode": mode, "chunk_size": chunk_size,
+                    "schedule": scheduler is not None,
+                    "pdf_profile": export.name, "dedup_images": export.dedup_images,
+                })
+        except OSError as e:
+            self.journal = None
+            self._post_log(f"작업 기록을 남길 수 없습니다: {e}")
+
+        # 작업자마다 임시 프로필을 따로 사용 (LibreOffice 인스턴스 lock 충돌 방지)
+        try:
+            summary = convert_batch(
+                soffice, files, output_dir,
+                workers=workers, mode=mode, chunk_size=chunk_size,
+                cache=cache, journal=self.journal, scheduler=scheduler,
+                watchdog=watchdog, quarantine=quarantine, preflight=True, metrics=metrics,
+                dedupe=dedupe, stage=True, profile_template=template, export=export,
+                on_start=_on_start, on_result=_on_result,
+            )
+        finally:
+            if cache is not None:
+                cache.close()
+            if scheduler is not None:
+                scheduler.save()
+            quarantine.save()
+            if metrics is not None:
+                metrics.close()
+        if self.journal is not None:
+            # 취소했으면 남은 파일을 이어서 변환할 수 있게 완료로 표시하지 않음
+            self.journal.close(finished=not summary.cancelled)
+            self.journal = None
 
         # 완료
-        summary = f"완료! 성공: {success}, 실패: {fail} / 총 {total}개"
-        self.root.after(0, lambda: self.lbl_status.config(text=summary))
-        self.root.after(0, lambda: self._log(f"\n{'=' * 40}"))
-        self.root.after(0, lambda: self._log(summary))
-
-        if failed_names:
-            self.root.after(0, lambda: self._log("실패한 파일:"))
-            for fn in failed_names:
-                self.root.after(0, lambda fn=fn: self._log(f"  - {fn}"))
-
-        self.root.after(0, lambda: self.btn_convert.config(state="normal"))
-        self.root.after(0, lambda: messagebox.showinfo("변환 완료", summary))
-        self.converting = False
+        text = summary.text()
+        self._post_progress(summary.done, summary.total, text)
+        self._post_log(f"\n{'=' * 40}")
+        self._post_log(text)
+
+        if summary.failures:
+            self._post_log("실패한 파일:")
+            for fn, message in summary.failures:
+                self._post_log(f"  - {fn}: {message}")
+        if dedupe.summary():
+            self._post_log(dedupe.summary())
+        if scheduler is not None and scheduler.error_summary():
+            self._post_log(scheduler.error_summary())
+        if watchdog.summary():
+            self._post_log(watchdog.summary())
+
+        if summary.cancelled:
+            self._post_log("남은 파일은 \"지난 작업 이어하기\"로 이어서 변환할 수 있습니다.")
+            self._post_call(self._end_convert, "변환 취소", text)
+        else:
+            self._post_call(self._end_convert, "변환 완료", text)
 
 
 def main():
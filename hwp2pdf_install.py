@@ -0,0 +1,443 @@
+"""LibreOffice 자동 설치 (Windows)
+
+GUI에서 LibreOffice를 찾지 못했을 때만 불러옵니다. 다운로드에 쓰는 urllib 등은
+변환만 하는 CLI나 GUI 시작 시간에 영향을 주지 않습니다.
+
+설치 파일(MSI, 약 350MB)은 HTTP Range 요청으로 여러 연결에 나누어 받고, 받은 범위를
+상태 파일에 남겨 끊기면 이어서 받습니다. 다 받은 파일은 SHA-256을 확인한 뒤 설치 파일
+캐시 폴더에 보관하므로, 다시 설치하거나 같은 캐시 폴더(네트워크 공유 폴더)를 쓰는
+다른 컴퓨터에서는 다시 받지 않습니다.
+
+설치 없이 캐시 폴더만 채울 때 (어느 OS에서나):
+  python3 hwp2pdf_install.py [--cache DIR] [--mirror URL|DIR] [-j N]
+"""
+
+import argparse
+import json
+import os
+import platform
+import re
+import shutil
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+
+from hwp2pdf_cache import file_digest
+from hwp2pdf_engine import IS_WINDOWS, user_cache_dir
+
+LIBREOFFICE_VERSION = "25.2.7"
+LIBREOFFICE_MSI_NAME = f"LibreOffice_{LIBREOFFICE_VERSION}_Win_x86-64.msi"
+LIBREOFFICE_MSI_URL = (
+    f"https://download.documentfoundation.org/libreoffice/stable/"
+    f"{LIBREOFFICE_VERSION}/win/x86_64/{LIBREOFFICE_MSI_NAME}"
+)
+
+# 환경 변수
+CACHE_ENV = "HWP2PDF_INSTALLER_CACHE"  # 설치 파일 캐시 폴더 (공유 폴더 가능)
+MIRROR_ENV = "HWP2PDF_LIBREOFFICE_MIRROR"  # MSI가 있는 URL 또는 폴더 (공식 주소보다 먼저 시도)
+SHA256_ENV = "HWP2PDF_LIBREOFFICE_SHA256"  # 기대하는 SHA-256 (없으면 <주소>.sha256에서 읽음)
+
+DOWNLOAD_CONNECTIONS = 4
+MIN_PART_BYTES = 8 * 1024 * 1024  # 연결 하나가 받는 최소 범위
+READ_BLOCK = 256 * 1024
+SOCKET_TIMEOUT = 30
+DOWNLOAD_ATTEMPTS = 5  # 진전 없이 연속으로 실패하면 포기하는 횟수
+STATE_INTERVAL = 1.0  # 받은 범위를 상태 파일에 남기는 간격 (초)
+
+_SHA256_RE = re.compile(r"\b[0-9a-fA-F]{64}\b")
+
+
+class DownloadError(Exception):
+    """설치 파일을 받거나 확인하지 못함"""
+
+
+class _RemoteChanged(DownloadError):
+    """이어 받는 도중 서버의 파일이 바뀜 (If-Range가 맞지 않음)"""
+
+
+def installer_cache_dir():
+    """설치 파일 캐시 폴더. HWP2PDF_INSTALLER_CACHE로 공유 폴더를 지정할 수 있습니다."""
+    return os.environ.get(CACHE_ENV) or os.path.join(user_cache_dir(), "installers")
+
+
+def installer_sources(mirror=None):
+    """MSI를 받을 곳 목록 (미러 먼저, 공식 주소 마지막). 폴더면 경로, 아니면 URL."""
+    mirror = mirror or os.environ.get(MIRROR_ENV)
+    sources = []
+    if mirror:
+        if "://" in mirror:
+            sources.append(mirror.rstrip("/") + "/" + LIBREOFFICE_MSI_NAME)
+        else:
+            sources.append(os.path.join(mirror, LIBREOFFICE_MSI_NAME))
+    sources.append(LIBREOFFICE_MSI_URL)
+    return sources
+
+
+def _is_url(source):
+    return "://" in source
+
+
+def _open(url, headers=None):
+    request = urllib.request.Request(url, headers=headers or {})
+    return urllib.request.urlopen(request, timeout=SOCKET_TIMEOUT)
+
+
+def expected_sha256(sources):
+    """기대하는 SHA-256 (소문자 hex). 알 수 없으면 None.
+
+    HWP2PDF_LIBREOFFICE_SHA256을 먼저 보고, 없으면 받을 곳마다 함께 게시된
+    <파일>.sha256을 차례로 읽습니다.
+    """
+    env = os.environ.get(SHA256_ENV)
+    if env:
+        return env.strip().lower()
+    for source in sources:
+        try:
+            if _is_url(source):
+                with _open(source + ".sha256") as resp:
+                    text = resp.read(4096).decode("ascii", "replace")
+            else:
+                with open(source + ".sha256", encoding="ascii", errors="replace") as f:
+                    text = f.read(4096)
+        except (OSError, ValueError):
+            continue
+        match = _SHA256_RE.search(text)
+        if match:
+            return match.group(0).lower()
+    return None
+
+
+def _probe(url):
+    """(최종 URL, 전체 크기 또는 None, Range 지원 여부, 검증자)
+
+    첫 1바이트만 Range로 요청해 봅니다. 206이면 나누어 받을 수 있습니다.
+    미러로 넘겨 주는(redirect) 서버도 모든 연결이 같은 미러에서 받도록 최종 URL을 씁니다.
+    """
+    with _open(url, {"Range": "bytes=0-0"}) as resp:
+        final_url = resp.geturl()
+        etag = resp.headers.get("ETag")
+        # If-Range에는 강한 ETag만 쓸 수 있음
+        validator = etag if etag and not etag.startswith("W/") else resp.headers.get("Last-Modified")
+        if resp.status == 206:
+            match = re.match(r"bytes 0-0/(\d+)", resp.headers.get("Content-Range", ""))
+            if match:
+                return final_url, int(match.group(1)), True, validator
+        length = resp.headers.get("Content-Length")
+        return final_url, int(length) if length and length.isdigit() else None, False, validator
+
+
+def _split(size, connections):
+    """[시작, 끝(포함 안 함), 받은 바이트] 범위 목록"""
+    count = max(1, min(connections, size // MIN_PART_BYTES))
+    step = -(-size // count)
+    return [[start, min(start + step, size), 0] for start in range(0, size, step)]
+
+
+def _load_state(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _save_state(path, state):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(state, f)
+    os.replace(tmp, path)
+
+
+def _remove(*paths):
+    for path in paths:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def _write_all(f, data):
+    view = memoryview(data)
+    while view:
+        view = view[f.write(view):]
+
+
+def _fetch_range(url, part, chunk, validator, lock, stop, on_bytes):
+    """chunk 범위의 남은 부분을 받아 part 파일의 같은 위치에 씁니다.
+
+    버퍼 없이(buffering=0) 쓰므로 chunk[2]에 센 바이트는 이미 OS에 넘어가 있고,
+    프로세스가 강제 종료되어도 상태 파일에 남긴 범위는 파일에 있습니다.
+    """
+    start, end = chunk[0], chunk[1]
+    offset = start + chunk[2]
+    headers = {"Range": f"bytes={offset}-{end - 1}"}
+    if validator:
+        headers["If-Range"] = validator
+    with _open(url, headers) as resp:
+        if resp.status != 206:
+            raise _RemoteChanged("서버의 설치 파일이 바뀌어 처음부터 다시 받습니다")
+        if not resp.headers.get("Content-Range", "").startswith(f"bytes {offset}-"):
+            raise DownloadError(f"요청과 다른 범위를 받음: {resp.headers.get('Content-Range')}")
+        with open(part, "r+b", buffering=0) as f:
+            f.seek(offset)
+            while offset < end and not stop.is_set():
+                block = resp.read(min(READ_BLOCK, end - offset))
+                if not block:
+                    raise DownloadError("연결이 끊김")
+                _write_all(f, block)
+                offset += len(block)
+                with lock:
+                    chunk[2] = offset - start
+                on_bytes(len(block))
+
+
+def _range_worker(url, part, chunk, validator, lock, stop, on_bytes, errors):
+    """범위 하나를 끝까지 받습니다. 진전이 있으면 실패 횟수를 다시 셉니다."""
+    failures = 0
+    while chunk[0] + chunk[2] < chunk[1] and not stop.is_set():
+        before = chunk[2]
+        try:
+            _fetch_range(url, part, chunk, validator, lock, stop, on_bytes)
+        except _RemoteChanged as e:
+            errors.append(e)
+            stop.set()
+            return
+        except (OSError, DownloadError) as e:
+            failures = 0 if chunk[2] > before else failures + 1
+            if failures >= DOWNLOAD_ATTEMPTS:
+                errors.append(e)
+                stop.set()
+                return
+            stop.wait(min(2 ** failures, 30))
+
+
+def _fetch_whole(url, part, on_bytes):
+    """Range를 지원하지 않는 서버: 처음부터 한 연결로 받습니다 (이어 받기 없음)."""
+    with _open(url) as resp, open(part, "wb") as f:
+        for block in iter(lambda: resp.read(READ_BLOCK), b""):
+            f.write(block)
+            on_bytes(len(block))
+
+
+def download(url, dest, sha256=None, connections=DOWNLOAD_CONNECTIONS, progress=None):
+    """url을 dest로 받습니다. 끊겼던 다운로드는 받은 범위부터 이어 받습니다.
+
+    받는 동안은 <dest>.<컴퓨터 이름>.part에 쓰고, 받은 범위는 .part.json에 남깁니다.
+    같은 캐시 폴더를 여러 컴퓨터가 함께 써도 서로의 받는 중인 파일을 건드리지 않습니다.
+    sha256이 있으면 확인한 뒤에만 dest로 옮기고, 맞지 않으면 받은 파일을 지우고
+    DownloadError를 냅니다. progress(받은 바이트, 전체 바이트 또는 None)를 호출합니다.
+    """
+    host = platform.node().split(".")[0] or "host"
+    part = f"{dest}.{host}.part"
+    state_path = part + ".json"
+    for attempt in range(2):
+        final_url, size, ranges, validator = _probe(url)
+        lock = threading.Lock()
+        received = [0]
+
+        def on_bytes(n):
+            with lock:
+                received[0] += n
+                done = received[0]
+            if progress:
+                progress(done, size)
+
+        if not ranges or not size:
+            _remove(state_path)
+            _fetch_whole(final_url, part, on_bytes)
+            break
+
+        state = _load_state(state_path)
+        if (not state or state.get("url") != url or state.get("size") != size
+                or state.get("validator") != validator
+                or not os.path.isfile(part) or os.path.getsize(part) != size):
+            state = {"url": url, "size": size, "validator": validator,
+                     "chunks": _split(size, connections)}
+            with open(part, "wb") as f:
+                f.truncate(size)
+            _save_state(state_path, state)
+        chunks = state["chunks"]
+        received[0] = sum(c[2] for c in chunks)
+
+        stop = threading.Event()
+        errors = []
+        threads = [
+            threading.Thread(
+                target=_range_worker,
+                args=(final_url, part, c, validator, lock, stop, on_bytes, errors),
+                daemon=True,
+            )
+            for c in chunks if c[0] + c[2] < c[1]
+        ]
+        for t in threads:
+            t.start()
+        try:
+            while any(t.is_alive() for t in threads):
+                for t in threads:
+                    t.join(STATE_INTERVAL / len(threads))
+                with lock:
+                    _save_state(state_path, state)
+        finally:
+            # 중단(Ctrl+C 등)되어도 받은 범위는 남겨 다음에 이어 받음
+            stop.set()
+            with lock:
+                _save_state(state_path, state)
+        if errors and isinstance(errors[0], _RemoteChanged) and attempt == 0:
+            _remove(part, state_path)
+            continue
+        if errors:
+            raise DownloadError(f"다운로드 실패: {errors[0]}")
+        break
+
+    if sha256:
+        actual = file_digest(part)
+        if actual != sha256:
+            _remove(part, state_path)
+            raise DownloadError(f"SHA-256이 맞지 않음 (기대 {sha256[:12]}…, 받은 파일 {actual[:12]}…)")
+    os.replace(part, dest)
+    _remove(state_path)
+    return dest
+
+
+def _progress_reporter(status_callback):
+    """퍼센트가 바뀔 때만 상태를 알리는 progress 함수"""
+    last = [None]
+    lock = threading.Lock()
+
+    def progress(done, total):
+        mb_down = done // (1024 * 1024)
+        if total:
+            pct = min(done * 100 // total, 100)
+            text = f"LibreOffice 다운로드 중... {mb_down}MB / {total // (1024 * 1024)}MB ({pct}%)"
+            key = pct
+        else:
+            text = f"LibreOffice 다운로드 중... {mb_down}MB"
+            key = mb_down
+        # 여러 연결의 스레드에서 부르므로 알림 순서가 섞이지 않게 잠금 안에서 호출
+        with lock:
+            if key == last[0]:
+                return
+            last[0] = key
+            if status_callback:
+                status_callback(text)
+
+    return progress
+
+
+def fetch_installer(status_callback=None, cache_dir=None, mirror=None,
+                    connections=DOWNLOAD_CONNECTIONS):
+    """확인된 MSI 경로를 돌려줍니다. 캐시에 있으면 받지 않습니다.
+
+    미러(URL 또는 폴더)를 먼저, 공식 주소를 마지막으로 시도합니다. SHA-256을 알 수
+    없으면 받은 파일을 확인할 수 없으므로 설치하지 않고 DownloadError를 냅니다.
+    """
+    def status(msg):
+        if status_callback:
+            status_callback(msg)
+
+    cache_dir = cache_dir or installer_cache_dir()
+    os.makedirs(cache_dir, exist_ok=True)
+    dest = os.path.join(cache_dir, LIBREOFFICE_MSI_NAME)
+    sources = installer_sources(mirror)
+
+    sha256 = expected_sha256(sources)
+    if not sha256:
+        raise DownloadError(
+            f"설치 파일의 SHA-256을 알 수 없습니다 ({SHA256_ENV} 환경 변수로 지정할 수 있음)"
+        )
+
+    if os.path.isfile(dest):
+        status("캐시된 LibreOffice 설치 파일 확인 중...")
+        if file_digest(dest) == sha256:
+            status(f"캐시된 설치 파일 사용: {dest}")
+            return dest
+        _remove(dest)
+
+    last_error = None
+    for source in sources:
+        try:
+            if _is_url(source):
+                status("LibreOffice 다운로드 중... (약 350MB, 잠시 기다려주세요)")
+                return download(source, dest, sha256, connections, _progress_reporter(status_callback))
+            if os.path.isfile(source):
+                status(f"미러 폴더에서 복사 중... ({source})")
+                tmp = f"{dest}.{os.getpid()}.copy"
+                try:
+                    shutil.copyfile(source, tmp)
+                    if file_digest(tmp) != sha256:
+                        raise DownloadError(f"SHA-256이 맞지 않음: {source}")
+                    os.replace(tmp, dest)
+                finally:
+                    _remove(tmp)
+                return dest
+        except (OSError, DownloadError) as e:
+            last_error = e
+            status(f"{source}: {e}")
+    raise DownloadError(str(last_error) if last_error else "설치 파일을 받을 곳이 없습니다")
+
+
+def download_and_install_libreoffice(status_callback=None):
+    """Windows에서 LibreOffice MSI를 받아(캐시에 있으면 재사용) 자동 설치합니다."""
+    if not IS_WINDOWS:
+        return False
+
+    try:
+        msi_path = fetch_installer(status_callback)
+    except (OSError, DownloadError) as e:
+        if status_callback:
+            status_callback(f"다운로드 실패: {e}")
+        return False
+
+    # 자동 설치 (msiexec /passive = 진행률만 표시, 사용자 입력 불필요)
+    if status_callback:
+        status_callback("LibreOffice 설치 중... (자동 설치, 잠시 기다려주세요)")
+
+    try:
+        result = subprocess.run(
+            ["msiexec", "/i", msi_path, "/passive", "/norestart"],
+            timeout=600,
+        )
+        if result.returncode != 0:
+            if status_callback:
+                status_callback(f"설치 실패 (코드: {result.returncode})")
+            return False
+    except Exception as e:
+        if status_callback:
+            status_callback(f"설치 오류: {e}")
+        return False
+
+    if status_callback:
+        status_callback("LibreOffice 설치 완료!")
+    return True
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="LibreOffice 설치 파일을 받아 캐시 폴더에 보관")
+    parser.add_argument("--cache", metavar="DIR", help=f"설치 파일 캐시 폴더 (기본: {installer_cache_dir()})")
+    parser.add_argument("--mirror", metavar="URL|DIR", help="MSI가 있는 URL 또는 폴더 (공식 주소보다 먼저 시도)")
+    parser.add_argument(
+        "-j", "--connections", type=int, default=DOWNLOAD_CONNECTIONS,
+        help=f"동시 연결 수 (기본: {DOWNLOAD_CONNECTIONS})",
+    )
+    args = parser.parse_args(argv)
+
+    started = time.monotonic()
+    try:
+        path = fetch_installer(
+            lambda msg: print(msg, file=sys.stderr), args.cache, args.mirror, max(1, args.connections),
+        )
+    except (OSError, DownloadError) as e:
+        print(f"오류: {e}", file=sys.stderr)
+        return 1
+    except KeyboardInterrupt:
+        print("중단됨 (다시 실행하면 이어서 받습니다)", file=sys.stderr)
+        return 130
+    print(f"{path} ({time.monotonic() - started:.1f}초)", file=sys.stderr)
+    print(path)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,204 @@
+"""일괄 변환 작업 기록(journal)
+
+작업마다 JSON Lines 파일 하나에 대기(queued), 완료(done), 실패(failed) 기록을
+덧붙여 씁니다. 앱이 종료되거나 멈춘 뒤에도 기록을 읽어 남은 파일부터 이어서
+변환할 수 있습니다. 기록은 모아서 한 번에 쓰므로 변환 속도에 영향을 주지 않습니다.
+"""
+
+import glob
+import json
+import os
+import threading
+import time
+
+from hwp2pdf_engine import user_cache_dir
+
+FLUSH_RECORDS = 500  # 이만큼 모이면 바로 씀
+FLUSH_INTERVAL = 1.0  # 초, 모인 기록을 늦어도 이 간격으로 씀
+KEEP_JOURNALS = 20
+
+
+def journal_dir():
+    return os.path.join(user_cache_dir(), "jobs")
+
+
+class JournalState:
+    """작업 기록 파일을 읽은 결과"""
+
+    def __init__(self, path):
+        self.path = path
+        self.job_id = os.path.splitext(os.path.basename(path))[0]
+        self.output_dir = ""
+        self.options = {}
+        self.files = []
+        self.results = {}  # 경로 -> 마지막 done/failed 기록
+        self.finished = False
+
+    @property
+    def pending(self):
+        """아직 결과가 기록되지 않은 파일 (원래 순서)"""
+        return [f for f in self.files if f not in self.results]
+
+    @property
+    def success(self):
+        return sum(1 for r in self.results.values() if r["t"] == "done")
+
+    @property
+    def fail(self):
+        return sum(1 for r in self.results.values() if r["t"] == "failed")
+
+
+def load(path):
+    """작업 기록을 읽습니다. 중간에 끊긴 마지막 줄은 무시합니다."""
+    state = JournalState(path)
+    seen = set()
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                rec = json.loads(line)
+            except ValueError:
+                continue
+            kind = rec.get("t")
+            if kind == "batch":
+                state.output_dir = rec.get("output_dir", "")
+                state.options = rec.get("options", {})
+            elif kind == "queued":
+                if rec["path"] not in seen:
+                    seen.add(rec["path"])
+                    state.files.append(rec["path"])
+            elif kind in ("done", "failed"):
+                state.results[rec["path"]] = rec
+            elif kind == "finished":
+                state.finished = True
+    return state
+
+
+def latest_unfinished(directory=None):
+    """남은 파일이 있는 가장 최근 작업 기록. 없으면 None."""
+    paths = glob.glob(os.path.join(directory or journal_dir(), "*.jsonl"))
+    paths.sort(key=os.path.getmtime, reverse=True)
+    for path in paths:
+        try:
+            state = load(path)
+        except OSError:
+            continue
+        if not state.finished and state.pending:
+            return state
+    return None
+
+
+def _prune(directory, keep=KEEP_JOURNALS):
+    """오래된 작업 기록을 정리합니다."""
+    paths = glob.glob(os.path.join(directory, "*.jsonl"))
+    paths.sort(key=os.path.getmtime, reverse=True)
+    for path in paths[keep:]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+class JobJournal:
+    """덧붙이기 전용 작업 기록 파일 (여러 작업자 스레드에서 함께 사용)"""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._buffer = []
+        self._closed = False
+        # 이전 실행이 줄 중간에서 끊겼으면 새 기록이 그 줄에 붙지 않도록 줄바꿈
+        needs_newline = False
+        if os.path.isfile(path) and os.path.getsize(path) > 0:
+            with open(path, "rb") as f:
+                f.seek(-1, os.SEEK_END)
+                needs_newline = f.read(1) != b"\n"
+        self._fh = open(path, "a", encoding="utf-8")
+        if needs_newline:
+            self._fh.write("\n")
+        self._wake = threading.Event()
+        self._flusher = threading.Thread(target=self._flush_loop, daemon=True)
+        self._flusher.start()
+
+    @classmethod
+    def create(cls, files=(), output_dir="", options=None, directory=None):
+        """새 작업 기록을 만들고 이미 알고 있는 대기 파일을 기록합니다.
+
+        스캔하면서 변환할 때는 convert_batch가 찾은 파일을 차례로 대기로 기록합니다.
+        """
+        directory = directory or journal_dir()
+        os.makedirs(directory, exist_ok=True)
+        _prune(directory, KEEP_JOURNALS - 1)
+        job_id = time.strftime("%Y%m%d-%H%M%S") + f"-{os.getpid()}"
+        journal = cls(os.path.join(directory, job_id + ".jsonl"))
+        journal.record({
+            "t": "batch",
+            "output_dir": output_dir,
+            "options": options or {},
+            "created": time.time(),
+        })
+        for f in files:
+            journal.record({"t": "queued", "path": f})
+        journal.flush()
+        return journal
+
+    @classmethod
+    def reopen(cls, state):
+        """이어서 변환할 때 기존 기록 파일에 덧붙입니다."""
+        journal = cls(state.path)
+        journal.record({"t": "resumed", "ts": time.time(), "pending": len(state.pending)})
+        return journal
+
+    def record(self, rec):
+        with self._lock:
+            if self._closed:
+                return
+            self._buffer.append(json.dumps(rec, ensure_ascii=False))
+            if len(self._buffer) >= FLUSH_RECORDS:
+                self._flush_locked()
+            else:
+                self._wake.set()
+
+    def record_result(self, result):
+        self.record({
+            "t": "done" if result.ok else "failed",
+            "path": result.filepath,
+            "status": result.status,
+            "detail": result.detail,
+            "elapsed": round(result.elapsed, 3),
+            "estimate": None if result.estimate is None else round(result.estimate, 3),
+            "timeout": None if result.timeout is None else round(result.timeout, 1),
+            "ts": time.time(),
+        })
+
+    def _flush_locked(self):
+        if self._buffer:
+            self._fh.write("\n".join(self._buffer) + "\n")
+            self._fh.flush()
+            self._buffer.clear()
+
+    def _flush_loop(self):
+        while True:
+            self._wake.wait()
+            time.sleep(FLUSH_INTERVAL)
+            with self._lock:
+                if self._closed:
+                    return
+                self._wake.clear()
+                self._flush_locked()
+
+    def flush(self):
+        with self._lock:
+            if not self._closed:
+                self._flush_locked()
+
+    def close(self, finished=False):
+        """남은 기록을 쓰고 닫습니다. finished이면 작업 완료로 표시합니다."""
+        with self._lock:
+            if self._closed:
+                return
+            if finished:
+                self._buffer.append(json.dumps({"t": "finished", "ts": time.time()}))
+            self._flush_locked()
+            self._closed = True
+            self._fh.close()
+            self._wake.set()
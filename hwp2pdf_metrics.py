@@ -0,0 +1,188 @@
+"""파일별 단계 시간과 변환 지표 내보내기
+
+변환 결과마다 단계별 시간(대기, 사전 검사, 캐시, soffice 실행, 변환, 출력 확인, 재시도,
+중복 처리, 출력 위치로 옮기기, 다른 형식 저장)과 입력/출력 크기를 JSON Lines로 남기고,
+일괄 변환이 끝날 때(원하면 실행 중에도 주기적으로) Prometheus node_exporter의 textfile
+collector가 읽을 수 있는 .prom 파일을 씁니다.
+"""
+
+import json
+import os
+import threading
+import time
+
+PHASES = (
+    "queue_wait", "preflight", "cache", "spawn", "convert", "verify", "backoff",
+    "failed_attempts", "dedup", "publish", "extras", "postpass",
+)
+# 파일당 소요 시간 히스토그램 구간 (초)
+BUCKETS = (0.5, 1, 2, 5, 10, 30, 60, 120, 300, 600)
+
+
+def _size(path):
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return None
+
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class BatchMetrics:
+    """일괄 변환 하나의 지표 (여러 작업자 스레드에서 함께 사용)
+
+    record(result)는 결과를 JSON Lines 파일에 쓰고 누적값을 갱신합니다.
+    prom_path가 있으면 close() 때, interval(초)이 있으면 실행 중에도 그 간격으로
+    누적값을 .prom 파일에 씁니다(임시 파일에 쓴 뒤 교체).
+    """
+
+    def __init__(self, jsonl_path=None, prom_path=None, interval=None, job=""):
+        self.jsonl_path = jsonl_path
+        self.prom_path = prom_path
+        self.job = job
+        self.total = 0
+        self.started = time.time()
+        self._lock = threading.Lock()
+        self._status = {}
+        self._phases = dict.fromkeys(PHASES, 0.0)
+        self._buckets = [0] * len(BUCKETS)
+        self._count = 0
+        self._sum = 0.0
+        self._input_bytes = 0
+        self._output_bytes = 0
+        self._formats = {}  # (형식, "ok"|"failed") -> 수 (PDF 외 형식)
+        self._fh = None
+        if jsonl_path:
+            os.makedirs(os.path.dirname(os.path.abspath(jsonl_path)), exist_ok=True)
+            self._fh = open(jsonl_path, "a", encoding="utf-8")
+        self._stop = threading.Event()
+        self._thread = None
+        if prom_path and interval:
+            self._thread = threading.Thread(target=self._snapshot_loop, args=(interval,), daemon=True)
+            self._thread.start()
+
+    def record(self, result):
+        info = result.info
+        rec = {
+            "ts": round(time.time(), 3),
+            "path": result.filepath,
+            "status": result.status,
+            "cached": result.cached,
+            "attempts": result.attempts,
+            "elapsed": round(result.elapsed, 4),
+            "phases": {k: round(v, 4) for k, v in result.phases.items()},
+            "input_bytes": result.input_bytes,
+            "output_bytes": result.output_bytes,
+            "estimate": None if result.estimate is None else round(result.estimate, 3),
+            "timeout": None if result.timeout is None else round(result.timeout, 1),
+            "kind": info.kind if info is not None else None,
+            "sections": info.sections if info is not None else None,
+            "pages": info.pages if info is not None else None,
+        }
+        if not result.ok:
+            rec["detail"] = result.detail
+        if result.outputs or result.output_errors:
+            # PDF 외 형식: 형식 -> 크기 (만들지 못했으면 null)
+            rec["outputs"] = {fmt: _size(path) for fmt, path in result.outputs.items()}
+            rec["outputs"].update(dict.fromkeys(result.output_errors))
+        total_time = sum(v for k, v in result.phases.items() if k != "queue_wait")
+        with self._lock:
+            self._status[result.status] = self._status.get(result.status, 0) + 1
+            for phase, seconds in result.phases.items():
+                self._phases[phase] = self._phases.get(phase, 0.0) + seconds
+            self._count += 1
+            self._sum += total_time
+            for i, le in enumerate(BUCKETS):
+                if total_time <= le:
+                    self._buckets[i] += 1
+            self._input_bytes += result.input_bytes or 0
+            self._output_bytes += result.output_bytes or 0
+            for fmt in result.outputs:
+                self._formats[fmt, "ok"] = self._formats.get((fmt, "ok"), 0) + 1
+            for fmt in result.output_errors:
+                self._formats[fmt, "failed"] = self._formats.get((fmt, "failed"), 0) + 1
+            if self._fh is not None:
+                self._fh.write(json.dumps(rec, ensure_ascii=False) + "\n")
+
+    def prometheus_text(self):
+        """누적값을 Prometheus 텍스트 형식으로 만듭니다."""
+        job = f'job="{_label(self.job)}"'
+        with self._lock:
+            lines = [
+                "# HELP hwp2pdf_batch_files Files discovered in the current batch.",
+                "# TYPE hwp2pdf_batch_files gauge",
+                f"hwp2pdf_batch_files{{{job}}} {self.total}",
+                "# HELP hwp2pdf_files_total Files finished, by result status.",
+                "# TYPE hwp2pdf_files_total counter",
+            ]
+            for status, n in sorted(self._status.items()):
+                lines.append(f'hwp2pdf_files_total{{{job},status="{_label(status)}"}} {n}')
+            if self._formats:
+                lines += [
+                    "# HELP hwp2pdf_outputs_total Extra output formats written alongside the PDF.",
+                    "# TYPE hwp2pdf_outputs_total counter",
+                ]
+                for (fmt, outcome), n in sorted(self._formats.items()):
+                    lines.append(f'hwp2pdf_outputs_total{{{job},format="{fmt}",result="{outcome}"}} {n}')
+            lines += [
+                "# HELP hwp2pdf_phase_seconds_total Time spent per conversion phase.",
+                "# TYPE hwp2pdf_phase_seconds_total counter",
+            ]
+            for phase, seconds in self._phases.items():
+                lines.append(f'hwp2pdf_phase_seconds_total{{{job},phase="{phase}"}} {seconds:.6f}')
+            lines += [
+                "# HELP hwp2pdf_file_seconds Processing time per file, excluding queue wait.",
+                "# TYPE hwp2pdf_file_seconds histogram",
+            ]
+            for le, n in zip(BUCKETS, self._buckets):
+                lines.append(f'hwp2pdf_file_seconds_bucket{{{job},le="{le}"}} {n}')
+            lines += [
+                f'hwp2pdf_file_seconds_bucket{{{job},le="+Inf"}} {self._count}',
+                f"hwp2pdf_file_seconds_sum{{{job}}} {self._sum:.6f}",
+                f"hwp2pdf_file_seconds_count{{{job}}} {self._count}",
+                "# HELP hwp2pdf_input_bytes_total Bytes of input documents finished.",
+                "# TYPE hwp2pdf_input_bytes_total counter",
+                f"hwp2pdf_input_bytes_total{{{job}}} {self._input_bytes}",
+                "# HELP hwp2pdf_output_bytes_total Bytes of PDF produced.",
+                "# TYPE hwp2pdf_output_bytes_total counter",
+                f"hwp2pdf_output_bytes_total{{{job}}} {self._output_bytes}",
+                "# HELP hwp2pdf_batch_start_timestamp_seconds Start of the current batch.",
+                "# TYPE hwp2pdf_batch_start_timestamp_seconds gauge",
+                f"hwp2pdf_batch_start_timestamp_seconds{{{job}}} {self.started:.3f}",
+                "# HELP hwp2pdf_snapshot_timestamp_seconds Time this snapshot was written.",
+                "# TYPE hwp2pdf_snapshot_timestamp_seconds gauge",
+                f"hwp2pdf_snapshot_timestamp_seconds{{{job}}} {time.time():.3f}",
+            ]
+        return "\n".join(lines) + "\n"
+
+    def write_snapshot(self):
+        if not self.prom_path:
+            return
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.prom_path)), exist_ok=True)
+            tmp = self.prom_path + f".{os.getpid()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(self.prometheus_text())
+            os.replace(tmp, self.prom_path)
+        except OSError:
+            pass
+
+    def _snapshot_loop(self, interval):
+        while not self._stop.wait(interval):
+            self.write_snapshot()
+            with self._lock:
+                if self._fh is not None:
+                    self._fh.flush()
+
+    def close(self):
+        """주기적 기록을 멈추고 마지막 스냅숏을 씁니다."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.write_snapshot()
+        with self._lock:
+            if self._fh is not None:
+                self._fh.close()
+                self._fh = None
@@ -0,0 +1,181 @@
+"""초기화된 LibreOffice 프로필 템플릿
+
+빈 프로필로 soffice를 처음 띄우면 프로필 초기화에 몇 초가 걸리고, 작업자마다 새
+프로필을 쓰므로 이 비용이 일괄 변환마다, 작업자 수만큼 반복됩니다.
+LibreOffice 설치(실행 파일 경로 + 버전)마다 한 번 초기화한 프로필을 사용자 캐시 폴더의
+`profiles/`에 템플릿으로 보관하고, 작업자 프로필은 템플릿을 복제해 만듭니다.
+복제는 파일 시스템이 지원하면 reflink(내용 공유, 쓸 때 복사)로, 아니면 복사로 합니다.
+LibreOffice는 프로필 파일을 그 자리에서 고쳐 쓰므로 하드 링크는 쓰지 않습니다.
+
+설치된 LibreOffice 버전이 바뀌면 같은 실행 파일의 이전 템플릿을 지우고 새로 만듭니다.
+초기화에 실패하면 `<키>.failed`를 남겨 FAILED_RETRY 동안은 다시 시도하지 않고 빈 프로필을
+씁니다 (실행할 때마다 BUILD_TIMEOUT까지 기다리지 않도록).
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+
+from hwp2pdf_dedup import reflink
+from hwp2pdf_engine import default_watchdog, soffice_version, user_cache_dir
+
+TEMPLATE_FORMAT = 1
+TEMPLATE_MARKER = "hwp2pdf_template.json"
+BUILD_TIMEOUT = 180  # 초
+BUILD_STALE = 3600  # 초, 이보다 오래된 만들다 만 템플릿은 지움
+FAILED_SUFFIX = ".failed"
+FAILED_RETRY = 24 * 3600  # 초, 초기화에 실패한 설치를 다시 시도하기까지
+# 초기화가 끝난 프로필에 있는 파일
+READY_FILE = os.path.join("user", "registrymodifications.xcu")
+
+_reflink_works = True  # 한 번 실패하면 이 실행에서는 바로 복사
+
+
+def templates_dir():
+    return os.path.join(user_cache_dir(), "profiles")
+
+
+def _read_json(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _read_marker(path):
+    return _read_json(os.path.join(path, TEMPLATE_MARKER))
+
+
+def _failed_recently(path):
+    """실패 기록이 있고 FAILED_RETRY가 지나지 않았으면 참"""
+    try:
+        return time.time() - os.path.getmtime(path) < FAILED_RETRY
+    except OSError:
+        return False
+
+
+def _record_failure(path, soffice, version, reason):
+    try:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({
+                "soffice": soffice, "version": version, "reason": reason, "failed": time.time(),
+            }, f, ensure_ascii=False)
+    except OSError:
+        pass
+
+
+def _remove_stale(root, soffice, version):
+    """같은 실행 파일의 다른 버전 템플릿, 만들다 만 템플릿과 오래된 실패 기록을 지웁니다."""
+    try:
+        names = os.listdir(root)
+    except OSError:
+        return
+    for name in names:
+        path = os.path.join(root, name)
+        if name.endswith(FAILED_SUFFIX):
+            failed = _read_json(path) or {}
+            if not _failed_recently(path) or (
+                    failed.get("soffice") == soffice and failed.get("version") != version):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            continue
+        if name.startswith(".build_"):
+            try:
+                if time.time() - os.path.getmtime(path) > BUILD_STALE:
+                    shutil.rmtree(path, ignore_errors=True)
+            except OSError:
+                pass
+            continue
+        marker = _read_marker(path)
+        if marker is None or (marker.get("soffice") == soffice and marker.get("version") != version):
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def ensure_template(soffice, version=None, directory=None):
+    """이 LibreOffice 설치용 프로필 템플릿 경로. 만들 수 없으면 None.
+
+    템플릿이 없거나 버전이 다르면 soffice --terminate_after_init로 새로 초기화합니다.
+    여러 프로세스가 동시에 만들어도 완성된 템플릿만 이름을 바꿔 넣으므로 안전합니다.
+    최근(FAILED_RETRY 안에) 이 설치의 초기화에 실패했으면 다시 시도하지 않고 None입니다.
+    """
+    soffice = os.path.abspath(soffice)
+    version = version or soffice_version(soffice)
+    root = directory or templates_dir()
+    key = hashlib.sha256(f"{TEMPLATE_FORMAT}|{soffice}|{version}".encode("utf-8")).hexdigest()[:16]
+    path = os.path.join(root, key)
+    marker = _read_marker(path)
+    if marker is not None and marker.get("version") == version:
+        return path
+    failed = path + FAILED_SUFFIX
+    if _failed_recently(failed):
+        return None
+
+    try:
+        os.makedirs(root, exist_ok=True)
+        _remove_stale(root, soffice, version)
+        build = tempfile.mkdtemp(prefix=".build_", dir=root)
+    except OSError:
+        return None
+    try:
+        started = time.monotonic()
+        profile_url = "file:///" + build.replace("\\", "/")
+        cmd = [
+            soffice, "--headless", "--norestore",
+            f"-env:UserInstallation={profile_url}", "--terminate_after_init",
+        ]
+        outcome = default_watchdog().run(cmd, BUILD_TIMEOUT)
+        if outcome.reason is not None or not os.path.isfile(os.path.join(build, READY_FILE)):
+            _record_failure(
+                failed, soffice, version, outcome.reason or f"종료코드: {outcome.returncode}"
+            )
+            return None
+        # 실행 중에만 있는 lock 파일은 템플릿에 남기지 않음
+        for dirpath, _, filenames in os.walk(build):
+            for name in filenames:
+                if name == ".lock":
+                    os.remove(os.path.join(dirpath, name))
+        with open(os.path.join(build, TEMPLATE_MARKER), "w", encoding="utf-8") as f:
+            json.dump({
+                "format": TEMPLATE_FORMAT,
+                "soffice": soffice,
+                "version": version,
+                "created": time.time(),
+                "init_seconds": round(time.monotonic() - started, 3),
+            }, f, ensure_ascii=False)
+        try:
+            os.replace(build, path)
+        except OSError:
+            # 다른 프로세스가 먼저 만들었으면 그것을 씀
+            marker = _read_marker(path)
+            return path if marker is not None and marker.get("version") == version else None
+        return path
+    except OSError:
+        return None
+    finally:
+        shutil.rmtree(build, ignore_errors=True)
+
+
+def _clone_file(src, dst):
+    global _reflink_works
+    if _reflink_works:
+        try:
+            reflink(src, dst)
+            shutil.copystat(src, dst)
+            return dst
+        except OSError:
+            _reflink_works = False
+    return shutil.copy2(src, dst)
+
+
+def clone_profile(template, profile_dir):
+    """템플릿을 profile_dir(빈 폴더)에 복제합니다."""
+    shutil.copytree(
+        template, profile_dir, dirs_exist_ok=True, copy_function=_clone_file,
+        ignore=shutil.ignore_patterns(TEMPLATE_MARKER, ".lock"),
+    )
@@ -0,0 +1,185 @@
+"""변환 시간 예측(cost model)과 작업 순서/시간 제한 계산
+
+파일 크기와 형식(HWP/HWPX)으로 변환 시간을 예측합니다. 사전 검사 결과(SniffResult)가
+있으면 확장자 대신 실제 형식을, 파일 크기 대신 본문(구역) 크기를 씁니다.
+예측식은 형식별로 "시작 비용 + MB당 시간"이며, 실제 변환 시간을 관찰할 때마다 최근 값에 가중치를
+더 주는 최소제곱으로 다시 맞춰 사용자 캐시 폴더에 저장합니다.
+
+- 순서: 오래 걸릴 파일부터 변환해 작업자 풀의 전체 완료 시간(makespan)을 줄입니다.
+- 시간 제한: 예측 시간에 안전 여유를 곱하고 더해 파일마다 따로 정합니다.
+"""
+
+import collections
+import json
+import os
+import statistics
+import tempfile
+import threading
+
+from hwp2pdf_engine import MODE_PROCESS, user_cache_dir
+
+MODEL_FORMAT = 1
+# 관찰 전 기본값: (시작 비용 초, MB당 초)
+DEFAULT_COST = {
+    ".hwp": (2.0, 1.5),
+    ".hwpx": (2.0, 2.0),
+}
+MIN_OBSERVATIONS = 5  # 이보다 적게 관찰했으면 기본값 사용
+DECAY = 0.995  # 관찰할 때마다 이전 값의 가중치를 이만큼 줄임
+ERROR_SAMPLES = 1000  # 예측 오차 요약에 쓰는 최근 관찰 수 (--watch/--spool에서도 메모리 일정)
+
+TIMEOUT_FACTOR = 4.0
+TIMEOUT_SLACK = 30.0  # 초
+MIN_TIMEOUT = 30.0
+MAX_TIMEOUT = 1800.0
+
+MB = 1024 * 1024
+
+
+def model_path():
+    return os.path.join(user_cache_dir(), "cost_model.json")
+
+
+class _Fit:
+    """지수 가중 최소제곱 y = a + b*x 의 누적값"""
+
+    def __init__(self, n=0.0, sx=0.0, sy=0.0, sxx=0.0, sxy=0.0):
+        self.n, self.sx, self.sy, self.sxx, self.sxy = n, sx, sy, sxx, sxy
+
+    def add(self, x, y):
+        self.n = self.n * DECAY + 1
+        self.sx = self.sx * DECAY + x
+        self.sy = self.sy * DECAY + y
+        self.sxx = self.sxx * DECAY + x * x
+        self.sxy = self.sxy * DECAY + x * y
+
+    def coef(self, prior):
+        if self.n < MIN_OBSERVATIONS:
+            return prior
+        denom = self.n * self.sxx - self.sx * self.sx
+        if denom <= 1e-9:
+            # 크기가 모두 비슷하면 기울기는 기본값을 쓰고 절편만 맞춤
+            b = prior[1]
+        else:
+            b = max(0.0, (self.n * self.sxy - self.sx * self.sy) / denom)
+        a = max(0.1, (self.sy - b * self.sx) / self.n)
+        return a, b
+
+    def to_list(self):
+        return [self.n, self.sx, self.sy, self.sxx, self.sxy]
+
+
+class CostModel:
+    """파일별 예상 변환 시간과 시간 제한 (여러 작업자 스레드에서 함께 사용)
+
+    estimate()와 실제 소요 시간은 ConvertResult.estimate / elapsed에 남고,
+    이번 실행의 예측 오차는 error_summary()로 확인할 수 있습니다.
+    """
+
+    def __init__(self, mode=MODE_PROCESS, path=None):
+        self.mode = mode
+        self.path = path or model_path()
+        self._lock = threading.Lock()
+        self._fits = {}
+        self._errors = collections.deque(maxlen=ERROR_SAMPLES)  # 최근 (예상, 실제)
+        self._error_count = 0
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("format") == MODEL_FORMAT:
+                for key, values in data.get("fits", {}).items():
+                    self._fits[key] = _Fit(*values)
+        except (OSError, ValueError, TypeError):
+            pass
+
+    def _key(self, filepath, info=None):
+        """(모델 키, 기본 계수, 크기 바이트 또는 None)"""
+        ext = (info.ext if info is not None else "") or os.path.splitext(filepath)[1].lower()
+        if ext not in DEFAULT_COST:
+            ext = ".hwp"
+        if info is not None and info.body_bytes is not None:
+            # 본문 크기는 파일 크기와 척도가 다르므로 따로 맞춤
+            return f"{self.mode}/{ext}/body", DEFAULT_COST[ext], info.body_bytes
+        return f"{self.mode}/{ext}", DEFAULT_COST[ext], None
+
+    def coefficients(self, filepath, info=None):
+        """(시작 비용 초, MB당 초)"""
+        key, prior, _ = self._key(filepath, info)
+        with self._lock:
+            fit = self._fits.get(key)
+            return fit.coef(prior) if fit else prior
+
+    def _size(self, filepath, size, info):
+        _, _, body = self._key(filepath, info)
+        if body is not None:
+            return body
+        if size is None:
+            size = os.path.getsize(filepath)
+        return size
+
+    def estimate(self, filepath, size=None, info=None):
+        """예상 변환 시간 (초)"""
+        try:
+            size = self._size(filepath, size, info)
+        except OSError:
+            size = 0
+        a, b = self.coefficients(filepath, info)
+        return a + b * size / MB
+
+    def timeout_for(self, estimate):
+        """예상 시간에 안전 여유를 둔 시간 제한 (초)"""
+        return min(MAX_TIMEOUT, max(MIN_TIMEOUT, estimate * TIMEOUT_FACTOR + TIMEOUT_SLACK))
+
+    def observe(self, filepath, elapsed, size=None, estimate=None, info=None):
+        """성공한 변환의 실제 소요 시간을 반영합니다."""
+        try:
+            size = self._size(filepath, size, info)
+        except OSError:
+            return
+        key, _, _ = self._key(filepath, info)
+        with self._lock:
+            self._fits.setdefault(key, _Fit()).add(size / MB, elapsed)
+            if estimate is not None:
+                self._errors.append((estimate, elapsed))
+                self._error_count += 1
+
+    def error_summary(self):
+        """이번 실행의 예측 오차 요약 문자열 (최근 ERROR_SAMPLES개 기준). 관찰이 없으면 빈 문자열."""
+        with self._lock:
+            errors = list(self._errors)
+            count = self._error_count
+        if not errors:
+            return ""
+        abs_err = statistics.median(abs(e - a) for e, a in errors)
+        text = f"예상 시간 오차 중앙값: {abs_err:.2f}초"
+        ratios = [a / e for e, a in errors if e > 0]
+        if ratios:
+            text += f", 실제/예상 중앙값: {statistics.median(ratios):.2f}"
+        if count > len(errors):
+            return f"{text} (최근 {len(errors)}개, 전체 {count}개)"
+        return f"{text} ({count}개)"
+
+    def save(self):
+        with self._lock:
+            data = {
+                "format": MODEL_FORMAT,
+                "fits": {k: v.to_list() for k, v in self._fits.items()},
+                # 사람이 확인하기 위한 현재 계수 (읽을 때는 사용하지 않음)
+                "coefficients": {
+                    k: v.coef(DEFAULT_COST.get(k.split("/")[1], DEFAULT_COST[".hwp"]))
+                    for k, v in self._fits.items()
+                },
+            }
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            # 여러 프로세스가 같은 파일을 동시에 저장해도 섞이지 않도록 임시 파일 이름을 따로 씀
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(self.path), suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump(data, f, indent=1)
+                os.replace(tmp, self.path)
+            except BaseException:
+                os.remove(tmp)
+                raise
+        except OSError:
+            pass
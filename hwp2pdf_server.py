@@ -0,0 +1,303 @@
+"""상주 LibreOffice(soffice --accept) 인스턴스를 UNO로 구동하는 변환기
+
+파일마다 soffice를 새로 띄우지 않고, 작업자마다 headless 인스턴스를 하나 띄워
+문서를 계속 흘려보냅니다. PDF와 함께 다른 형식(txt, png)을 요청하면 문서를 한 번만
+읽어 모든 형식을 저장합니다. UNO 파이썬 모듈(pyuno)이 필요합니다.
+"""
+
+import itertools
+import os
+import subprocess
+import sys
+import threading
+import time
+
+from hwp2pdf_engine import (
+    DEFAULT_TIMEOUT,
+    OUTPUT_FORMATS,
+    STATUS_CANCELLED,
+    STATUS_ERROR,
+    STATUS_FAILED,
+    STATUS_MEMORY,
+    STATUS_NO_PDF,
+    STATUS_OK,
+    STATUS_TIMEOUT,
+    ConvertResult,
+    check_output,
+    default_watchdog,
+    discard_partial_pdf,
+    expected_pdf_path,
+    make_profile,
+    output_path,
+    pdf_complete,
+    remove_profile,
+)
+from hwp2pdf_watchdog import SAMPLE_INTERVAL, kill_tree, popen_group
+
+try:
+    import uno
+except ImportError:
+    uno = None
+
+CONNECT_TIMEOUT = 60
+_pipe_counter = itertools.count(1)
+
+
+def _load_uno(soffice=None):
+    """uno 모듈을 불러옵니다. 없으면 soffice 옆의 program 폴더에서 한 번 더 찾습니다."""
+    global uno
+    if uno is not None:
+        return uno
+    if soffice:
+        program_dir = os.path.dirname(os.path.realpath(soffice))
+        if program_dir not in sys.path:
+            sys.path.append(program_dir)
+        try:
+            import uno as _uno
+            uno = _uno
+        except ImportError:
+            pass
+    return uno
+
+
+def available(soffice=None):
+    """상주 서버 모드를 쓸 수 있는지 (pyuno 설치 여부)"""
+    return _load_uno(soffice) is not None
+
+
+def _props(**kwargs):
+    props = []
+    for name, value in kwargs.items():
+        pv = uno.createUnoStruct("com.sun.star.beans.PropertyValue")
+        pv.Name = name
+        pv.Value = value
+        props.append(pv)
+    return tuple(props)
+
+
+class ServerError(RuntimeError):
+    """상주 인스턴스를 시작하거나 연결하지 못함"""
+
+
+class UnoServerConverter:
+    """headless soffice 하나를 띄워 두고 UNO로 변환합니다.
+
+    인스턴스가 죽으면(크래시, 시간 초과로 강제 종료) 다음 변환 때 자동으로 다시 띄웁니다.
+    변환이 끝날 때마다 인스턴스의 메모리를 확인해 watchdog.rss_limit를 넘었으면
+    하위 프로세스까지 종료하고 다음 변환 때 새로 띄웁니다.
+    convert()는 ConvertResult를 반환하므로 ProcessConverter와 바꿔 쓸 수 있습니다.
+    """
+
+    def __init__(self, soffice, watchdog=None, template=None, formats=(), export=None):
+        if _load_uno(soffice) is None:
+            raise ServerError("UNO 파이썬 모듈(pyuno)을 찾을 수 없습니다.")
+        self.soffice = soffice
+        self.watchdog = watchdog or default_watchdog()
+        self.template = template
+        self.formats = tuple(formats)
+        self.export = export
+        self.pipe_name = f"hwp2pdf_{os.getpid()}_{next(_pipe_counter)}"
+        self.profile_dir, self.profile_url = make_profile(template)
+        self.proc = None
+        self.desktop = None
+        self.restarts = 0
+
+    def _alive(self):
+        return self.proc is not None and self.proc.poll() is None and self.desktop is not None
+
+    def _start(self):
+        self._kill()
+        if self.proc is not None:
+            self.restarts += 1
+        cmd = [
+            self.soffice,
+            "--headless",
+            "--invisible",
+            "--nologo",
+            "--nodefault",
+            "--norestore",
+            "--nolockcheck",
+            f"-env:UserInstallation={self.profile_url}",
+            f"--accept=pipe,name={self.pipe_name};urp;StarOffice.ComponentContext",
+        ]
+        self.proc = popen_group(
+            cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        # 일시 정지/취소 시 인스턴스도 함께 멈추거나 종료되도록
+        self.watchdog.track(self.proc)
+
+        local = uno.getComponentContext()
+        resolver = local.ServiceManager.createInstanceWithContext(
+            "com.sun.star.bridge.UnoUrlResolver", local
+        )
+        url = f"uno:pipe,name={self.pipe_name};urp;StarOffice.ComponentContext"
+        deadline = time.monotonic() + CONNECT_TIMEOUT
+        while True:
+            if self.proc.poll() is not None:
+                raise ServerError(f"soffice가 시작 중 종료됨 (코드: {self.proc.returncode})")
+            try:
+                ctx = resolver.resolve(url)
+                break
+            except Exception:
+                if time.monotonic() > deadline:
+                    self._kill()
+                    raise ServerError("soffice 상주 인스턴스에 연결할 수 없습니다.")
+                time.sleep(0.25)
+        self.desktop = ctx.ServiceManager.createInstanceWithContext(
+            "com.sun.star.frame.Desktop", ctx
+        )
+
+    def _kill(self):
+        self.desktop = None
+        if self.proc is not None:
+            self.watchdog.untrack(self.proc)
+            kill_tree(self.proc)
+            try:
+                self.proc.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                pass
+
+    def _over_limit(self):
+        """인스턴스가 메모리 상한을 넘었으면 종료하고 사용량(바이트)을 반환합니다."""
+        if not self.watchdog.rss_limit or self.proc is None:
+            return 0
+        usage = self.watchdog.usage(self.proc)
+        if usage is None or usage[0] <= self.watchdog.rss_limit:
+            return 0
+        self._kill()
+        return usage[0]
+
+    def convert(self, filepath, outdir, timeout=DEFAULT_TIMEOUT):
+        expected_pdf = expected_pdf_path(filepath, outdir)
+        phases = {"spawn": 0.0}
+        started = time.monotonic()
+        try:
+            os.makedirs(outdir, exist_ok=True)
+            if not self._alive():
+                self._start()
+                phases["spawn"] = time.monotonic() - started
+        except Exception as e:
+            return ConvertResult(filepath, STATUS_ERROR, detail=str(e))
+        converting = time.monotonic()
+        result = self._convert(filepath, expected_pdf, timeout)
+        # 문서를 열고 PDF로 저장한 시간, 나머지는 출력 확인
+        phases["convert"] = result.phases.pop("convert", time.monotonic() - converting)
+        phases["verify"] = time.monotonic() - converting - phases["convert"]
+        result.phases.update(phases)
+        return result
+
+    def _convert(self, filepath, expected_pdf, timeout):
+        started = time.monotonic()
+
+        # 시간 초과 시 인스턴스를 강제 종료하면 진행 중인 UNO 호출이 예외로 풀립니다.
+        # 일시 정지해 있던 시간은 시간 제한에서 뺍니다.
+        timed_out = threading.Event()
+        finished = threading.Event()
+        paused_before = self.watchdog.paused_time()
+        timer = None
+
+        def _arm(seconds):
+            nonlocal timer
+            timer = threading.Timer(seconds, _on_timeout)
+            timer.daemon = True
+            timer.start()
+
+        def _on_timeout():
+            if finished.is_set():
+                return
+            active = time.monotonic() - started - (self.watchdog.paused_time() - paused_before)
+            if self.watchdog.paused or active < timeout:
+                _arm(max(SAMPLE_INTERVAL, timeout - active))
+                return
+            timed_out.set()
+            self._kill()
+
+        if self.watchdog.cancelled.is_set():
+            return ConvertResult(filepath, STATUS_CANCELLED)
+        outdir = os.path.dirname(expected_pdf)
+        extra_errors = {}
+        _arm(timeout)
+        try:
+            src_url = uno.systemPathToFileUrl(os.path.abspath(filepath))
+            dst_url = uno.systemPathToFileUrl(os.path.abspath(expected_pdf))
+            doc = self.desktop.loadComponentFromURL(
+                src_url, "_blank", 0, _props(Hidden=True, ReadOnly=True)
+            )
+            if doc is None:
+                return ConvertResult(filepath, STATUS_NO_PDF, detail="문서를 열 수 없음")
+            try:
+                doc.storeToURL(dst_url, self._pdf_props())
+                # 같은 문서에서 나머지 형식도 저장 (문서는 한 번만 읽음)
+                for fmt in self.formats:
+                    _, filter_name, options = OUTPUT_FORMATS[fmt]
+                    props = {"FilterName": filter_name}
+                    if options:
+                        props["FilterOptions"] = options
+                    url = uno.systemPathToFileUrl(os.path.abspath(output_path(filepath, outdir, fmt)))
+                    try:
+                        doc.storeToURL(url, _props(**props))
+                    except Exception as e:
+                        if timed_out.is_set() or self.watchdog.cancelled.is_set():
+                            raise
+                        extra_errors[fmt] = str(e)
+            finally:
+                try:
+                    doc.close(True)
+                except Exception:
+                    pass
+        except Exception as e:
+            if self.watchdog.cancelled.is_set():
+                self._kill()
+                return ConvertResult(filepath, STATUS_CANCELLED)
+            if timed_out.is_set():
+                return ConvertResult(filepath, STATUS_TIMEOUT)
+            # 인스턴스가 죽었을 수 있으므로 다음 파일에서 새로 띄움
+            if type(e).__name__ == "DisposedException" or self.proc.poll() is not None:
+                self._kill()
+            return ConvertResult(filepath, STATUS_ERROR, detail=str(e))
+        finally:
+            finished.set()
+            timer.cancel()
+
+        converted = time.monotonic() - started
+        rss = self._over_limit()
+        if pdf_complete(expected_pdf):
+            result = ConvertResult(filepath, STATUS_OK, pdf_path=expected_pdf)
+            for fmt in self.formats:
+                error = extra_errors.get(fmt) or check_output(output_path(filepath, outdir, fmt), fmt)
+                if error is None:
+                    result.outputs[fmt] = output_path(filepath, outdir, fmt)
+                else:
+                    result.output_errors[fmt] = error
+        elif discard_partial_pdf(expected_pdf):
+            result = ConvertResult(filepath, STATUS_FAILED, detail="PDF가 끝까지 쓰이지 않음 (잘린 파일)")
+        elif rss:
+            detail = f"{rss // (1024 * 1024)}MB 사용"
+            result = ConvertResult(filepath, STATUS_MEMORY, detail=detail)
+        else:
+            result = ConvertResult(filepath, STATUS_NO_PDF, detail="PDF 파일이 생성되지 않음")
+        result.phases["convert"] = converted
+        return result
+
+    def _pdf_props(self):
+        if self.export is None or not self.export.options:
+            return _props(FilterName="writer_pdf_Export")
+        # 내보내기 프로필의 필터 옵션은 PropertyValue 배열로 넘김
+        data = uno.Any("[]com.sun.star.beans.PropertyValue", _props(**self.export.options))
+        return _props(FilterName="writer_pdf_Export", FilterData=data)
+
+    def reset(self):
+        """강제 종료 뒤 다시 시도하기 전에 인스턴스를 내리고 새 프로필로 바꿉니다."""
+        self._kill()
+        remove_profile(self.profile_dir)
+        self.profile_dir, self.profile_url = make_profile(self.template)
+
+    def close(self):
+        if self.desktop is not None:
+            try:
+                self.desktop.terminate()
+                self.proc.wait(timeout=10)
+            except Exception:
+                pass
+        self._kill()
+        remove_profile(self.profile_dir)
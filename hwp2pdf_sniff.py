@@ -0,0 +1,320 @@
+"""변환 전 사전 검사(pre-flight)
+
+soffice를 띄우기 전에 파일 헤더와 목차만 읽어 변환이 확실히 실패할 파일을 걸러냅니다.
+본문은 풀지 않지만, .hwp는 스트림 위치를 찾기 위해 FAT와 디렉터리 섹터를 모두 읽고
+.hwpx는 zip 중앙 디렉터리와 작은 항목(mimetype, manifest)을 읽습니다.
+
+- .hwp: OLE 복합 문서 서명과 FileHeader 스트림의 속성(암호, 배포용 문서, DRM)
+- .hwpx: zip 중앙 디렉터리와 mimetype 항목, 암호화된 항목
+- 빈 파일, 확장자와 내용이 다른 파일(예: .hwp인데 실제로는 HWPX)
+
+문서를 열지 않고 구역(section) 수와 본문 크기, 가능하면 쪽 수도 읽어 두므로
+변환 시간 예측(CostModel)에 쓸 수 있습니다.
+"""
+
+import os
+import struct
+import zipfile
+import zlib
+
+OLE_SIGNATURE = b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"
+ZIP_SIGNATURE = b"PK\x03\x04"
+HWP3_SIGNATURE = b"HWP Document File V3"
+HWP5_SIGNATURE = b"HWP Document File"
+HWPX_MIMETYPE = b"application/hwp+zip"
+
+KIND_HWP5 = "hwp5"
+KIND_HWP3 = "hwp3"
+KIND_HWPX = "hwpx"
+
+# FileHeader 속성 비트
+FLAG_COMPRESSED = 0x01
+FLAG_PASSWORD = 0x02
+FLAG_DISTRIBUTION = 0x04  # 배포용 문서
+FLAG_DRM = 0x10
+
+_KIND_EXT = {KIND_HWP5: ".hwp", KIND_HWP3: ".hwp", KIND_HWPX: ".hwpx"}
+
+_END = 0xFFFFFFFE
+_MAX_SECTORS = 1 << 20  # 손상된 체인에서 끝없이 돌지 않도록
+
+
+class SniffError(Exception):
+    """파일 구조가 손상됨"""
+
+
+class SniffResult:
+    """사전 검사 결과
+
+    reason이 있으면 변환하지 않고 실패로 처리할 파일입니다.
+    kind는 확장자가 아니라 내용으로 판단한 형식이며, ext는 그에 맞는 확장자입니다.
+    """
+
+    def __init__(self, filepath, kind=None, reason=""):
+        self.filepath = filepath
+        self.kind = kind
+        self.reason = reason
+        self.version = ""
+        self.compressed = False
+        self.sections = None  # 구역 수
+        self.pages = None  # 쪽 수 (문서에 기록되어 있을 때만)
+        self.body_bytes = None  # 본문(구역) 스트림/XML 크기 합
+
+    @property
+    def ok(self):
+        return not self.reason
+
+    @property
+    def ext(self):
+        return _KIND_EXT.get(self.kind, "")
+
+    @property
+    def misnamed(self):
+        """확장자와 실제 형식이 다른지"""
+        actual = self.ext
+        return bool(actual) and os.path.splitext(self.filepath)[1].lower() != actual
+
+
+class _CompoundFile:
+    """OLE 복합 문서(CFB)에서 필요한 스트림만 읽는 최소한의 읽기 도구"""
+
+    def __init__(self, f, file_size):
+        self.f = f
+        header = f.read(512)
+        if len(header) < 512 or header[:8] != OLE_SIGNATURE:
+            raise SniffError("OLE 헤더가 없음")
+        self.sector_size = 1 << struct.unpack_from("<H", header, 0x1E)[0]
+        self.mini_size = 1 << struct.unpack_from("<H", header, 0x20)[0]
+        (n_fat, first_dir, _, self.mini_cutoff, first_minifat, n_minifat,
+         first_difat, n_difat) = struct.unpack_from("<IIIIIIII", header, 0x2C)
+        if self.sector_size not in (512, 4096) or self.mini_size != 64:
+            raise SniffError("지원하지 않는 섹터 크기")
+        self.n_sectors = max(0, (file_size - 512) // self.sector_size + 1)
+
+        # FAT 섹터 위치: 헤더의 DIFAT 109개 + DIFAT 체인
+        fat_sectors = [s for s in struct.unpack_from("<109I", header, 0x4C) if s < _END]
+        per = self.sector_size // 4 - 1
+        sector = first_difat
+        for _ in range(min(n_difat, _MAX_SECTORS)):
+            if sector >= _END:
+                break
+            data = self._sector(sector)
+            fat_sectors += [s for s in struct.unpack_from(f"<{per}I", data) if s < _END]
+            sector = struct.unpack_from("<I", data, per * 4)[0]
+        fat_sectors = fat_sectors[:n_fat]
+        self.fat = []
+        for s in fat_sectors:
+            self.fat.extend(struct.unpack(f"<{self.sector_size // 4}I", self._sector(s)))
+
+        self.entries = []
+        dir_data = self._chain_data(first_dir)
+        for off in range(0, len(dir_data) - 127, 128):
+            raw = dir_data[off:off + 128]
+            name_len = struct.unpack_from("<H", raw, 0x40)[0]
+            name = raw[:max(0, name_len - 2)].decode("utf-16-le", "replace")
+            kind = raw[0x42]
+            left, right, child = struct.unpack_from("<III", raw, 0x44)
+            start, size = struct.unpack_from("<IQ", raw, 0x74)
+            if self.sector_size == 512:
+                size &= 0xFFFFFFFF
+            self.entries.append((name, kind, left, right, child, start, size))
+        if not self.entries or self.entries[0][1] != 5:
+            raise SniffError("루트 항목이 없음")
+
+        self._minifat = None
+        self._minifat_start = first_minifat if n_minifat else _END
+
+    def _sector(self, sector):
+        if sector >= self.n_sectors:
+            raise SniffError("섹터 번호가 파일 범위를 벗어남")
+        self.f.seek(512 + sector * self.sector_size)
+        data = self.f.read(self.sector_size)
+        if len(data) < self.sector_size:
+            data += b"\0" * (self.sector_size - len(data))
+        return data
+
+    def _chain(self, start, table):
+        chain = []
+        sector = start
+        while sector < _END:
+            if sector >= len(table) or len(chain) > _MAX_SECTORS:
+                raise SniffError("손상된 섹터 체인")
+            chain.append(sector)
+            sector = table[sector]
+        return chain
+
+    def _chain_data(self, start, size=None):
+        data = b"".join(self._sector(s) for s in self._chain(start, self.fat))
+        return data if size is None else data[:size]
+
+    def children(self, entry_id=0):
+        """저장소(storage) 항목 바로 아래의 {이름: 항목 번호}"""
+        result = {}
+        stack = [self.entries[entry_id][4]]
+        while stack:
+            i = stack.pop()
+            if i >= len(self.entries) or len(result) > len(self.entries):
+                continue
+            name, _, left, right, _, _, _ = self.entries[i]
+            result[name] = i
+            stack += [left, right]
+        return result
+
+    def size(self, entry_id):
+        return self.entries[entry_id][6]
+
+    def read(self, entry_id, limit=None):
+        """스트림 내용 (limit 바이트까지만)"""
+        _, _, _, _, _, start, size = self.entries[entry_id]
+        if limit is not None:
+            size = min(size, limit)
+        if self.entries[entry_id][6] >= self.mini_cutoff:
+            return self._chain_data(start, size)
+        # 작은 스트림은 루트 항목의 mini stream 안에 64바이트 단위로 저장됨
+        if self._minifat is None:
+            raw = self._chain_data(self._minifat_start) if self._minifat_start < _END else b""
+            self._minifat = struct.unpack(f"<{len(raw) // 4}I", raw)
+        root_chain = self._chain(self.entries[0][5], self.fat)
+        per_sector = self.sector_size // self.mini_size
+        out = []
+        for mini in self._chain(start, self._minifat):
+            sector = root_chain[mini // per_sector] if mini // per_sector < len(root_chain) else None
+            if sector is None:
+                raise SniffError("손상된 mini stream")
+            data = self._sector(sector)
+            off = (mini % per_sector) * self.mini_size
+            out.append(data[off:off + self.mini_size])
+            if sum(map(len, out)) >= size:
+                break
+        return b"".join(out)[:size]
+
+
+def _summary_page_count(data):
+    """OLE 속성 집합(HwpSummaryInformation)에서 쪽 수(PID 14)를 찾습니다."""
+    if len(data) < 48:
+        return None
+    section_off = struct.unpack_from("<I", data, 44)[0]
+    if section_off + 8 > len(data):
+        return None
+    count = struct.unpack_from("<I", data, section_off + 4)[0]
+    for i in range(min(count, 256)):
+        pos = section_off + 8 + i * 8
+        if pos + 8 > len(data):
+            break
+        pid, off = struct.unpack_from("<II", data, pos)
+        value_pos = section_off + off
+        if pid == 14 and value_pos + 8 <= len(data):
+            vtype, value = struct.unpack_from("<Ii", data, value_pos)
+            if vtype & 0xFFFF == 3 and value > 0:  # VT_I4
+                return value
+    return None
+
+
+def _sniff_hwp5(result, f, file_size):
+    cfb = _CompoundFile(f, file_size)
+    root = cfb.children()
+    if "FileHeader" not in root:
+        result.reason = "손상된 HWP 파일: FileHeader가 없음"
+        return
+    header = cfb.read(root["FileHeader"], 256)
+    if len(header) < 40 or not header.startswith(HWP5_SIGNATURE):
+        result.reason = "손상된 HWP 파일: FileHeader 서명이 다름"
+        return
+    version, flags = struct.unpack_from("<II", header, 32)
+    result.version = ".".join(str(version >> s & 0xFF) for s in (24, 16, 8, 0))
+    result.compressed = bool(flags & FLAG_COMPRESSED)
+
+    body = cfb.children(root["BodyText"]) if "BodyText" in root else {}
+    sections = [i for name, i in body.items() if name.startswith("Section")]
+    result.sections = len(sections)
+    result.body_bytes = sum(cfb.size(i) for i in sections)
+    if "\x05HwpSummaryInformation" in root:
+        try:
+            result.pages = _summary_page_count(
+                cfb.read(root["\x05HwpSummaryInformation"], 64 * 1024)
+            )
+        except SniffError:
+            pass
+
+    if flags & FLAG_PASSWORD:
+        result.reason = "암호가 걸린 문서"
+    elif flags & FLAG_DRM:
+        result.reason = "DRM으로 보호된 문서"
+    elif flags & FLAG_DISTRIBUTION:
+        result.reason = "배포용 문서 (본문이 암호화되어 변환할 수 없음)"
+    elif not sections:
+        result.reason = "손상된 HWP 파일: 본문(BodyText)이 없음"
+
+
+def _sniff_hwpx(result, f):
+    try:
+        zf = zipfile.ZipFile(f)
+    except zipfile.BadZipFile as e:
+        result.reason = f"손상된 HWPX 파일: {e}"
+        return
+    with zf:
+        infos = zf.infolist()
+        names = {i.filename for i in infos}
+        if "mimetype" not in names:
+            result.reason = "HWPX 파일이 아님: mimetype 항목이 없음"
+            return
+        # 암호화된 항목은 읽으면 RuntimeError가 나므로 읽기 전에 확인
+        if any(i.flag_bits & 0x1 for i in infos):
+            result.reason = "암호가 걸린 문서"
+            return
+        mimetype = zf.read("mimetype").strip()
+        if mimetype != HWPX_MIMETYPE:
+            result.reason = f"HWPX 파일이 아님: {mimetype.decode('ascii', 'replace')}"
+            return
+        sections = [
+            i for i in infos
+            if i.filename.startswith("Contents/section") and i.filename.endswith(".xml")
+        ]
+        result.sections = len(sections)
+        result.body_bytes = sum(i.file_size for i in sections)
+        if "META-INF/manifest.xml" in names and b"encryption-data" in zf.read("META-INF/manifest.xml"):
+            result.reason = "암호가 걸린 문서"
+        elif not sections:
+            result.reason = "손상된 HWPX 파일: 본문(section)이 없음"
+
+
+def sniff(filepath):
+    """파일을 열어 헤더와 목차만 읽고 SniffResult를 반환합니다.
+
+    어떤 파일이든 예외를 내지 않고, 읽을 수 없으면 reason에 이유를 남깁니다.
+    """
+    result = SniffResult(filepath)
+    try:
+        file_size = os.path.getsize(filepath)
+        if file_size == 0:
+            result.reason = "빈 파일 (0바이트)"
+            return result
+        with open(filepath, "rb") as f:
+            head = f.read(32)
+            f.seek(0)
+            if head.startswith(OLE_SIGNATURE):
+                result.kind = KIND_HWP5
+                _sniff_hwp5(result, f, file_size)
+            elif head.startswith(ZIP_SIGNATURE):
+                result.kind = KIND_HWPX
+                _sniff_hwpx(result, f)
+            elif head.startswith(HWP3_SIGNATURE):
+                # HWP 3.x(97)는 단일 파일 형식으로 구조 정보가 없음
+                result.kind = KIND_HWP3
+                result.version = "3"
+            else:
+                result.reason = "HWP/HWPX 파일이 아님 (알 수 없는 형식)"
+    except SniffError as e:
+        result.reason = f"손상된 HWP 파일: {e}"
+    except (zipfile.BadZipFile, zlib.error) as e:
+        # CRC 불일치, 잘린 압축 데이터
+        result.reason = f"손상된 HWPX 파일: {e}"
+    except NotImplementedError as e:
+        # 지원하지 않는 압축 방식
+        result.reason = f"HWPX 파일을 읽을 수 없음: {e}"
+    except RuntimeError as e:
+        # 암호화된 항목 (flag_bits로 걸러내지 못한 경우)
+        result.reason = f"암호가 걸린 문서: {e}"
+    except (OSError, struct.error, zipfile.LargeZipFile, EOFError) as e:
+        result.reason = f"파일을 읽을 수 없음: {e}"
+    return result
@@ -0,0 +1,502 @@
+"""여러 컴퓨터에서 나누어 변환하기 (공유 스풀 폴더 작업 대기열)
+
+공유 저장소(NFS/SMB)의 스풀 폴더에 변환할 파일을 job_size개씩 작업으로 나누어 넣으면,
+여러 컴퓨터의 작업자가 작업을 하나씩 임대해 변환하고 결과를 같은 폴더에 남깁니다.
+
+    spool/
+      spool.json                        설정 (출력 폴더, 임대 시간, 최대 임대 횟수)
+      batches/<넣은 작업>.json          넣은 작업 묶음과 파일 수 (넣는 중이면 done이 거짓)
+      pending/<작업>.<n>.json           대기 중인 작업 (n: 만료되어 되돌려진 횟수)
+      leases/<작업>.<n>@<작업자>.json   임대된 작업 (작업자가 수정 시각을 계속 갱신)
+      done/<작업>.json                  파일별 결과
+      failed/<작업>.json                max_claims번 임대되고도 끝나지 않은 작업
+      workers/<작업자>.json             작업자별 처리 수
+
+작업 임대는 pending에서 leases로의 이름 바꾸기라 두 작업자가 같은 작업을 가져가지
+않습니다. 작업자는 임대 시간의 1/3마다 임대 파일의 수정 시각을 갱신하고, 임대 시간 동안
+갱신되지 않은 작업(작업자가 죽었거나 연결이 끊김)은 다른 작업자가 대기로 되돌립니다.
+시각은 모두 파일 서버가 찍은 수정 시각으로 비교하므로 컴퓨터마다 시계가 달라도 됩니다.
+되돌려진 작업을 원래 작업자가 끝내도 같은 결과 파일을 덮어쓸 뿐입니다.
+"""
+
+import json
+import os
+import platform
+import random
+import re
+import threading
+import time
+
+from hwp2pdf_engine import FileFeed
+
+DEFAULT_JOB_SIZE = 50
+DEFAULT_LEASE = 300.0  # 초
+MAX_CLAIMS = 3  # 작업자를 계속 죽이는 문서가 든 작업을 무한히 다시 돌리지 않도록
+POLL_INTERVAL = 5.0  # 초, 대기 작업이 없을 때 다시 확인하는 간격
+LISTING_TTL = 60.0  # 초, 대기 작업 목록을 다시 읽는 간격
+MAX_LISTED_FAILURES = 1000  # 상태 집계에 보관하는 실패 파일 수
+
+CONFIG_NAME = "spool.json"
+BATCHES = "batches"
+PENDING = "pending"
+LEASES = "leases"
+DONE = "done"
+FAILED = "failed"
+WORKERS = "workers"
+_DIRS = (BATCHES, PENDING, LEASES, DONE, FAILED, WORKERS)
+
+
+def _write_json(path, data):
+    """임시 파일에 쓰고 이름을 바꿔, 읽는 쪽이 쓰다 만 파일을 보지 않게 합니다."""
+    tmp = f"{path}.{os.getpid()}-{threading.get_ident()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+def _read_json(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _parse_name(name):
+    """"<작업>.<n>[@<작업자>].json" -> (작업, n, 작업자)"""
+    base, _, worker = name[:-len(".json")].partition("@")
+    job_id, _, claims = base.rpartition(".")
+    return job_id, int(claims), worker
+
+
+def worker_name():
+    """스풀 안에서 이 프로세스를 가리키는 이름 (호스트-PID)"""
+    host = platform.node().split(".")[0] or "host"
+    return re.sub(r"[^A-Za-z0-9_-]", "_", f"{host}-{os.getpid()}")
+
+
+class SpoolError(Exception):
+    pass
+
+
+class Lease:
+    """작업자가 임대한 작업 하나"""
+
+    def __init__(self, spool, path, job):
+        self.spool = spool
+        self.path = path
+        self.id, self.claims, _ = _parse_name(os.path.basename(path))
+        self.files = job.get("files", [])
+        self.lost = False  # 만료되어 다른 작업자에게 넘어갔을 수 있음
+
+    def renew(self):
+        try:
+            os.utime(self.path)
+        except FileNotFoundError:
+            self.lost = True
+
+    def complete(self, worker, results):
+        """파일별 결과를 남기고 임대를 끝냅니다."""
+        _write_json(self.spool.dir(DONE, f"{self.id}.json"), {
+            "id": self.id, "worker": worker, "finished": time.time(), "files": results,
+        })
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            # 만료되어 되돌려졌으면 아직 아무도 가져가지 않은 대기 작업도 지움
+            try:
+                os.remove(self.spool.dir(PENDING, f"{self.id}.{self.claims + 1}.json"))
+            except OSError:
+                pass
+
+    def release(self):
+        """끝내지 못한 작업을 대기로 되돌립니다 (중단된 횟수는 늘리지 않음)."""
+        try:
+            os.rename(self.path, self.spool.dir(PENDING, f"{self.id}.{self.claims}.json"))
+        except OSError:
+            pass
+
+
+class SpoolStatus:
+    """스풀 폴더 전체의 진행 상황과 결과 집계"""
+
+    def __init__(self):
+        self.total = 0  # 넣은 파일 수
+        self.submitting = False
+        self.pending = 0  # 작업 수
+        self.leased = 0
+        self.done = 0
+        self.failed = 0
+        self.success = 0  # 파일 수
+        self.fail = 0
+        self.failures = []  # (경로, 결과 문구), 최대 MAX_LISTED_FAILURES개
+        self.workers = []  # (이름, 처리 수 dict, 마지막 갱신 후 지난 초)
+
+    @property
+    def finished(self):
+        return not self.submitting and not self.pending and not self.leased
+
+    def _failed(self, path, message):
+        self.fail += 1
+        if len(self.failures) < MAX_LISTED_FAILURES:
+            self.failures.append((path, message))
+
+
+class Spool:
+    """공유 스풀 폴더"""
+
+    def __init__(self, path):
+        self.path = os.path.abspath(path)
+        config = _read_json(os.path.join(self.path, CONFIG_NAME))
+        if config is None:
+            raise SpoolError(f"스풀 폴더가 아닙니다: {self.path}")
+        self.output_dir = config.get("output_dir", "")
+        self.lease = config.get("lease", DEFAULT_LEASE)
+        self.max_claims = config.get("max_claims", MAX_CLAIMS)
+        self._candidates = []
+        self._listed_at = 0.0
+
+    @classmethod
+    def create(cls, path, output_dir="", lease=DEFAULT_LEASE, max_claims=MAX_CLAIMS):
+        """스풀 폴더를 만들거나 엽니다. 출력 폴더는 스풀마다 하나입니다."""
+        path = os.path.abspath(path)
+        for name in _DIRS:
+            os.makedirs(os.path.join(path, name), exist_ok=True)
+        config_path = os.path.join(path, CONFIG_NAME)
+        config = _read_json(config_path)
+        if config is not None and config.get("output_dir", "") != output_dir:
+            raise SpoolError(
+                f"스풀의 출력 폴더({config.get('output_dir') or '원본 파일과 같은 폴더'})와 다릅니다"
+            )
+        _write_json(config_path, {
+            "output_dir": output_dir, "lease": lease, "max_claims": max_claims,
+            "created": (config or {}).get("created", time.time()),
+        })
+        return cls(path)
+
+    def dir(self, name, *parts):
+        return os.path.join(self.path, name, *parts)
+
+    def _list(self, name):
+        try:
+            return [n for n in os.listdir(self.dir(name)) if n.endswith(".json")]
+        except FileNotFoundError:
+            return []
+
+    def now(self):
+        """파일 서버의 현재 시각 (시계 파일에 찍은 수정 시각)"""
+        clock = os.path.join(self.path, ".clock")
+        with open(clock, "a"):
+            pass
+        os.utime(clock)
+        return os.stat(clock).st_mtime
+
+    def submit(self, files, job_size=DEFAULT_JOB_SIZE):
+        """files를 job_size개씩 작업으로 나누어 넣고 (작업 수, 파일 수)를 반환합니다.
+
+        files가 생성기(iter_hwp_files)여도 되며, 작업자는 넣는 동안에도 넣은 작업부터
+        변환하고 다 넣을 때까지 끝나지 않습니다.
+        """
+        batch_id = time.strftime("%Y%m%d-%H%M%S") + f"-{os.getpid()}"
+        marker = self.dir(BATCHES, f"{batch_id}.json")
+        _write_json(marker, {"done": False, "created": time.time()})
+        jobs = count = 0
+        chunk = []
+
+        def _put():
+            nonlocal jobs
+            job_id = f"{batch_id}-{jobs:06d}"
+            _write_json(self.dir(PENDING, f"{job_id}.0.json"), {"id": job_id, "files": chunk})
+            jobs += 1
+            os.utime(marker)  # 넣는 중임을 알림
+
+        for path in files:
+            chunk.append(path)
+            count += 1
+            if len(chunk) >= job_size:
+                _put()
+                chunk = []
+        if chunk:
+            _put()
+        _write_json(marker, {"done": True, "jobs": jobs, "files": count, "finished": time.time()})
+        return jobs, count
+
+    def claim(self, worker):
+        """대기 중인 작업 하나를 임대합니다. 없으면 None."""
+        for _ in range(2):
+            while self._candidates:
+                name = self._candidates.pop()
+                lease_path = self.dir(LEASES, f"{name[:-len('.json')]}@{worker}.json")
+                try:
+                    os.rename(self.dir(PENDING, name), lease_path)
+                except OSError:
+                    # 다른 작업자가 먼저 가져감 (NFS는 다시 보낸 이름 바꾸기가 실패로 보일 수 있음)
+                    if not os.path.exists(lease_path):
+                        continue
+                job = _read_json(lease_path)
+                if job is None:
+                    # 읽을 수 없는 작업 파일은 실패로 옮김
+                    try:
+                        os.rename(lease_path, self.dir(FAILED, name))
+                    except OSError:
+                        pass
+                    continue
+                os.utime(lease_path)  # 이름 바꾸기는 수정 시각을 바꾸지 않음
+                return Lease(self, lease_path, job)
+            if time.monotonic() - self._listed_at < 1.0 and not self._candidates:
+                break
+            # 작업자마다 다른 순서로 시도해 같은 작업을 두고 다투지 않도록 섞음
+            self._candidates = self._list(PENDING)
+            random.shuffle(self._candidates)
+            self._listed_at = time.monotonic()
+            if not self._candidates:
+                break
+        return None
+
+    def refresh_listing(self):
+        """오래된 대기 작업 목록을 버립니다 (다음 claim에서 다시 읽음)."""
+        if time.monotonic() - self._listed_at > LISTING_TTL:
+            self._candidates = []
+
+    def reclaim(self):
+        """임대 시간 동안 갱신되지 않은 작업을 대기로 되돌리고 그 수를 반환합니다.
+
+        max_claims번째로 만료된 작업은 다시 돌리지 않고 failed로 옮깁니다.
+        """
+        now = self.now()
+        count = 0
+        for name in self._list(LEASES):
+            path = self.dir(LEASES, name)
+            try:
+                if now - os.stat(path).st_mtime < self.lease:
+                    continue
+                job_id, claims, _ = _parse_name(name)
+            except (OSError, ValueError):
+                continue
+            claims += 1
+            if claims >= self.max_claims:
+                target = self.dir(FAILED, f"{job_id}.json")
+            else:
+                target = self.dir(PENDING, f"{job_id}.{claims}.json")
+            try:
+                os.rename(path, target)
+            except OSError:
+                continue
+            count += 1
+        if count:
+            self._candidates = []
+        return count
+
+    def _submitting(self, now):
+        for name in self._list(BATCHES):
+            path = self.dir(BATCHES, name)
+            batch = _read_json(path)
+            try:
+                fresh = now - os.stat(path).st_mtime < self.lease
+            except OSError:
+                continue
+            # 넣던 프로세스가 죽었으면 임대 시간이 지난 뒤 끝난 것으로 봄
+            if batch is not None and not batch.get("done") and fresh:
+                return True
+        return False
+
+    def idle(self):
+        """대기/임대 중인 작업이 없고 작업을 넣는 중도 아니면 참"""
+        if self._list(PENDING) or self._list(LEASES):
+            return False
+        return not self._submitting(self.now())
+
+    def report(self, worker, counts):
+        """작업자별 처리 수를 남깁니다 (수정 시각이 마지막으로 살아 있던 시각)."""
+        _write_json(self.dir(WORKERS, f"{worker}.json"), counts)
+
+    def status(self):
+        """SpoolStatus를 만듭니다. 결과 파일을 모두 읽으므로 작업 수에 비례해 걸립니다."""
+        now = self.now()
+        st = SpoolStatus()
+        for name in self._list(BATCHES):
+            batch = _read_json(self.dir(BATCHES, name)) or {}
+            st.total += batch.get("files", 0)
+        st.submitting = self._submitting(now)
+        st.pending = len(self._list(PENDING))
+        st.leased = len(self._list(LEASES))
+        for name in sorted(self._list(DONE)):
+            record = _read_json(self.dir(DONE, name))
+            if record is None:
+                continue
+            st.done += 1
+            for r in record.get("files", []):
+                if r.get("status") == "ok":
+                    st.success += 1
+                else:
+                    st._failed(r.get("path", ""), r.get("message", ""))
+        for name in sorted(self._list(FAILED)):
+            job = _read_json(self.dir(FAILED, name)) or {}
+            st.failed += 1
+            for path in job.get("files", []):
+                st._failed(path, f"작업자가 {self.max_claims}번 중단되어 포기함")
+        for name in sorted(self._list(WORKERS)):
+            path = self.dir(WORKERS, name)
+            counts = _read_json(path)
+            try:
+                age = now - os.stat(path).st_mtime
+            except OSError:
+                continue
+            if counts is not None:
+                st.workers.append((name[:-len(".json")], counts, age))
+        return st
+
+
+class SpoolFeed(FileFeed):
+    """스풀에서 작업을 임대해 파일을 내보내는 convert_batch 입력 (continuous=True로 넘김)
+
+    결과가 나오지 않은 파일이 prefetch개보다 적으면 다음 작업을 임대합니다. convert_batch의
+    on_result에서 record(result)를 부르면 작업의 파일이 모두 끝날 때 결과를 스풀에 남기고
+    임대를 끝냅니다. 스풀에 대기/임대 중인 작업이 없으면 순회가 끝나고, 다른 작업자의 임대가
+    만료되면 그 작업을 되돌려 이어서 변환합니다. close()하면 작업을 더 가져오지 않고
+    끝나지 않은 작업은 다른 작업자가 가져가도록 대기로 되돌립니다.
+    """
+
+    def __init__(self, spool, worker=None, prefetch=8):
+        super().__init__()
+        self.spool = spool
+        self.worker = worker or worker_name()
+        self.prefetch = max(1, prefetch)
+        self.poll_interval = min(POLL_INTERVAL, spool.lease / 3)
+        self.jobs_done = 0
+        self.success = 0
+        self.fail = 0
+        self.lost = 0  # 만료되어 다른 작업자에게 넘어간 임대 수
+        self._started = time.time()
+        self._lock = threading.Lock()
+        self._active = {}  # 작업 -> [Lease, 남은 경로, 결과 목록]
+        self._owner = {}  # 경로 -> 그 파일이 든 작업 목록
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+
+    def close(self):
+        """작업을 더 가져오지 않고 끝나지 않은 작업은 대기로 되돌립니다."""
+        self._stop.set()
+        self._wake.set()
+        with self._lock:
+            entries = list(self._active.values())
+            self._active.clear()
+            self._owner.clear()
+        for lease, _, _ in entries:
+            lease.release()
+        with self._cond:
+            self._items.clear()
+        super().close()
+
+    def record(self, result):
+        """convert_batch의 on_result에서 부릅니다."""
+        finished = []
+        with self._lock:
+            job_ids = self._owner.pop(result.filepath, None)
+            if job_ids is None:
+                return
+            if result.ok:
+                self.success += 1
+            else:
+                self.fail += 1
+            entry = {
+                "path": result.filepath,
+                "status": result.status,
+                "message": result.message(),
+                "elapsed": round(result.elapsed, 3),
+                "outputs": dict(result.outputs),
+            }
+            for job_id in job_ids:
+                job = self._active.get(job_id)
+                if job is None:
+                    continue
+                job[1].discard(result.filepath)
+                job[2].append(entry)
+                if not job[1]:
+                    del self._active[job_id]
+                    finished.append(job)
+        for lease, _, results in finished:
+            try:
+                lease.complete(self.worker, results)
+            except OSError:
+                # 스풀에 쓸 수 없으면 임대가 만료된 뒤 다른 작업자가 다시 변환함
+                continue
+            self.jobs_done += 1
+        self._wake.set()
+
+    def _outstanding(self):
+        with self._lock:
+            return len(self._owner)
+
+    def _start(self, lease):
+        with self._lock:
+            if self._stop.is_set():
+                lease.release()
+                return
+            if lease.id in self._active:
+                # 만료되어 되돌려진 자기 작업을 다시 가져옴: 파일은 이미 변환 중
+                self._active[lease.id][0] = lease
+                return
+            paths = list(dict.fromkeys(lease.files))
+            # 두 번 넣은 파일은 한 번만 변환하고 결과를 두 작업에 모두 남김
+            new = [p for p in paths if p not in self._owner]
+            for p in paths:
+                self._owner.setdefault(p, []).append(lease.id)
+            if paths:
+                self._active[lease.id] = [lease, set(paths), []]
+        if not paths:
+            lease.complete(self.worker, [])
+        elif new:
+            self.put(new)
+
+    def _renew(self):
+        with self._lock:
+            leases = [job[0] for job in self._active.values()]
+        for lease in leases:
+            if not lease.lost:
+                lease.renew()
+                self.lost += lease.lost
+        try:
+            self.spool.report(self.worker, {
+                "host": platform.node(), "pid": os.getpid(), "started": self._started,
+                "jobs": self.jobs_done, "success": self.success, "fail": self.fail,
+                "active": len(leases), "stopped": self._stop.is_set(),
+            })
+        except OSError:
+            pass
+
+    def _loop(self):
+        next_renew = next_reclaim = 0.0
+        try:
+            while not self._stop.is_set():
+                now = time.monotonic()
+                try:
+                    if now >= next_renew:
+                        self._renew()
+                        next_renew = now + self.spool.lease / 3
+                    self.spool.refresh_listing()
+                    while self._outstanding() < self.prefetch and not self._stop.is_set():
+                        lease = self.spool.claim(self.worker)
+                        if lease is None:
+                            break
+                        self._start(lease)
+                    if self._outstanding() < self.prefetch and now >= next_reclaim:
+                        # 대기 작업이 없으면 죽은 작업자의 작업을 되돌려 가져옴
+                        next_reclaim = now + self.poll_interval
+                        if self.spool.reclaim():
+                            continue
+                        with self._lock:
+                            active = bool(self._active)
+                        if not active and self.spool.idle():
+                            break
+                except OSError:
+                    # 공유 저장소가 잠시 끊김: 임대가 만료되기 전에 다시 시도
+                    pass
+                self._wake.wait(min(self.poll_interval, max(0.0, next_renew - time.monotonic())))
+                self._wake.clear()
+        finally:
+            self._stop.set()
+            self._renew()
+            super().close()
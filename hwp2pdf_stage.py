@@ -0,0 +1,147 @@
+"""로컬 스크래치 폴더에서 변환하고 출력 위치로 한 번에 옮기기
+
+soffice가 네트워크 폴더(SMB/NFS)에 직접 쓰면 작은 쓰기가 많아 느리고, 도중에 종료되면
+잘린 PDF가 남습니다. 작업자는 로컬 스크래치 폴더(가능하면 tmpfs)에 변환하고,
+끝까지 쓰인 PDF만 별도의 I/O 스레드가 출력 위치로 옮깁니다. 같은 파일 시스템이면
+이름 바꾸기 한 번, 다르면 출력 폴더의 임시 파일에 복사한 뒤 이름을 바꾸므로 출력
+위치에는 완성된 PDF만 나타나고, 복사하는 동안 작업자는 다음 파일을 변환합니다.
+"""
+
+import errno
+import os
+import queue
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+from hwp2pdf_engine import STATUS_ERROR
+
+SHM_DIR = "/dev/shm"
+SHM_MIN_FREE = 1024 * 1024 * 1024  # tmpfs 여유 공간이 이보다 적으면 디스크 임시 폴더 사용
+
+
+def scratch_root():
+    """스크래치 폴더를 만들 위치
+
+    HWP2PDF_SCRATCH 환경 변수가 있으면 그곳, Linux에서 /dev/shm(tmpfs)에 여유가 있으면
+    그곳, 아니면 시스템 임시 폴더입니다.
+    """
+    env = os.environ.get("HWP2PDF_SCRATCH")
+    if env:
+        os.makedirs(env, exist_ok=True)
+        return env
+    if sys.platform.startswith("linux") and os.access(SHM_DIR, os.W_OK):
+        try:
+            st = os.statvfs(SHM_DIR)
+            if st.f_bavail * st.f_frsize >= SHM_MIN_FREE:
+                return SHM_DIR
+        except OSError:
+            pass
+    return tempfile.gettempdir()
+
+
+def make_scratch(root=None):
+    """작업자 하나가 쓸 스크래치 폴더를 만듭니다."""
+    return tempfile.mkdtemp(prefix="hwp2pdf_stage_", dir=root or scratch_root())
+
+
+def publish(src, dst):
+    """src를 dst로 옮기고, 옮긴 뒤에도 읽을 수 있는 로컬 경로를 반환합니다.
+
+    같은 파일 시스템이면 이름 바꾸기(원자적)로 옮기고 dst를 반환합니다. 다른 파일
+    시스템이면 dst 옆 임시 파일에 복사한 뒤 이름을 바꾸고, 남아 있는 src를 반환합니다.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(dst)), exist_ok=True)
+    try:
+        os.replace(src, dst)
+        return dst
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+    tmp = dst + f".{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        shutil.copyfile(src, tmp)
+        os.replace(tmp, dst)
+    except OSError:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+    return src
+
+
+class Publisher:
+    """스크래치 폴더의 변환 결과를 출력 위치로 옮기는 I/O 스레드
+
+    submit(scratch_dir, items)로 묶음 하나의 [(index, 결과, 출력 PDF 경로)]를 넘기면
+    성공한 PDF와 함께 만든 형식(result.outputs)을 PDF 옆으로 옮기고 경로를 출력 경로로
+    바꾼 뒤 scratch_dir를 지우고, on_published([(index, 결과, 로컬 사본 경로)])를
+    호출합니다. PDF를 옮기지 못한 파일은 STATUS_ERROR가 되고, 다른 형식을 옮기지 못하면
+    result.output_errors에 남깁니다. 대기열이 차면 submit이 기다리므로 스크래치 폴더가 끝없이
+    커지지 않습니다.
+    """
+
+    def __init__(self, on_published, backlog=8):
+        self.on_published = on_published
+        self.moved = 0
+        self.copied = 0
+        self.seconds = 0.0
+        self._queue = queue.Queue(maxsize=max(1, backlog))
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+
+    def submit(self, scratch_dir, items):
+        self._queue.put((scratch_dir, items))
+
+    def _loop(self):
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+            scratch_dir, items = job
+            done = []
+            for index, result, dst in items:
+                local = None
+                if result.ok:
+                    started = time.monotonic()
+                    try:
+                        local = publish(result.pdf_path, dst)
+                        result.pdf_path = dst
+                        if local == dst:
+                            self.moved += 1
+                        else:
+                            self.copied += 1
+                    except OSError as e:
+                        result.status = STATUS_ERROR
+                        result.detail = f"출력 위치에 쓸 수 없음: {e}"
+                        result.pdf_path = ""
+                    self._publish_outputs(result, os.path.dirname(dst))
+                    elapsed = time.monotonic() - started
+                    result.phases["publish"] = elapsed
+                    self.seconds += elapsed
+                done.append((index, result, local))
+            try:
+                self.on_published(done)
+            finally:
+                shutil.rmtree(scratch_dir, ignore_errors=True)
+
+    def _publish_outputs(self, result, outdir):
+        for fmt, path in list(result.outputs.items()):
+            if not result.ok:
+                del result.outputs[fmt]
+                continue
+            dst = os.path.join(outdir, os.path.basename(path))
+            try:
+                publish(path, dst)
+                result.outputs[fmt] = dst
+            except OSError as e:
+                del result.outputs[fmt]
+                result.output_errors[fmt] = f"출력 위치에 쓸 수 없음: {e}"
+
+    def close(self):
+        """남은 결과를 모두 옮길 때까지 기다립니다."""
+        self._queue.put(None)
+        self._thread.join()
@@ -0,0 +1,301 @@
+"""입력 폴더를 감시해 새로 생기거나 바뀐 HWP/HWPX 파일 변환하기 (핫 폴더)
+
+Linux에서는 inotify로 폴더 변경을 통지받으므로 바뀐 것이 없으면 CPU를 쓰지 않고
+기다립니다. inotify를 쓸 수 없거나(다른 OS, 감시 수 한도 초과) 통지가 오지 않는
+네트워크 드라이브는 poll_interval초마다 폴더를 다시 검색합니다.
+복사 중인 파일을 변환하지 않도록 크기와 수정 시각이 settle초 동안 바뀌지 않은
+파일만 내보냅니다. 시작할 때 있던 파일 중 PDF가 원본보다 새것이면 건너뜁니다.
+"""
+
+import os
+import select
+import struct
+import sys
+import threading
+import time
+
+from hwp2pdf_engine import FileFeed, expected_pdf_path, iter_hwp_files, output_dir_for, wanted_file
+
+DEFAULT_SETTLE = 2.0  # 초
+DEFAULT_POLL_INTERVAL = 5.0  # 초
+
+METHOD_INOTIFY = "inotify"
+METHOD_POLL = "poll"
+
+# linux/inotify.h
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = (
+    IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO
+    | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR
+)
+_EVENT = struct.Struct("iIII")  # wd, mask, cookie, len
+
+
+class Inotify:
+    """inotify(7)의 최소 래퍼 (ctypes, Linux 전용)"""
+
+    def __init__(self):
+        if not sys.platform.startswith("linux"):
+            raise OSError("inotify는 Linux에서만 쓸 수 있음")
+        # ctypes는 감시를 시작할 때만 불러옴 (CLI 시작 시간)
+        import ctypes
+        import ctypes.util
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or None, use_errno=True)
+        self._get_errno = ctypes.get_errno
+        self.fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            err = self._get_errno()
+            raise OSError(err, os.strerror(err))
+        self.dirs = {}  # watch descriptor -> 폴더
+
+    def add(self, folder):
+        """folder를 감시합니다. 이미 감시 중인 폴더(이름이 바뀐 경우 포함)는 경로만 갱신합니다."""
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(folder), WATCH_MASK)
+        if wd < 0:
+            err = self._get_errno()
+            raise OSError(err, os.strerror(err), folder)
+        self.dirs[wd] = folder
+
+    def read(self):
+        """쌓인 이벤트 [(폴더, 이름, mask)]. 큐가 넘친 이벤트는 폴더가 None입니다."""
+        events = []
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                return events
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = _EVENT.unpack_from(data, offset)
+                offset += _EVENT.size
+                name = os.fsdecode(data[offset:offset + length].rstrip(b"\0"))
+                offset += length
+                if mask & IN_IGNORED:
+                    # 폴더가 지워지거나 파일 시스템이 분리되어 감시가 풀림
+                    self.dirs.pop(wd, None)
+                    continue
+                events.append((self.dirs.get(wd), name, mask))
+
+    def close(self):
+        os.close(self.fd)
+
+
+class FolderWatcher(FileFeed):
+    """입력 폴더들을 감시하며 쓰기가 끝난 HWP/HWPX 파일을 내보내는 끝나지 않는 입력 목록
+
+    convert_batch(..., continuous=True)에 files로 넘깁니다. 만들면 바로 감시를 시작하고,
+    close()하면 감시를 멈추고 순회가 끝납니다. existing이 참이면 시작할 때 있던 파일 중
+    PDF가 없거나 원본보다 오래된 파일도 변환합니다. poll_interval을 주면 inotify를 쓰지
+    않고 그 간격으로 다시 검색합니다. 메모리에는 감시 중인 파일마다 크기와 수정 시각만
+    남고, 지워진 파일은 잊습니다.
+    """
+
+    def __init__(self, roots, output_dir="", recursive=True, include=None, exclude=None,
+                 settle=DEFAULT_SETTLE, poll_interval=None, existing=True):
+        super().__init__()
+        self.roots = [os.path.abspath(r) for r in roots]
+        self.output_dir = output_dir
+        self.recursive = recursive
+        self.include = list(include or [])
+        self.exclude = list(exclude or [])
+        self.settle = settle
+        self.poll_interval = poll_interval
+        self.existing = existing
+        self._stop = threading.Event()
+        self._seen = {}  # 경로 -> 내보낸 때의 (크기, 수정 시각)
+        self._pending = {}  # 경로 -> (크기, 수정 시각, 마지막으로 바뀐 시각)
+        self._rescan_at = None
+        self._inotify = None
+        self._wake = None  # close()가 select를 깨우는 pipe
+        self._wake_lock = threading.Lock()
+        if poll_interval is None:
+            try:
+                self._inotify = Inotify()
+                self._wake = os.pipe()
+            except (OSError, AttributeError):
+                self._inotify = None
+                self.poll_interval = DEFAULT_POLL_INTERVAL
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+
+    @property
+    def method(self):
+        return METHOD_INOTIFY if self._inotify is not None else METHOD_POLL
+
+    def close(self):
+        """감시를 멈춥니다. 아직 쓰기가 끝나지 않은 파일은 내보내지 않습니다."""
+        self._stop.set()
+        with self._wake_lock:
+            if self._wake is not None:
+                try:
+                    os.write(self._wake[1], b"x")
+                except OSError:
+                    pass
+        super().close()
+
+    def _loop(self):
+        try:
+            self._scan(initial=True)
+            next_poll = time.monotonic() + (self.poll_interval or 0)
+            while not self._stop.is_set():
+                now = time.monotonic()
+                deadlines = [changed + self.settle for _, _, changed in self._pending.values()]
+                if self._rescan_at is not None:
+                    deadlines.append(self._rescan_at)
+                if self._inotify is None:
+                    deadlines.append(next_poll)
+                timeout = max(0.0, min(deadlines) - now) if deadlines else None
+                self._wait(timeout)
+                if self._stop.is_set():
+                    break
+                now = time.monotonic()
+                if self._inotify is None and now >= next_poll:
+                    self._rescan_at = None
+                    self._scan()
+                    next_poll = time.monotonic() + self.poll_interval
+                elif self._rescan_at is not None and now >= self._rescan_at:
+                    self._rescan_at = None
+                    self._scan()
+                self._emit_stable()
+        finally:
+            with self._wake_lock:
+                if self._wake is not None:
+                    for fd in self._wake:
+                        os.close(fd)
+                    self._wake = None
+            if self._inotify is not None:
+                self._inotify.close()
+            super().close()
+
+    def _wait(self, timeout):
+        if self._inotify is None:
+            self._stop.wait(timeout)
+            return
+        ready, _, _ = select.select([self._inotify.fd, self._wake[0]], [], [], timeout)
+        if self._inotify.fd in ready:
+            self._handle(self._inotify.read())
+
+    def _fall_back_to_polling(self):
+        """감시 수 한도(fs.inotify.max_user_watches) 등으로 inotify를 못 쓰면 검색으로 바꿈"""
+        self._inotify.close()
+        self._inotify = None
+        self.poll_interval = self.poll_interval or DEFAULT_POLL_INTERVAL
+
+    def _on_dir(self, folder):
+        if self._inotify is None:
+            return
+        try:
+            self._inotify.add(folder)
+        except OSError:
+            self._fall_back_to_polling()
+
+    def _schedule_rescan(self):
+        # 폴더가 한꺼번에 여러 개 생겨도 한 번만 검색
+        if self._rescan_at is None:
+            self._rescan_at = time.monotonic() + self.settle
+
+    def _handle(self, events):
+        now = time.monotonic()
+        for folder, name, mask in events:
+            if folder is None or mask & (IN_Q_OVERFLOW | IN_DELETE_SELF | IN_MOVE_SELF):
+                self._schedule_rescan()
+                continue
+            if mask & IN_ISDIR:
+                if self.recursive:
+                    self._schedule_rescan()
+                continue
+            path = os.path.join(folder, name)
+            if mask & (IN_DELETE | IN_MOVED_FROM):
+                self._seen.pop(path, None)
+                self._pending.pop(path, None)
+            elif self._wanted(path):
+                self._touch(path, now)
+
+    def _wanted(self, path):
+        for root in self.roots:
+            rel = os.path.relpath(path, root)
+            if rel != os.pardir and not rel.startswith(os.pardir + os.sep):
+                return wanted_file(os.path.basename(path), rel.replace(os.sep, "/"),
+                                   self.include, self.exclude)
+        return False
+
+    @staticmethod
+    def _signature(path):
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return st.st_size, st.st_mtime_ns
+
+    def _converted(self, path):
+        """PDF가 이미 있고 원본보다 새것인지"""
+        pdf = expected_pdf_path(path, output_dir_for(path, self.output_dir))
+        try:
+            return os.stat(pdf).st_mtime_ns >= os.stat(path).st_mtime_ns
+        except OSError:
+            return False
+
+    def _touch(self, path, now):
+        """path가 바뀌었을 수 있으면 크기와 수정 시각을 보고 대기 목록을 갱신합니다."""
+        sig = self._signature(path)
+        if sig is None:
+            self._pending.pop(path, None)
+            return
+        if self._seen.get(path) == sig:
+            self._pending.pop(path, None)
+            return
+        pending = self._pending.get(path)
+        if pending is None or pending[:2] != sig:
+            self._pending[path] = (sig[0], sig[1], now)
+
+    def _scan(self, initial=False):
+        """폴더 전체를 검색해 새로 생기거나 바뀐 파일을 대기 목록에 넣고 지워진 파일은 잊습니다."""
+        now = time.monotonic()
+        found = set()
+        on_dir = self._on_dir if self._inotify is not None else None
+        for path in iter_hwp_files(self.roots, self.recursive, self.include, self.exclude, on_dir):
+            found.add(path)
+            if path not in self._seen and path not in self._pending:
+                if (initial and not self.existing) or self._converted(path):
+                    sig = self._signature(path)
+                    if sig is not None:
+                        self._seen[path] = sig
+                    continue
+            self._touch(path, now)
+        if not initial:
+            for known in (self._seen, self._pending):
+                for path in [p for p in known if p not in found]:
+                    del known[path]
+
+    def _emit_stable(self):
+        """settle초 동안 바뀌지 않은 파일을 변환 입력으로 내보냅니다."""
+        now = time.monotonic()
+        ready = []
+        for path, (size, mtime, changed) in list(self._pending.items()):
+            if now - changed < self.settle:
+                continue
+            sig = self._signature(path)
+            if sig is None:
+                del self._pending[path]
+            elif sig != (size, mtime):
+                self._pending[path] = (sig[0], sig[1], now)
+            else:
+                del self._pending[path]
+                self._seen[path] = sig
+                ready.append(path)
+        if ready:
+            self.put(ready)
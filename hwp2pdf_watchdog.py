@@ -0,0 +1,579 @@
+"""soffice 프로세스 감시(watchdog)와 격리 목록
+
+변환 프로세스를 새 프로세스 그룹으로 띄워 실행 중 메모리(RSS)와 CPU 사용량을 살피고,
+메모리 상한을 넘거나 CPU를 쓰지 않고 멈춰 있거나 시간 제한을 넘으면 soffice가 띄운
+하위 프로세스까지 그룹 전체를 종료합니다. 여유 메모리가 부족하면 동시에 실행하는
+변환 수를 줄이고, 재시도해도 계속 실패하는 파일은 격리 목록에 올려 다음부터 건너뜁니다.
+psutil 없이 Linux는 /proc, macOS는 ps/vm_stat으로 측정합니다.
+
+메모리 상한, 멈춤 감지와 실행 중인 변환의 일시 정지는 POSIX(Linux/macOS)에서만 동작합니다.
+Windows에서는 여유 메모리(Win32 API)에 따른 동시 변환 수 조절, 시간 제한, 취소(taskkill)와
+새 변환을 시작하지 않는 일시 정지만 합니다.
+"""
+
+import contextlib
+import json
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from hwp2pdf_engine import IS_WINDOWS, user_cache_dir
+
+MB = 1024 * 1024
+DEFAULT_RSS_LIMIT = 2048 * MB  # 프로세스 그룹 전체 RSS 상한
+STALL_SECONDS = 60  # 이 시간 동안 CPU를 STALL_CPU초도 쓰지 않으면 멈춘 것으로 판단
+STALL_CPU = 0.2
+SAMPLE_INTERVAL = 0.5  # 초
+MAX_ATTEMPTS = 3  # 첫 시도 포함
+BACKOFF_BASE = 2.0  # 재시도 대기: 2, 4, 8, ... 초
+BACKOFF_MAX = 30.0
+LOW_MEMORY = 1024 * MB  # 여유 메모리가 이보다 적으면 동시 변환 수를 줄임
+
+REASON_TIMEOUT = "timeout"
+REASON_MEMORY = "memory"
+REASON_STALL = "stall"
+REASON_CANCELLED = "cancelled"
+
+_IS_LINUX = sys.platform.startswith("linux")
+_IS_MAC = sys.platform == "darwin"
+
+
+def popen_group(cmd, **kwargs):
+    """cmd를 새 프로세스 그룹으로 실행합니다 (그룹 전체를 한 번에 종료할 수 있게)."""
+    if IS_WINDOWS:
+        kwargs.setdefault("creationflags", subprocess.CREATE_NEW_PROCESS_GROUP)
+    else:
+        kwargs.setdefault("start_new_session", True)
+    return subprocess.Popen(cmd, **kwargs)
+
+
+def kill_tree(proc):
+    """proc와 proc가 띄운 하위 프로세스를 모두 강제 종료합니다."""
+    if IS_WINDOWS:
+        if proc.poll() is None:
+            subprocess.run(
+                ["taskkill", "/T", "/F", "/PID", str(proc.pid)],
+                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+            )
+    else:
+        # 부모가 이미 끝났어도 그룹에 남은 soffice.bin 등을 정리
+        try:
+            os.killpg(proc.pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError):
+            pass
+    if proc.poll() is None:
+        proc.kill()
+
+
+def suspend_tree(proc, resume=False):
+    """proc의 프로세스 그룹 전체를 멈추거나(SIGSTOP) 다시 실행합니다(SIGCONT).
+
+    Windows에서는 아무것도 하지 않습니다.
+    """
+    if IS_WINDOWS:
+        return
+    try:
+        os.killpg(proc.pid, signal.SIGCONT if resume else signal.SIGSTOP)
+    except (ProcessLookupError, PermissionError):
+        pass
+
+
+def _linux_stat(pid, page, tick):
+    """(프로세스 그룹, 누적 CPU 초, RSS 바이트). 이미 끝났거나 읽을 수 없으면 None."""
+    try:
+        with open(f"/proc/{pid}/stat", "rb") as f:
+            stat = f.read()
+        # comm에 공백/괄호가 있을 수 있으므로 마지막 ')' 뒤부터 나눔
+        fields = stat[stat.rindex(b")") + 2:].split()
+        return int(fields[2]), (int(fields[11]) + int(fields[12])) / tick, int(fields[21]) * page
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+_children_supported = None
+
+
+def _linux_children(pid):
+    """pid의 바로 아래 하위 프로세스 번호"""
+    children = []
+    try:
+        tids = os.listdir(f"/proc/{pid}/task")
+    except OSError:
+        return children
+    for tid in tids:
+        try:
+            with open(f"/proc/{pid}/task/{tid}/children", "rb") as f:
+                children += [int(c) for c in f.read().split()]
+        except (OSError, ValueError):
+            continue
+    return children
+
+
+def _linux_usage(pgids):
+    """pgids 프로세스 그룹마다 (RSS 바이트, 누적 CPU 초)
+
+    커널이 /proc/<pid>/task/<tid>/children을 제공하면 그룹 리더부터 하위 프로세스만
+    따라가고, 아니면 /proc 전체를 한 번 훑어 모든 그룹을 함께 셉니다.
+    """
+    global _children_supported
+    if _children_supported is None:
+        _children_supported = os.path.exists(f"/proc/self/task/{os.getpid()}/children")
+    page = os.sysconf("SC_PAGE_SIZE")
+    tick = os.sysconf("SC_CLK_TCK")
+    usage = {}
+
+    def _add(pgid, cpu, rss):
+        total_rss, total_cpu = usage.get(pgid, (0, 0.0))
+        usage[pgid] = (total_rss + rss, total_cpu + cpu)
+
+    if _children_supported:
+        for pgid in pgids:
+            stack = [pgid]
+            seen = set()
+            while stack:
+                pid = stack.pop()
+                if pid in seen:
+                    continue
+                seen.add(pid)
+                stat = _linux_stat(pid, page, tick)
+                if stat is None or stat[0] != pgid:
+                    continue
+                _add(*stat)
+                stack += _linux_children(pid)
+        return usage
+    for name in os.listdir("/proc"):
+        if not name.isdigit():
+            continue
+        stat = _linux_stat(name, page, tick)
+        if stat is not None and stat[0] in pgids:
+            _add(*stat)
+    return usage
+
+
+def _cputime_seconds(text):
+    # ps의 시간 형식: [[dd-]hh:]mm:ss[.xx]
+    days = 0
+    if "-" in text:
+        d, text = text.split("-", 1)
+        days = int(d)
+    seconds = 0.0
+    for part in text.split(":"):
+        seconds = seconds * 60 + float(part)
+    return days * 86400 + seconds
+
+
+def _ps_usage(pgids):
+    """pgids 프로세스 그룹마다 (RSS 바이트, 누적 CPU 초) (ps 한 번 실행)"""
+    try:
+        out = subprocess.run(
+            ["ps", "-A", "-o", "pgid=,rss=,time="],
+            capture_output=True, text=True, timeout=10,
+        ).stdout
+    except (OSError, subprocess.SubprocessError):
+        return {}
+    usage = {}
+    for line in out.splitlines():
+        parts = line.split()
+        try:
+            if len(parts) != 3 or int(parts[0]) not in pgids:
+                continue
+            rss, cpu = usage.get(int(parts[0]), (0, 0.0))
+            usage[int(parts[0])] = (rss + int(parts[1]) * 1024, cpu + _cputime_seconds(parts[2]))
+        except ValueError:
+            continue
+    return usage
+
+
+def group_usage(pgids):
+    """pgids 프로세스 그룹마다 (RSS 바이트, 누적 CPU 초). 측정하지 못한 그룹은 빠집니다.
+
+    Windows에서는 측정하지 않으므로 항상 빈 사전입니다 (메모리 상한/멈춤 감지 없음).
+    """
+    if IS_WINDOWS:
+        return {}
+    if _IS_LINUX and os.path.isdir("/proc"):
+        return _linux_usage(pgids)
+    return _ps_usage(pgids)
+
+
+def tree_usage(proc):
+    """proc 프로세스 그룹 전체의 (RSS 바이트, 누적 CPU 초). 측정할 수 없으면 None."""
+    return group_usage({proc.pid}).get(proc.pid)
+
+
+def available_memory():
+    """시스템의 여유 메모리(바이트). 측정할 수 없으면 None."""
+    try:
+        if _IS_LINUX:
+            with open("/proc/meminfo", encoding="ascii") as f:
+                for line in f:
+                    if line.startswith("MemAvailable:"):
+                        return int(line.split()[1]) * 1024
+            return None
+        if _IS_MAC:
+            out = subprocess.run(
+                ["vm_stat"], capture_output=True, text=True, timeout=10
+            ).stdout
+            lines = out.splitlines()
+            page = int(lines[0].split("page size of")[1].split()[0])
+            pages = 0
+            for line in lines[1:]:
+                key, _, value = line.partition(":")
+                if key in ("Pages free", "Pages inactive", "Pages speculative"):
+                    pages += int(value.strip().rstrip("."))
+            return pages * page
+        if IS_WINDOWS:
+            import ctypes
+
+            class MEMORYSTATUSEX(ctypes.Structure):
+                _fields_ = [
+                    ("dwLength", ctypes.c_ulong),
+                    ("dwMemoryLoad", ctypes.c_ulong),
+                    ("ullTotalPhys", ctypes.c_ulonglong),
+                    ("ullAvailPhys", ctypes.c_ulonglong),
+                    ("ullTotalPageFile", ctypes.c_ulonglong),
+                    ("ullAvailPageFile", ctypes.c_ulonglong),
+                    ("ullTotalVirtual", ctypes.c_ulonglong),
+                    ("ullAvailVirtual", ctypes.c_ulonglong),
+                    ("ullAvailExtendedVirtual", ctypes.c_ulonglong),
+                ]
+
+            status = MEMORYSTATUSEX()
+            status.dwLength = ctypes.sizeof(MEMORYSTATUSEX)
+            if ctypes.windll.kernel32.GlobalMemoryStatusEx(ctypes.byref(status)):
+                return status.ullAvailPhys
+    except (OSError, ValueError, IndexError, subprocess.SubprocessError):
+        pass
+    return None
+
+
+class Outcome:
+    """감시 아래 실행한 프로세스의 결과 (subprocess.CompletedProcess와 같은 속성 포함)"""
+
+    def __init__(self, returncode, stdout, stderr, reason=None, peak_rss=0,
+                 spawn=0.0, elapsed=0.0):
+        self.returncode = returncode
+        self.stdout = stdout
+        self.stderr = stderr
+        self.reason = reason  # None 또는 REASON_*: 감시가 강제 종료한 이유
+        self.peak_rss = peak_rss
+        self.spawn = spawn  # 프로세스를 띄우는 데 걸린 시간 (초)
+        self.elapsed = elapsed  # 띄운 뒤 끝날 때까지 (초)
+
+
+class Watchdog:
+    """변환 프로세스 감시 설정과 집계 (여러 작업자 스레드에서 함께 사용)
+
+    - run(): 메모리 상한, 멈춤, 시간 제한을 감시하며 명령을 실행합니다.
+    - slot(): 여유 메모리가 low_memory보다 적으면 다른 변환이 끝날 때까지 기다립니다.
+      (최소 하나는 항상 실행)
+    - attempts, backoff(): 강제 종료된 파일의 재시도 횟수와 대기 시간
+    - pause(), resume(), cancel(): 일괄 변환 전체의 일시 정지/재개/취소.
+      일시 정지하면 새 변환을 시작하지 않고 실행 중인 soffice도 멈추며(Windows는 새 변환만
+      멈춤), 멈춘 시간은 시간 제한과 멈춤 감시에서 빼고 셉니다. 취소하면 실행 중인
+      soffice를 SAMPLE_INTERVAL 안에 그룹째 종료합니다.
+    """
+
+    def __init__(self, rss_limit=DEFAULT_RSS_LIMIT, stall_seconds=STALL_SECONDS,
+                 attempts=MAX_ATTEMPTS, low_memory=LOW_MEMORY):
+        self.rss_limit = rss_limit
+        self.stall_seconds = stall_seconds
+        self.attempts = max(1, attempts)
+        self.low_memory = low_memory
+        self.kills = {REASON_TIMEOUT: 0, REASON_MEMORY: 0, REASON_STALL: 0}
+        self.retries = 0
+        self.throttled = 0
+        self._lock = threading.Lock()
+        self._slots = threading.Condition()
+        self._active = 0
+        self._procs = set()  # 실행 중인 프로세스 (일시 정지/취소 대상)
+        self._paused_since = None
+        self._paused_total = 0.0
+        self.cancelled = threading.Event()
+        # 실행 중인 프로세스 그룹의 사용량: 틱마다 한 번 측정해 작업자가 함께 씀
+        self._usage_lock = threading.Lock()
+        self._usage = {}
+        self._usage_pgids = set()
+        self._usage_at = None
+
+    @property
+    def paused(self):
+        return self._paused_since is not None
+
+    def paused_time(self):
+        """지금까지 일시 정지해 있던 시간의 합 (초)"""
+        with self._lock:
+            total = self._paused_total
+            if self._paused_since is not None:
+                total += time.monotonic() - self._paused_since
+        return total
+
+    def track(self, proc):
+        """proc를 일시 정지/취소 대상에 넣습니다 (상주 인스턴스 등 run() 밖의 프로세스)."""
+        with self._lock:
+            self._procs.add(proc)
+            paused = self._paused_since is not None
+        if self.cancelled.is_set():
+            kill_tree(proc)
+        elif paused:
+            suspend_tree(proc)
+
+    def untrack(self, proc):
+        with self._lock:
+            self._procs.discard(proc)
+
+    def usage(self, proc):
+        """proc 프로세스 그룹의 (RSS 바이트, 누적 CPU 초). 측정할 수 없으면 None.
+
+        작업자마다 /proc(또는 ps)를 따로 훑지 않도록, 실행 중인(track한) 모든 그룹을
+        SAMPLE_INTERVAL마다 한 번에 측정하고 같은 틱 안에 묻는 작업자는 그 값을 씁니다.
+        """
+        with self._usage_lock:
+            now = time.monotonic()
+            if (self._usage_at is None or now - self._usage_at >= SAMPLE_INTERVAL * 0.8
+                    or proc.pid not in self._usage_pgids):
+                with self._lock:
+                    pgids = {p.pid for p in self._procs}
+                pgids.add(proc.pid)
+                self._usage = group_usage(pgids)
+                self._usage_pgids = pgids
+                self._usage_at = now
+            return self._usage.get(proc.pid)
+
+    def pause(self):
+        with self._lock:
+            if self._paused_since is not None or self.cancelled.is_set():
+                return
+            self._paused_since = time.monotonic()
+            procs = list(self._procs)
+        for proc in procs:
+            suspend_tree(proc)
+
+    def resume(self):
+        with self._lock:
+            if self._paused_since is None:
+                return
+            self._paused_total += time.monotonic() - self._paused_since
+            self._paused_since = None
+            procs = list(self._procs)
+        for proc in procs:
+            suspend_tree(proc, resume=True)
+        with self._slots:
+            self._slots.notify_all()
+
+    def cancel(self):
+        """실행 중인 변환을 모두 종료하고 새 변환을 시작하지 않습니다."""
+        self.cancelled.set()
+        with self._lock:
+            procs = list(self._procs)
+        for proc in procs:
+            kill_tree(proc)
+        self.resume()
+        with self._slots:
+            self._slots.notify_all()
+
+    def run(self, cmd, timeout):
+        launched = time.monotonic()
+        if self.cancelled.is_set():
+            return Outcome(None, "", "", REASON_CANCELLED, 0, spawn=0.0, elapsed=0.0)
+        proc = popen_group(
+            cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True,
+        )
+        self.track(proc)
+        try:
+            return self._supervise(proc, launched, timeout)
+        finally:
+            self.untrack(proc)
+
+    def _supervise(self, proc, launched, timeout):
+        started = time.monotonic()
+        paused_before = self.paused_time()
+        last_cpu = 0.0
+        last_progress = started
+        peak_rss = 0
+        reason = None
+        stdout = stderr = ""
+        while True:
+            try:
+                # 출력을 계속 읽어 파이프가 차서 멈추는 일이 없게 함
+                out, err = proc.communicate(timeout=SAMPLE_INTERVAL)
+                stdout += out or ""
+                stderr += err or ""
+                break
+            except subprocess.TimeoutExpired:
+                pass
+            now = time.monotonic()
+            if self.cancelled.is_set():
+                reason = REASON_CANCELLED
+            elif self.paused:
+                # 일시 정지 중에는 CPU를 쓰지 않는 것이 정상
+                last_progress = now
+                continue
+            usage = None if reason else self.usage(proc)
+            if usage is not None:
+                rss, cpu = usage
+                peak_rss = max(peak_rss, rss)
+                if cpu - last_cpu >= STALL_CPU:
+                    last_cpu = cpu
+                    last_progress = now
+                if self.rss_limit and rss > self.rss_limit:
+                    reason = REASON_MEMORY
+                elif self.stall_seconds and now - last_progress > self.stall_seconds:
+                    reason = REASON_STALL
+            active = now - started - (self.paused_time() - paused_before)
+            if reason is None and active > timeout:
+                reason = REASON_TIMEOUT
+            if reason is not None:
+                kill_tree(proc)
+                try:
+                    out, err = proc.communicate(timeout=10)
+                    stdout += out or ""
+                    stderr += err or ""
+                except subprocess.TimeoutExpired:
+                    pass
+                if reason in self.kills:
+                    with self._lock:
+                        self.kills[reason] += 1
+                break
+        if reason is None and proc.returncode != 0 and self.cancelled.is_set():
+            # cancel()이 먼저 종료시킨 경우
+            reason = REASON_CANCELLED
+        if not IS_WINDOWS:
+            kill_tree(proc)
+        return Outcome(
+            proc.returncode, stdout, stderr, reason, peak_rss,
+            spawn=started - launched, elapsed=time.monotonic() - started,
+        )
+
+    def backoff(self, attempt):
+        """attempt번째 시도가 실패한 뒤 기다릴 시간 (초)"""
+        return min(BACKOFF_MAX, BACKOFF_BASE * 2 ** (attempt - 1))
+
+    def count_retry(self):
+        with self._lock:
+            self.retries += 1
+
+    @contextlib.contextmanager
+    def slot(self):
+        """변환 하나를 실행할 자리
+
+        일시 정지 중이면 재개될 때까지, 메모리가 부족하면 실행 중인 변환이 줄 때까지 기다립니다.
+        취소되면 바로 돌아오므로 들어온 뒤 cancelled를 확인해야 합니다.
+        """
+        with self._slots:
+            while self.paused and not self.cancelled.is_set():
+                self._slots.wait(SAMPLE_INTERVAL)
+            waited = False
+            while self._active > 0 and self.low_memory and not self.cancelled.is_set():
+                free = available_memory()
+                if free is None or free >= self.low_memory:
+                    break
+                waited = True
+                self._slots.wait(1.0)
+            if waited:
+                with self._lock:
+                    self.throttled += 1
+            self._active += 1
+        try:
+            yield
+        finally:
+            with self._slots:
+                self._active -= 1
+                self._slots.notify_all()
+
+    def summary(self):
+        """강제 종료/재시도 집계 문자열. 아무 일도 없었으면 빈 문자열."""
+        with self._lock:
+            kills = dict(self.kills)
+            retries, throttled = self.retries, self.throttled
+        if not any(kills.values()) and not retries and not throttled:
+            return ""
+        return (
+            f"감시: 메모리 초과 {kills[REASON_MEMORY]}, 멈춤 {kills[REASON_STALL]}, "
+            f"시간 초과 {kills[REASON_TIMEOUT]}, 재시도 {retries}, 메모리 부족 대기 {throttled}"
+        )
+
+
+def quarantine_path():
+    return os.path.join(user_cache_dir(), "quarantine.json")
+
+
+class Quarantine:
+    """재시도해도 강제 종료된 파일 목록
+
+    파일 크기나 수정 시각이 바뀌면(문서를 고치면) 목록에서 빠진 것으로 봅니다.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or quarantine_path()
+        self._lock = threading.Lock()
+        self._entries = {}
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+            if isinstance(data, dict):
+                self._entries = data
+        except (OSError, ValueError):
+            pass
+
+    def __len__(self):
+        return len(self._entries)
+
+    @staticmethod
+    def _stamp(filepath):
+        st = os.stat(filepath)
+        return st.st_size, st.st_mtime_ns
+
+    def get(self, filepath):
+        """격리된 파일이면 기록(dict), 아니면 None"""
+        path = os.path.abspath(filepath)
+        with self._lock:
+            entry = self._entries.get(path)
+        if entry is None:
+            return None
+        try:
+            if self._stamp(path) != (entry["size"], entry["mtime_ns"]):
+                return None
+        except (OSError, KeyError):
+            return None
+        return entry
+
+    def add(self, filepath, status, attempts):
+        path = os.path.abspath(filepath)
+        try:
+            size, mtime_ns = self._stamp(path)
+        except OSError:
+            return
+        with self._lock:
+            self._entries[path] = {
+                "size": size,
+                "mtime_ns": mtime_ns,
+                "status": status,
+                "attempts": attempts,
+                "ts": time.time(),
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def save(self):
+        with self._lock:
+            data = dict(self._entries)
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            # GUI/CLI/스풀 작업자가 같은 파일을 동시에 저장해도 섞이지 않도록 임시 파일 이름을 따로 씀
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(self.path), suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump(data, f, ensure_ascii=False, indent=1)
+                os.replace(tmp, self.path)
+            except BaseException:
+                os.remove(tmp)
+                raise
+        except OSError:
+            pass
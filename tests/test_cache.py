@@ -0,0 +1,71 @@
+"""변환 캐시의 크기 상한과 잠긴 색인 처리 확인
+
+  python3 -m unittest discover -s tests
+"""
+
+import os
+import sqlite3
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from hwp2pdf_cache import ConversionCache  # noqa: E402
+
+
+class ConversionCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.cache_dir = os.path.join(self.dir.name, "cache")
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def _pair(self, i, size=1000):
+        src = os.path.join(self.dir.name, f"doc{i}.hwp")
+        pdf = os.path.join(self.dir.name, f"doc{i}.pdf")
+        with open(src, "wb") as f:
+            f.write(b"hwp %d" % i)
+        with open(pdf, "wb") as f:
+            f.write(bytes([i % 256]) * size)
+        return src, pdf
+
+    def test_store_evicts_without_close(self):
+        cache = ConversionCache("7.0", cache_dir=self.cache_dir, max_bytes=10000)
+        try:
+            for i in range(40):
+                cache.store(*self._pair(i))
+                # 상한 확인은 max_bytes의 1/10을 저장할 때마다 하므로 그만큼만 넘을 수 있음
+                self.assertLessEqual(cache.total_bytes(), 11000)
+            src, pdf = self._pair(39)
+            self.assertIsNotNone(cache.lookup(src, pdf))
+            src, pdf = self._pair(0)
+            self.assertIsNone(cache.lookup(src, pdf))
+        finally:
+            cache.close()
+
+    def test_locked_index_is_a_miss(self):
+        cache = ConversionCache("7.0", cache_dir=self.cache_dir)
+        cache._db.execute("PRAGMA busy_timeout = 100")
+        src, pdf = self._pair(1)
+        cache.store(src, pdf)
+        other = sqlite3.connect(os.path.join(self.cache_dir, "index.sqlite3"))
+        try:
+            # 다른 프로세스가 색인을 쓰는 중
+            other.execute("BEGIN EXCLUSIVE")
+            new_src, new_pdf = self._pair(2)
+            self.assertEqual(len(cache.digest(new_src)), 64)
+            self.assertIsNone(cache.lookup(src, pdf))
+            cache.store(new_src, new_pdf)
+            other.rollback()
+            # 잠금이 풀리면 다시 캐시를 씀
+            os.remove(pdf)
+            self.assertIsNotNone(cache.lookup(src, pdf))
+        finally:
+            other.close()
+            cache.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
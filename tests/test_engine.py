@@ -0,0 +1,140 @@
+"""묶음 변환(convert_chunk)의 이분 탐색 확인
+
+soffice 대신 명령을 받아 PDF를 쓰는 가짜 감시(watchdog)로 실행합니다.
+
+  python3 -m unittest discover -s tests
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import hwp2pdf_engine as engine  # noqa: E402
+from hwp2pdf_engine import STATUS_FAILED, convert_chunk  # noqa: E402
+from hwp2pdf_watchdog import Outcome  # noqa: E402
+
+
+class StubConverter:
+    """watchdog.run 대신 불려 입력 순서대로 PDF를 씁니다.
+
+    이름에 crash가 든 파일에서 soffice가 죽은 것처럼 멈추므로 그 뒤 파일의 PDF도 생기지 않습니다.
+    """
+
+    def __init__(self):
+        self.calls = []
+
+    def run(self, cmd, timeout):
+        outdir = cmd[cmd.index("--outdir") + 1]
+        files = cmd[cmd.index("--outdir") + 2:]
+        self.calls.append([os.path.basename(f) for f in files])
+        for f in files:
+            name = os.path.splitext(os.path.basename(f))[0]
+            if "crash" in name:
+                return Outcome(134, "", f"crashed on {name}")
+            with open(os.path.join(outdir, name + ".pdf"), "wb") as out:
+                out.write(b"%PDF-1.7\n" + name.encode() + b"\nstartxref\n0\n%%EOF\n")
+        return Outcome(0, f"converted {len(files)}", "")
+
+
+class ConvertChunkTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.files = []
+        for name in ("a", "b", "c", "crash", "e", "f", "g", "h"):
+            path = os.path.join(self.dir.name, name + ".hwp")
+            with open(path, "wb") as f:
+                f.write(b"hwp")
+            self.files.append(path)
+        self.outdir = os.path.join(self.dir.name, "out")
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_bisects_down_to_failing_file(self):
+        stub = StubConverter()
+        results = convert_chunk("soffice", self.files, self.outdir, "file:///profile", watchdog=stub)
+
+        # 첫 실행에서 crash 앞의 파일은 끝났고, 남은 파일을 반씩 나눠 crash 하나만 남김
+        self.assertEqual(stub.calls, [
+            ["a.hwp", "b.hwp", "c.hwp", "crash.hwp", "e.hwp", "f.hwp", "g.hwp", "h.hwp"],
+            ["crash.hwp", "e.hwp", "f.hwp"],
+            ["crash.hwp", "e.hwp"],
+            ["crash.hwp"],
+            ["e.hwp"],
+            ["f.hwp"],
+            ["g.hwp", "h.hwp"],
+        ])
+        self.assertEqual([r.filepath for r in results], self.files)
+        failed = [r for r in results if not r.ok]
+        self.assertEqual([os.path.basename(r.filepath) for r in failed], ["crash.hwp"])
+        self.assertEqual(failed[0].status, STATUS_FAILED)
+        self.assertIn("crashed on crash", failed[0].detail)
+        for r in results:
+            if r.ok:
+                self.assertTrue(os.path.isfile(r.pdf_path))
+
+    def test_all_ok_runs_once(self):
+        files = [f for f in self.files if "crash" not in f]
+        stub = StubConverter()
+        results = convert_chunk("soffice", files, self.outdir, "file:///profile", watchdog=stub)
+        self.assertEqual(len(stub.calls), 1)
+        self.assertTrue(all(r.ok for r in results))
+
+
+class FindSofficeTest(unittest.TestCase):
+    """soffice.json에 남긴 경로보다 먼저 찾는 곳에 새로 설치하면 다시 찾는지 확인"""
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.bin = [os.path.join(self.dir.name, name) for name in ("first", "second", "fixed")]
+        for d in self.bin:
+            os.makedirs(d)
+        cache = os.path.join(self.dir.name, "cache")
+        for patch in (
+            mock.patch.dict(os.environ, {"PATH": os.pathsep.join(self.bin[:2])}),
+            mock.patch.object(engine, "user_cache_dir", lambda: cache),
+            mock.patch.object(engine, "SOFFICE_PATHS_WIN", [self._exe(2)]),
+            mock.patch.object(engine, "SOFFICE_PATHS_MAC", [self._exe(2)]),
+        ):
+            patch.start()
+            self.addCleanup(patch.stop)
+        os.environ.pop("SOFFICE", None)
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def _exe(self, i):
+        return os.path.join(self.bin[i], "soffice.exe" if engine.IS_WINDOWS else "soffice")
+
+    def _install(self, i):
+        # 폴더의 수정 시각이 확실히 바뀌도록
+        time.sleep(0.01)
+        with open(self._exe(i), "w", encoding="utf-8") as f:
+            f.write("#!/bin/sh\n")
+        os.chmod(self._exe(i), 0o755)
+
+    def test_new_install_ahead_of_cached_path(self):
+        self._install(1)
+        self.assertEqual(engine.find_soffice(), self._exe(1))
+        with mock.patch.object(shutil, "which", side_effect=AssertionError("cache not used")):
+            self.assertEqual(engine.find_soffice(), self._exe(1))
+
+        # 앞선 PATH 폴더에 설치
+        self._install(0)
+        self.assertEqual(engine.find_soffice(), self._exe(0))
+
+        # 기본 설치 위치는 PATH보다 먼저 찾음
+        self._install(2)
+        self.assertEqual(engine.find_soffice(), self._exe(2))
+        with mock.patch.object(shutil, "which", side_effect=AssertionError("cache not used")):
+            self.assertEqual(engine.find_soffice(), self._exe(2))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+"""PDF 이미지 합치기(dedup_images) 확인
+
+  python3 -m unittest discover -s tests
+"""
+
+import os
+import re
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from hwp2pdf_export import dedup_images  # noqa: E402
+
+PIXELS = bytes(range(256)) * 12  # 32x32 회색조
+
+
+def _image(pixels):
+    head = b"<< /Type /XObject /Subtype /Image /Width 32 /Height 32 /ColorSpace /DeviceGray /BitsPerComponent 8 /Length %d >>" % len(pixels)
+    return head + b"\nstream\n" + pixels + b"\nendstream"
+
+
+def _pdf(images):
+    """images를 한 쪽에 모두 그리는 PDF (xref 표 하나)"""
+    names = b" ".join(b"/Im%d %d 0 R" % (i, 5 + i) for i in range(len(images)))
+    content = b" ".join(b"q 32 0 0 32 %d 0 cm /Im%d Do Q" % (40 * i, i) for i in range(len(images)))
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 600 100] /Contents 4 0 R /Resources << /XObject << " + names + b" >> >> >>",
+        b"<< /Length %d >>\nstream\n" % len(content) + content + b"\nendstream",
+    ] + [_image(p) for p in images]
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for num, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % num + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % off for off in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+def _check_xref(data):
+    """xref 표의 사용 중인 항목이 모두 해당 객체 시작을 가리키는지 확인하고 객체 번호 목록을 반환"""
+    xref_at = int(re.search(rb"startxref\s+(\d+)", data).group(1))
+    header = re.compile(rb"xref\s+0 (\d+)\s+").match(data, xref_at)
+    used = []
+    for num in range(int(header.group(1))):
+        entry = data[header.end() + 20 * num:header.end() + 20 * num + 20]
+        if entry[17:18] == b"n":
+            offset = int(entry[:10])
+            assert data.startswith(b"%d 0 obj" % num, offset), num
+            used.append(num)
+    return used
+
+
+class DedupImagesTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def _write(self, data):
+        path = os.path.join(self.dir.name, "doc.pdf")
+        with open(path, "wb") as f:
+            f.write(data)
+        return path
+
+    def test_merges_duplicates(self):
+        other = bytes(reversed(PIXELS))
+        path = self._write(_pdf([PIXELS, PIXELS, other, PIXELS]))
+        before = os.path.getsize(path)
+
+        saved = dedup_images(path)
+
+        with open(path, "rb") as f:
+            data = f.read()
+        self.assertEqual(saved, before - len(data))
+        self.assertGreater(saved, 2 * len(PIXELS))
+        self.assertEqual(data.count(b"/Subtype /Image"), 2)
+        self.assertEqual(_check_xref(data), [1, 2, 3, 4, 5, 7])
+        # 합쳐진 이미지를 가리키던 이름은 남은 이미지를 가리킴
+        self.assertIn(b"/Im0 5 0 R /Im1 5 0 R /Im2 7 0 R /Im3 5 0 R", data)
+        self.assertEqual(os.listdir(self.dir.name), ["doc.pdf"])
+
+    def test_no_duplicates(self):
+        original = _pdf([PIXELS, bytes(reversed(PIXELS))])
+        path = self._write(original)
+        self.assertEqual(dedup_images(path), 0)
+        with open(path, "rb") as f:
+            self.assertEqual(f.read(), original)
+
+    def test_unsupported(self):
+        path = self._write(b"not a pdf")
+        self.assertIsNone(dedup_images(path))
+        self.assertEqual(os.listdir(self.dir.name), ["doc.pdf"])
+
+
+if __name__ == "__main__":
+    unittest.main()
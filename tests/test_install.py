@@ -0,0 +1,176 @@
+"""설치 파일 다운로드(이어 받기, If-Range, SHA-256, 미러) 확인
+
+Range/If-Range를 지원하는 http.server를 띄워 실제로 받아 봅니다.
+
+  python3 -m unittest discover -s tests
+"""
+
+import hashlib
+import http.server
+import json
+import os
+import re
+import sys
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import hwp2pdf_install as install  # noqa: E402
+from hwp2pdf_install import LIBREOFFICE_MSI_NAME, DownloadError, download, fetch_installer  # noqa: E402
+
+SIZE = 512 * 1024
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        srv = self.server
+        with srv.lock:
+            data, etag = srv.versions[0]
+            rng = self.headers.get("Range")
+            if rng == "bytes=0-0" and len(srv.versions) > 1:
+                # 확인 요청에 답한 뒤 서버의 파일이 바뀜
+                srv.versions.pop(0)
+            srv.requests.append(rng)
+        if self.path.endswith(".sha256"):
+            body = f"{hashlib.sha256(data).hexdigest()}  {LIBREOFFICE_MSI_NAME}\n".encode("ascii")
+            return self._send(200, body, {})
+        if not self.path.endswith(LIBREOFFICE_MSI_NAME):
+            return self._send(404, b"", {})
+        headers = {"ETag": etag, "Accept-Ranges": "bytes"}
+        m = re.match(r"bytes=(\d+)-(\d+)", rng or "")
+        if_range = self.headers.get("If-Range")
+        if m and (if_range is None or if_range == etag):
+            start, end = int(m.group(1)), int(m.group(2))
+            headers["Content-Range"] = f"bytes {start}-{end}/{len(data)}"
+            return self._send(206, data[start:end + 1], headers)
+        return self._send(200, data, headers)
+
+    def _send(self, status, body, headers):
+        srv = self.server
+        self.send_response(status)
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        with srv.lock:
+            if srv.budget is not None:
+                # 지정한 양만 보내고 연결을 끊음 (다운로드 중단 흉내)
+                body = body[:max(0, srv.budget)]
+                srv.budget -= len(body)
+            srv.sent += len(body)
+        self.wfile.write(body)
+
+
+class DownloadTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self.server.daemon_threads = True
+        self.server.lock = threading.Lock()
+        self.server.requests = []
+        self.server.budget = None
+        self.server.sent = 0
+        self.data = os.urandom(SIZE)
+        self.server.versions = [(self.data, '"v1"')]
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/{LIBREOFFICE_MSI_NAME}"
+        self.dest = os.path.join(self.dir.name, LIBREOFFICE_MSI_NAME)
+        # 작은 파일도 여러 연결로 나누어 받도록
+        for patch in (
+            mock.patch.object(install, "MIN_PART_BYTES", 64 * 1024),
+            mock.patch.object(install, "READ_BLOCK", 16 * 1024),
+            mock.patch.object(install, "DOWNLOAD_ATTEMPTS", 1),
+            mock.patch.dict(os.environ, {}, clear=False),
+        ):
+            patch.start()
+            self.addCleanup(patch.stop)
+        os.environ.pop(install.SHA256_ENV, None)
+        os.environ.pop(install.MIRROR_ENV, None)
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.dir.cleanup()
+
+    def _leftovers(self):
+        return sorted(n for n in os.listdir(self.dir.name) if ".part" in n)
+
+    def _read(self, path):
+        with open(path, "rb") as f:
+            return f.read()
+
+    def test_download(self):
+        sha = hashlib.sha256(self.data).hexdigest()
+        self.assertEqual(download(self.url, self.dest, sha, connections=4), self.dest)
+        self.assertEqual(self._read(self.dest), self.data)
+        self.assertEqual(self._leftovers(), [])
+        # 확인 요청 + 4개 범위
+        self.assertEqual(len(self.server.requests), 5)
+
+    def test_resume_after_interrupt(self):
+        self.server.budget = SIZE // 3
+        with self.assertRaises(DownloadError):
+            download(self.url, self.dest, connections=4)
+        self.assertFalse(os.path.exists(self.dest))
+        self.assertEqual(len(self._leftovers()), 2)  # .part와 .part.json
+        state = [n for n in self._leftovers() if n.endswith(".json")][0]
+        with open(os.path.join(self.dir.name, state), encoding="utf-8") as f:
+            saved = sum(c[2] for c in json.load(f)["chunks"])
+        self.assertGreater(saved, 0)
+
+        self.server.budget = None
+        self.server.sent = 0
+        download(self.url, self.dest, hashlib.sha256(self.data).hexdigest(), connections=4)
+        self.assertEqual(self._read(self.dest), self.data)
+        self.assertEqual(self._leftovers(), [])
+        # 상태 파일에 남긴 범위는 다시 받지 않음 (확인 요청의 1바이트 제외)
+        self.assertEqual(self.server.sent, SIZE - saved + 1)
+
+    def test_if_range_mismatch_restarts(self):
+        new = os.urandom(SIZE)
+        self.server.versions = [(self.data, '"v1"'), (new, '"v2"')]
+        download(self.url, self.dest, hashlib.sha256(new).hexdigest(), connections=4)
+        self.assertEqual(self._read(self.dest), new)
+        self.assertEqual(self._leftovers(), [])
+        # 확인 요청이 두 번 (바뀐 것을 알고 처음부터 다시)
+        self.assertEqual(self.server.requests.count("bytes=0-0"), 2)
+
+    def test_sha256_mismatch_removes_part(self):
+        with self.assertRaises(DownloadError):
+            download(self.url, self.dest, "0" * 64, connections=4)
+        self.assertFalse(os.path.exists(self.dest))
+        self.assertEqual(self._leftovers(), [])
+
+    def test_fetch_from_mirror_url_then_cache(self):
+        cache = os.path.join(self.dir.name, "cache")
+        mirror = self.url.rsplit("/", 1)[0]
+        path = fetch_installer(cache_dir=cache, mirror=mirror, connections=2)
+        self.assertEqual(self._read(path), self.data)
+        before = len(self.server.requests)
+        # 캐시에 있으면 .sha256만 읽고 다시 받지 않음
+        self.assertEqual(fetch_installer(cache_dir=cache, mirror=mirror), path)
+        self.assertEqual(len(self.server.requests), before + 1)
+
+    def test_fetch_from_mirror_folder(self):
+        mirror = os.path.join(self.dir.name, "mirror")
+        os.makedirs(mirror)
+        with open(os.path.join(mirror, LIBREOFFICE_MSI_NAME), "wb") as f:
+            f.write(self.data)
+        with open(os.path.join(mirror, LIBREOFFICE_MSI_NAME + ".sha256"), "w", encoding="ascii") as f:
+            f.write(hashlib.sha256(self.data).hexdigest() + "\n")
+        cache = os.path.join(self.dir.name, "cache")
+        path = fetch_installer(cache_dir=cache, mirror=mirror)
+        self.assertEqual(path, os.path.join(cache, LIBREOFFICE_MSI_NAME))
+        self.assertEqual(self._read(path), self.data)
+        self.assertEqual(self.server.requests, [])
+        self.assertEqual(os.listdir(cache), [LIBREOFFICE_MSI_NAME])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,124 @@
+"""작업 기록(journal)으로 중단된 일괄 변환을 이어서 하는지 확인
+
+soffice 대신 PDF를 쓰는 작은 스크립트로 convert_batch를 실행합니다.
+
+  python3 -m unittest discover -s tests
+"""
+
+import os
+import stat
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from hwp2pdf_engine import IS_WINDOWS, STATUS_FAILED, STATUS_OK, ConvertResult, convert_batch  # noqa: E402
+from hwp2pdf_journal import JobJournal, latest_unfinished, load  # noqa: E402
+from hwp2pdf_watchdog import Watchdog  # noqa: E402
+
+STUB_SOFFICE = """#!{python}
+import os, sys
+args = sys.argv[1:]
+outdir = args[args.index("--outdir") + 1]
+for f in args[args.index("--outdir") + 2:]:
+    with open(os.environ["STUB_LOG"], "a") as log:
+        log.write(os.path.basename(f) + "\\n")
+    name = os.path.splitext(os.path.basename(f))[0]
+    with open(os.path.join(outdir, name + ".pdf"), "wb") as out:
+        out.write(b"%PDF-1.7\\nstartxref\\n0\\n%%EOF\\n")
+"""
+
+
+class JournalTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.jobs = os.path.join(self.dir.name, "jobs")
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def _result(self, path, ok=True):
+        return ConvertResult(path, STATUS_OK if ok else STATUS_FAILED)
+
+    def test_resume_pending_files(self):
+        files = [f"/docs/{i}.hwp" for i in range(5)]
+        journal = JobJournal.create(files, output_dir="/out", options={"workers": 2}, directory=self.jobs)
+        journal.record_result(self._result(files[0]))
+        journal.record_result(self._result(files[2], ok=False))
+        journal.close()
+        # 기록하던 중 끊긴 마지막 줄은 무시
+        with open(journal.path, "a", encoding="utf-8") as f:
+            f.write('{"t": "done", "path": "/docs/4.h')
+
+        state = latest_unfinished(self.jobs)
+        self.assertEqual(state.path, journal.path)
+        self.assertEqual(state.pending, [files[1], files[3], files[4]])
+        self.assertEqual((state.success, state.fail), (1, 1))
+        self.assertEqual((state.output_dir, state.options), ("/out", {"workers": 2}))
+
+        journal = JobJournal.reopen(state)
+        for path in state.pending:
+            journal.record_result(self._result(path))
+        journal.close(finished=True)
+        state = load(journal.path)
+        self.assertTrue(state.finished)
+        self.assertEqual((state.pending, state.success, state.fail), ([], 4, 1))
+        self.assertIsNone(latest_unfinished(self.jobs))
+
+    @unittest.skipIf(IS_WINDOWS, "셸 스크립트 soffice")
+    def test_cancelled_batch_resumes_remaining(self):
+        soffice = os.path.join(self.dir.name, "soffice")
+        with open(soffice, "w", encoding="utf-8") as f:
+            f.write(STUB_SOFFICE.format(python=sys.executable))
+        os.chmod(soffice, os.stat(soffice).st_mode | stat.S_IXUSR)
+        log = os.path.join(self.dir.name, "soffice.log")
+        patch = mock.patch.dict(os.environ, {"STUB_LOG": log})
+        patch.start()
+        self.addCleanup(patch.stop)
+        src = os.path.join(self.dir.name, "src")
+        out = os.path.join(self.dir.name, "out")
+        os.makedirs(src)
+        files = []
+        for i in range(6):
+            path = os.path.join(src, f"{i}.hwp")
+            with open(path, "wb") as f:
+                f.write(b"hwp")
+            files.append(path)
+
+        # 세 번째 결과가 나오면 취소 (앱이 중간에 멈춘 것과 같음)
+        watchdog = Watchdog()
+
+        def _cancel_after_three(idx, result, summary):
+            if summary.done == 3:
+                watchdog.cancel()
+
+        journal = JobJournal.create(files, output_dir=out, directory=self.jobs)
+        summary = convert_batch(
+            soffice, files, out, workers=1, journal=journal, watchdog=watchdog,
+            on_result=_cancel_after_three,
+        )
+        journal.close(finished=not summary.cancelled)
+        self.assertTrue(summary.cancelled)
+
+        state = latest_unfinished(self.jobs)
+        self.assertEqual(state.success, 3)
+        self.assertEqual(len(state.pending), 3)
+        journal = JobJournal.reopen(state)
+        summary = convert_batch(soffice, state.pending, state.output_dir, workers=1, journal=journal)
+        journal.close(finished=not summary.cancelled)
+
+        state = load(journal.path)
+        self.assertTrue(state.finished)
+        self.assertEqual((state.pending, state.success), ([], 6))
+        self.assertIsNone(latest_unfinished(self.jobs))
+        self.assertEqual(sorted(os.listdir(out)), [f"{i}.pdf" for i in range(6)])
+        # 이어서 변환할 때 이미 끝난 파일은 다시 변환하지 않음
+        with open(log, encoding="utf-8") as f:
+            converted = f.read().split()
+        self.assertEqual(sorted(converted), [f"{i}.hwp" for i in range(6)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+"""프로필 템플릿 초기화 실패 기록 확인
+
+  python3 -m unittest discover -s tests
+"""
+
+import os
+import stat
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import hwp2pdf_profile as profile  # noqa: E402
+from hwp2pdf_engine import IS_WINDOWS  # noqa: E402
+
+# 실행된 횟수만 남기고 프로필은 만들지 않는 soffice (초기화 실패)
+STUB_SOFFICE = """#!{python}
+with open({log!r}, "a") as log:
+    log.write("run\\n")
+"""
+
+
+@unittest.skipIf(IS_WINDOWS, "셸 스크립트 soffice")
+class EnsureTemplateTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.root = os.path.join(self.dir.name, "profiles")
+        self.log = os.path.join(self.dir.name, "runs.log")
+        self.soffice = os.path.join(self.dir.name, "soffice")
+        with open(self.soffice, "w", encoding="utf-8") as f:
+            f.write(STUB_SOFFICE.format(python=sys.executable, log=self.log))
+        os.chmod(self.soffice, os.stat(self.soffice).st_mode | stat.S_IXUSR)
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def _runs(self):
+        try:
+            with open(self.log, encoding="utf-8") as f:
+                return len(f.read().split())
+        except FileNotFoundError:
+            return 0
+
+    def test_failed_build_is_not_retried(self):
+        self.assertIsNone(profile.ensure_template(self.soffice, "7.0", self.root))
+        self.assertIsNone(profile.ensure_template(self.soffice, "7.0", self.root))
+        self.assertEqual(self._runs(), 1)
+        failed = [n for n in os.listdir(self.root) if n.endswith(profile.FAILED_SUFFIX)]
+        self.assertEqual(len(failed), 1)
+
+        # 다른 버전(업데이트한 설치)은 다시 시도하고 이전 버전의 실패 기록은 지움
+        self.assertIsNone(profile.ensure_template(self.soffice, "7.1", self.root))
+        self.assertEqual(self._runs(), 2)
+        self.assertNotIn(failed[0], os.listdir(self.root))
+
+        # FAILED_RETRY가 지나면 다시 시도
+        with mock.patch.object(profile, "FAILED_RETRY", 0):
+            self.assertIsNone(profile.ensure_template(self.soffice, "7.1", self.root))
+        self.assertEqual(self._runs(), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+"""사전 검사(sniff)가 손상된 HWPX에서도 예외 없이 reason을 남기는지 확인
+
+  python3 -m unittest discover -s tests
+"""
+
+import io
+import os
+import struct
+import sys
+import tempfile
+import unittest
+import zipfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from hwp2pdf_sniff import HWPX_MIMETYPE, sniff  # noqa: E402
+
+
+def _hwpx_bytes():
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w") as zf:
+        zf.writestr("mimetype", HWPX_MIMETYPE, compress_type=zipfile.ZIP_STORED)
+        zf.writestr("Contents/section0.xml", "<sec/>" * 100, compress_type=zipfile.ZIP_DEFLATED)
+    return bytearray(buf.getvalue())
+
+
+def _set_encrypted(data, name):
+    """name 항목의 지역/중앙 헤더에 암호화 비트(flag_bits 0x1)를 켭니다."""
+    encoded = name.encode("ascii")
+    # (서명, flag_bits 위치, 이름 길이 위치, 이름 위치)
+    for signature, flag_off, len_off, name_off in ((b"PK\x03\x04", 6, 26, 30), (b"PK\x01\x02", 8, 28, 46)):
+        pos = data.find(signature)
+        while pos >= 0:
+            name_len = struct.unpack_from("<H", data, pos + len_off)[0]
+            if data[pos + name_off:pos + name_off + name_len] == encoded:
+                flags = struct.unpack_from("<H", data, pos + flag_off)[0]
+                struct.pack_into("<H", data, pos + flag_off, flags | 0x1)
+            pos = data.find(signature, pos + 4)
+    return data
+
+
+class SniffHwpxTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def _write(self, name, data):
+        path = os.path.join(self.dir.name, name)
+        with open(path, "wb") as f:
+            f.write(data)
+        return path
+
+    def test_valid(self):
+        result = sniff(self._write("ok.hwpx", _hwpx_bytes()))
+        self.assertTrue(result.ok, result.reason)
+        self.assertEqual(result.sections, 1)
+
+    def test_misnamed(self):
+        self.assertFalse(sniff(self._write("ok.hwpx", _hwpx_bytes())).misnamed)
+        result = sniff(self._write("renamed.hwp", _hwpx_bytes()))
+        self.assertTrue(result.ok, result.reason)
+        self.assertTrue(result.misnamed)
+        self.assertEqual(result.ext, ".hwpx")
+
+    def test_bad_crc(self):
+        data = _hwpx_bytes()
+        pos = data.find(HWPX_MIMETYPE)
+        data[pos] ^= 0xFF  # mimetype 내용을 바꿔 CRC가 맞지 않게 함
+        result = sniff(self._write("crc.hwpx", data))
+        self.assertFalse(result.ok)
+        self.assertIn("손상된 HWPX", result.reason)
+
+    def test_encrypted_mimetype(self):
+        result = sniff(self._write("enc.hwpx", _set_encrypted(_hwpx_bytes(), "mimetype")))
+        self.assertFalse(result.ok)
+        self.assertIn("암호", result.reason)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,122 @@
+"""공유 스풀 폴더의 작업 임대/반납/만료 확인
+
+한 컴퓨터에서 작업자 프로세스 여럿을 띄워 같은 스풀을 나누어 처리합니다.
+
+  python3 -m unittest discover -s tests
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from hwp2pdf_spool import DONE, FAILED, LEASES, PENDING, Spool  # noqa: E402
+
+# 작업을 임대해 바로 끝내고, 끝낸 작업 목록을 출력하는 작업자
+WORKER = """
+import json, sys, time
+sys.path.insert(0, sys.argv[1])
+from hwp2pdf_spool import Spool
+
+spool = Spool(sys.argv[2])
+name = sys.argv[3]
+done = []
+while True:
+    lease = spool.claim(name)
+    if lease is None:
+        if spool.idle():
+            break
+        time.sleep(0.05)
+        continue
+    lease.complete(name, [{"path": p, "status": "ok"} for p in lease.files])
+    done.append(lease.id)
+print(json.dumps(done))
+"""
+
+
+class SpoolTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, "spool")
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def _names(self, name):
+        return sorted(os.listdir(os.path.join(self.path, name)))
+
+    def test_workers_complete_each_job_once(self):
+        spool = Spool.create(self.path)
+        jobs, count = spool.submit((f"/docs/{i}.hwp" for i in range(300)), job_size=3)
+        self.assertEqual((jobs, count), (100, 300))
+
+        procs = [
+            subprocess.Popen(
+                [sys.executable, "-c", WORKER, ROOT, self.path, f"w{i}"],
+                stdout=subprocess.PIPE, text=True,
+            )
+            for i in range(4)
+        ]
+        done = []
+        for proc in procs:
+            out, _ = proc.communicate(timeout=60)
+            self.assertEqual(proc.returncode, 0)
+            done += json.loads(out)
+
+        self.assertEqual(len(done), jobs)
+        self.assertEqual(len(set(done)), jobs)
+        self.assertEqual(len(self._names(DONE)), jobs)
+        self.assertEqual(self._names(PENDING) + self._names(LEASES), [])
+        status = spool.status()
+        self.assertTrue(status.finished)
+        self.assertEqual((status.success, status.fail), (300, 0))
+
+    def test_expired_lease_is_reclaimed(self):
+        spool = Spool.create(self.path, lease=0.2)
+        spool.submit(["/docs/a.hwp", "/docs/b.hwp"], job_size=2)
+        dead = spool.claim("dead")
+        self.assertIsNotNone(dead)
+        self.assertIsNone(spool.claim("other"))
+
+        # 임대 시간 안에는 되돌리지 않음
+        self.assertEqual(Spool(self.path).reclaim(), 0)
+        time.sleep(0.3)
+        other = Spool(self.path)
+        self.assertEqual(other.reclaim(), 1)
+        lease = other.claim("other")
+        self.assertEqual((lease.id, lease.claims, lease.files), (dead.id, 1, dead.files))
+
+        # 원래 작업자는 임대를 잃었음을 알게 됨
+        dead.renew()
+        self.assertTrue(dead.lost)
+        lease.complete("other", [{"path": p, "status": "ok"} for p in lease.files])
+        self.assertEqual(self._names(DONE), [f"{dead.id}.json"])
+        self.assertTrue(other.idle())
+
+    def test_max_claims_moves_job_to_failed(self):
+        spool = Spool.create(self.path, lease=0.1, max_claims=2)
+        spool.submit(["/docs/crash.hwp"], job_size=1)
+        # 임대한 작업자가 두 번 모두 죽음: 첫 번째는 대기로, 두 번째는 실패로
+        for _ in range(2):
+            lease = spool.claim("crashing")
+            self.assertIsNotNone(lease)
+            time.sleep(0.2)
+            spool = Spool(self.path)
+            self.assertEqual(spool.reclaim(), 1)
+        self.assertIsNone(spool.claim("crashing"))
+        self.assertEqual(self._names(FAILED), [f"{lease.id}.json"])
+        self.assertEqual(self._names(PENDING) + self._names(LEASES), [])
+        status = spool.status()
+        self.assertEqual((status.failed, status.fail), (1, 1))
+        self.assertEqual(status.failures[0][0], "/docs/crash.hwp")
+        self.assertTrue(spool.idle())
+
+
+if __name__ == "__main__":
+    unittest.main()